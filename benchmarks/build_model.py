@@ -0,0 +1,97 @@
+"""
+Benchmark for building the planning model.
+
+The script builds the model of all levels of the initial planning (without
+solving it) and prints the time of each step and the model size. It has to
+be executed in a course folder like the ``tutor-planner`` command::
+
+    python /path/to/tutor-planner/benchmarks/build_model.py --repeat 3
+
+To compare two revisions, check out the other revision (e.g. with
+``git worktree``) and run the script with ``PYTHONPATH`` pointing to it. Both
+runs should report the same number of variables, constraints and nonzeros.
+With ``--write``, the model is written to a file (e.g. ``model.lp``) that can
+be compared as well. ``--solver`` selects the solver backend (``gurobi`` or
+``highs``), so the build times of both backends can be compared. With
+``--families``, the time and size of each variable and constraint family of
+the last run is printed as well. ``--anonymous-names`` builds the model
+without names (``optimization_parameters.anonymous_names``), run the script
+once with and once without it to compare the build time and the peak RSS.
+"""
+
+__author__ = "Alexander Elvers <aelvers AT inet.tu-berlin.de>"
+
+import resource
+import time
+
+import click
+
+from tutorplanner.gurobiinterface.backend import BACKENDS
+from tutorplanner.gurobiinterface.initial import PlanningCreator
+from tutorplanner.input.data import Data
+from tutorplanner.input.plan import get_target_plan
+from tutorplanner.util import settings
+
+
+def build_model(target_plan, solver=None):
+    """
+    Build the model of all levels and return the planner and the time of each step.
+    """
+    pc = PlanningCreator(target_plan, solver=solver)
+    steps = [
+        ("basic model", pc.create_model_without_rooms),
+        ("level 1", lambda: (pc.plugin_constraint_bound_maximal_deviation_from_target_plan(max_deviation=0),
+                             pc.plugin_obj_minimize_deviation_from_plan())),
+        ("level 2", pc.plugin_obj_minimize_work_spread),
+        ("level 3", lambda: (pc.bound_maximal_work_spread(1.0), pc.plugin_obj_maximize_min_happiness(1.0))),
+        ("level 4", lambda: (pc.bound_min_happiness(1.0, 1.0), pc.plugin_obj_maximize_cube_happiness())),
+        ("level 5", lambda: (pc.bound_cube_happiness_from_below(0), pc.plugin_obj_minimize_mar_tel_hopping())),
+        ("level 6", lambda: (pc.create_constraint_minimal_mar_tel_hopping(0), pc.extend_model_with_room_support(),
+                             pc.plugin_objective_select_best_rooms())),
+        ("level 7", lambda: (pc.bound_best_rooms_from_below(0), pc.plugin_obj_maximize_tutor_room_stability())),
+        ("update", pc.solver.update),
+    ]
+    times = []
+    for name, step in steps:
+        start = time.perf_counter()
+        step()
+        times.append((name, time.perf_counter() - start))
+    return pc, times
+
+
+@click.command()
+@click.option("--repeat", default=1, help="number of builds")
+@click.option("--write", "output_file", type=click.Path(dir_okay=False), help="write the model to this file")
+@click.option("--solver", type=click.Choice(sorted(BACKENDS)), help="solver backend (default: from the settings)")
+@click.option("--families", is_flag=True, help="print the measurements of the variable and constraint families")
+@click.option("--anonymous-names", is_flag=True, help="only create the names when the model is written")
+def main(repeat, output_file, solver, families, anonymous_names):
+    """
+    Build the planning model and print the time of each step.
+    """
+    if anonymous_names:
+        settings.settings._data.setdefault("optimization_parameters", {})["anonymous_names"] = True
+    data = Data()
+    target_plan = get_target_plan()
+    click.echo(f"{len(data.tutor_by_name)} tutors, {len(data.room_by_name)} rooms")
+
+    totals = []
+    for i in range(repeat):
+        pc, times = build_model(target_plan, solver)
+        total = sum(t for _, t in times)
+        totals.append(total)
+        click.echo(f"run {i + 1}: " + ", ".join(f"{name} {t:.3f}s" for name, t in times) + f", total {total:.3f}s")
+
+    if families:
+        click.echo(pc.build_report.format_table())
+    variables, constraints, nonzeros = pc.solver.size()
+    click.secho(f"{pc.solver.name}: variables: {variables}, constraints: {constraints}, nonzeros: {nonzeros}",
+                bold=True)
+    click.secho(f"best build time: {min(totals):.3f}s", bold=True)
+    click.secho(f"peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB", bold=True)
+    if output_file:
+        pc.solver.write(output_file)
+
+
+if __name__ == "__main__":
+    main()
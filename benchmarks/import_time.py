@@ -0,0 +1,78 @@
+"""
+Benchmark of the start-up time of the command line.
+
+Each command is run with ``python -X importtime -m tutorplanner`` in the
+course folder (default: the current folder). The script prints the total
+import time of each command and the modules with the largest cumulative
+import time::
+
+    python /path/to/tutor-planner/benchmarks/import_time.py --folder /path/to/course
+
+The lightweight commands (the default commands) should stay below the target
+(``--target``, in milliseconds). The commands are imported on use (see
+:py:mod:`tutorplanner.__main__`), so only the planning commands should load
+the solver and only the output commands the plotting and template libraries.
+If a command exceeds the target, the script fails.
+"""
+
+__author__ = "Alexander Elvers <aelvers AT inet.tu-berlin.de>"
+
+import os
+import pathlib
+import re
+import subprocess
+import sys
+
+import click
+
+LIGHTWEIGHT_COMMANDS = ["--help", "tutor-mail-addresses", "state show"]
+LINE_PATTERN = re.compile(r"^import time:\s*(\d+) \|\s*(\d+) \|( *)(\S+)$")
+
+
+def measure(command, folder):
+    """
+    Run the command and return the import times as list of (module, self
+    time, cumulative time, depth) in microseconds.
+    """
+    env = dict(os.environ)
+    package_folder = str(pathlib.Path(__file__).resolve().parent.parent)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [package_folder, env.get("PYTHONPATH")]))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-m", "tutorplanner", *command.split()],
+                            cwd=folder, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                            universal_newlines=True)
+    if result.returncode != 0:
+        raise click.ClickException(f"{command} failed:\n{result.stderr[-1000:]}")
+    times = []
+    for line in result.stderr.splitlines():
+        match = LINE_PATTERN.match(line)
+        if match:
+            self_time, cumulative, indent, module = match.groups()
+            times.append((module, int(self_time), int(cumulative), (len(indent) - 1) // 2))
+    return times
+
+
+@click.command()
+@click.option("--command", "commands", multiple=True, default=LIGHTWEIGHT_COMMANDS,
+              help="command line arguments of tutorplanner (multiple)")
+@click.option("--folder", type=click.Path(exists=True, file_okay=False), default=".", help="course folder")
+@click.option("--target", default=300, help="maximal import time in milliseconds")
+@click.option("--top", default=10, help="number of modules to show")
+def main(commands, folder, target, top):
+    """
+    Measure the import time of commands of the command line.
+    """
+    failed = []
+    for command in commands:
+        times = measure(command, folder)
+        total = sum(cumulative for module, self_time, cumulative, depth in times if depth == 0) / 1000
+        click.echo(f"{command}: {total:.1f} ms")
+        for module, self_time, cumulative, depth in sorted(times, key=lambda t: -t[2])[:top]:
+            click.echo(f"  {cumulative / 1000:8.1f} ms  {module}")
+        if total > target:
+            failed.append(command)
+    if failed:
+        raise click.ClickException(f"above target of {target} ms: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Validation of the formulations of MAR/TEL hopping.
+
+The script builds the model of level 1 (the tasks are bounded by the target
+plan), solves it and minimizes the number of MAR/TEL hoppings afterwards
+with each formulation (``optimization_parameters.mar_tel_hopping_formulation``).
+Both formulations have to reach the same objective, which is also checked
+against the hoppings that are counted in the personal plans. It prints the
+size, the build time and the solve time of the hopping constraints. It has
+to be executed in a course folder like the ``tutor-planner`` command::
+
+    python /path/to/tutor-planner/benchmarks/mar_tel_hopping.py --solver highs
+"""
+
+__author__ = "Alexander Elvers <aelvers AT inet.tu-berlin.de>"
+
+import time
+
+import click
+
+from tutorplanner.gurobiinterface.backend import BACKENDS
+from tutorplanner.gurobiinterface.base import TASK_LOCATIONS
+from tutorplanner.gurobiinterface.initial import PlanningCreator
+from tutorplanner.input.data import Data
+from tutorplanner.input.plan import get_target_plan
+from tutorplanner.util import settings
+from tutorplanner.util.settings import DAYS, pre_hours_real, TASKS
+
+FORMULATIONS = ["pairwise", "compact"]
+
+
+def location(tutor_plan, day, hour):
+    """
+    Return the location of the tutor at the time slot or None.
+    """
+    for task in TASKS:
+        if tutor_plan[task][day][hour]:
+            return TASK_LOCATIONS[task]
+    return None
+
+
+def count_hoppings(personal_plans):
+    """
+    Count the changes between locations in consecutive hours.
+    """
+    count = 0
+    for tutor_plan in personal_plans.values():
+        for day in DAYS:
+            for hour in pre_hours_real(day):
+                first, second = location(tutor_plan, day, hour), location(tutor_plan, day, hour + 1)
+                count += first is not None and second is not None and first != second
+    return count
+
+
+def minimize_hoppings(target_plan, formulation, solver):
+    """
+    Minimize the hoppings with the formulation and return the planning
+    creator and the times.
+    """
+    settings.settings._data.setdefault("optimization_parameters", {})["mar_tel_hopping_formulation"] = formulation
+    pc = PlanningCreator(target_plan, solver=solver)
+    pc.create_model_without_rooms()
+    pc.plugin_constraint_bound_maximal_deviation_from_target_plan(max_deviation=0)
+    pc.plugin_obj_minimize_deviation_from_plan()
+    pc.solve_integer_program()
+    if not pc.get_status().is_feasible():
+        raise click.ClickException("level 1 is infeasible")
+    size = pc.solver.size()
+    start = time.perf_counter()
+    pc.plugin_obj_minimize_mar_tel_hopping()
+    build = time.perf_counter() - start
+    pc.set_relative_mip_gap(0.0)
+    start = time.perf_counter()
+    pc.solve_integer_program()
+    solve = time.perf_counter() - start
+    constraints, nonzeros = (new - old for new, old in zip(pc.solver.size()[1:], size[1:]))
+    return pc, build, solve, constraints, nonzeros
+
+
+@click.command()
+@click.option("--solver", type=click.Choice(sorted(BACKENDS)), help="solver backend (default: from the settings)")
+def main(solver):
+    """
+    Compare the formulations of MAR/TEL hopping.
+    """
+    Data()
+    target_plan = get_target_plan()
+    objectives = {}
+    for formulation in FORMULATIONS:
+        pc, build, solve, constraints, nonzeros = minimize_hoppings(target_plan, formulation, solver)
+        objective = pc.get_status().get_objective()
+        hoppings = count_hoppings(pc.get_personal_plans())
+        objectives[formulation] = objective
+        click.echo(f"{formulation}: objective {objective:.1f}, counted hoppings {hoppings}, "
+                   f"{constraints} constraints, {nonzeros} nonzeros, build {build:.3f}s, solve {solve:.3f}s")
+        if round(objective) != hoppings:
+            raise click.ClickException(f"{formulation}: objective does not match the counted hoppings")
+    if len({round(objective) for objective in objectives.values()}) > 1:
+        raise click.ClickException("the formulations have different objectives")
+    click.secho("the formulations have the same objective", bold=True)
+
+
+if __name__ == "__main__":
+    main()
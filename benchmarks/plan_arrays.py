@@ -0,0 +1,116 @@
+"""
+Benchmark of the array representation of personal plans.
+
+For each number of tutors, two random personal room plans and a random
+availability are generated. The script prints the memory of the dicts and
+of the arrays (see :py:mod:`tutorplanner.input.plan_array`) and the time of
+workload, happiness and the changes between both plans with the functions
+of the dicts and with the arrays::
+
+    python /path/to/tutor-planner/benchmarks/plan_arrays.py --tutors 100 --tutors 1000
+
+The results of both representations are compared.
+"""
+
+__author__ = "Alexander Elvers <aelvers AT inet.tu-berlin.de>"
+
+import random
+import time
+import tracemalloc
+
+import click
+import numpy as np
+
+from tutorplanner.input import plan
+from tutorplanner.input.plan_array import PersonalPlanArray, DAY_POSITIONS, HOUR_POSITIONS
+from tutorplanner.util.settings import DAYS, hours_real, TASKS
+
+ROOMS = [f"MAR 0.{i:03d}" for i in range(40)]
+
+
+def random_room_plans(tutors, rnd, workload=0.2):
+    """
+    Return personal room plans with a random task in a fraction of the time
+    slots.
+    """
+    plans = {}
+    for tutor in tutors:
+        tutor_plan = {task: {day: dict.fromkeys(hours_real(day), "") for day in DAYS} for task in TASKS}
+        for day in DAYS:
+            for hour in hours_real(day):
+                if rnd.random() < workload:
+                    tutor_plan[rnd.choice(TASKS)][day][hour] = rnd.choice(ROOMS)
+        plans[tutor] = tutor_plan
+    return plans
+
+
+def legacy_changes(tutors, old_plan, new_plan):
+    """
+    Changes of the plans like in the former write_diff.
+    """
+    changes = []
+    for tutor in tutors:
+        for day in DAYS:
+            for hour in hours_real(day):
+                old_task = new_task = old_room = new_room = None
+                for task in TASKS:
+                    if old_plan[tutor][task][day][hour]:
+                        old_task, old_room = task, old_plan[tutor][task][day][hour]
+                    if new_plan[tutor][task][day][hour]:
+                        new_task, new_room = task, new_plan[tutor][task][day][hour]
+                if old_task != new_task or old_room != new_room:
+                    changes.append((tutor, day, hour, old_task, new_task, old_room, new_room))
+    return changes
+
+
+def measure(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+@click.command()
+@click.option("--tutors", "sizes", multiple=True, type=int, default=[100, 1000], help="number of tutors (multiple)")
+@click.option("--seed", default=0, help="seed of the plans")
+def main(sizes, seed):
+    """
+    Compare the dicts and the arrays of personal plans.
+    """
+    for size in sizes:
+        rnd = random.Random(seed)
+        tutors = [f"Tutor{i:05d}" for i in range(size)]
+        tracemalloc.start()
+        old_plan = random_room_plans(tutors, rnd)
+        dict_memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        new_plan = random_room_plans(tutors, rnd)
+        availability = {tutor: {day: {hour: rnd.randint(0, 3) for hour in hours_real(day)} for day in DAYS}
+                        for tutor in tutors}
+
+        (old, new), convert_time = measure(lambda: (PersonalPlanArray.from_dict(old_plan),
+                                                    PersonalPlanArray.from_dict(new_plan)))
+        availability_array = np.zeros(old.tasks.shape, dtype=np.int8)
+        for t, tutor in enumerate(tutors):
+            for day in DAYS:
+                for hour in hours_real(day):
+                    availability_array[t, DAY_POSITIONS[day], HOUR_POSITIONS[hour]] = availability[tutor][day][hour]
+
+        rows = [
+            ("workload", lambda: [plan.compute_workload(old_plan[tutor]) for tutor in tutors],
+             lambda: old.workload().tolist()),
+            ("happiness", lambda: [plan.compute_happiness(old_plan[tutor], availability[tutor]) for tutor in tutors],
+             lambda: old.happiness(availability_array).tolist()),
+            ("changes", lambda: legacy_changes(tutors, old_plan, new_plan), lambda: list(old.changes(new))),
+        ]
+        click.echo(f"{size} tutors: memory {dict_memory / 1e6:.2f} MB (dicts), {old.nbytes / 1e6:.3f} MB (arrays), "
+                   f"conversion {convert_time:.3f}s")
+        for name, legacy, vectorized in rows:
+            expected, legacy_time = measure(legacy)
+            result, array_time = measure(vectorized)
+            if result != expected:
+                raise click.ClickException(f"{size} tutors: different {name}")
+            click.echo(f"  {name}: {legacy_time:.4f}s (dicts), {array_time:.4f}s (arrays)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark of loading the plan file.
+
+For each number of tutors, random personal room plans (see
+``plan_arrays.py``) are saved as the pickled dicts of former versions and as
+plan file (see :py:mod:`tutorplanner.input.plan_file`) in a temporary
+folder. The script prints the size of the files and the time of loading the
+personal room plans from the pickles, of loading the plan file and of loading
+the plan file and converting it to the dicts::
+
+    python /path/to/tutor-planner/benchmarks/plan_file.py --tutors 1000 --tutors 5000
+
+The loaded plans are compared with the original ones.
+"""
+
+__author__ = "Alexander Elvers <aelvers AT inet.tu-berlin.de>"
+
+import pathlib
+import pickle
+import random
+import tempfile
+import time
+
+import click
+
+from plan_arrays import random_room_plans
+from tutorplanner.input import plan_file
+from tutorplanner.input.plan_array import PersonalPlanArray
+
+
+def measure(function, repeat):
+    """
+    Return the result and the minimum time of the function.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+
+@click.command()
+@click.option("--tutors", "sizes", multiple=True, type=int, default=[1000, 5000], help="number of tutors (multiple)")
+@click.option("--repeat", default=5, help="number of repetitions (minimum time is printed)")
+@click.option("--seed", default=0, help="seed of the plans")
+def main(sizes, repeat, seed):
+    """
+    Compare loading the pickled plans and the plan file.
+    """
+    for size in sizes:
+        room_plans = random_room_plans([f"Tutor{i:05d}" for i in range(size)], random.Random(seed))
+        with tempfile.TemporaryDirectory() as folder:
+            folder = pathlib.Path(folder)
+            pickle_path = folder / "personalPlans_Rooms.pickle"
+            with open(pickle_path, "wb") as f:
+                pickle.dump(room_plans, f)
+            plan_file.save_plan(folder, PersonalPlanArray.from_dict(room_plans))
+            plan_path = folder / plan_file.PLAN_FILE
+
+            def load_pickle():
+                with open(pickle_path, "rb") as f:
+                    return pickle.load(f)
+
+            pickled, pickle_time = measure(load_pickle, repeat)
+            stored, load_time = measure(lambda: plan_file.read_plan_file(plan_path), repeat)
+            converted, convert_time = measure(lambda: plan_file.read_plan_file(plan_path).personal_room_plans, repeat)
+            if not pickled == converted == stored.personal_room_plans == room_plans:
+                raise click.ClickException(f"{size} tutors: different plans")
+            click.echo(f"{size} tutors: pickle {pickle_path.stat().st_size / 1e6:.2f} MB, "
+                       f"plan file {plan_path.stat().st_size / 1e6:.2f} MB")
+            click.echo(f"  load: {pickle_time * 1e3:.1f} ms (pickle), {load_time * 1e3:.2f} ms (plan file), "
+                       f"{convert_time * 1e3:.1f} ms (plan file with dicts)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark of the views of the active plan.
+
+For each number of tutors, random personal room plans (see
+``plan_arrays.py``) are saved as pickle and as plan file (see
+:py:mod:`tutorplanner.input.plan_file`). Like ``output tutor-schedule``, the
+rooms by day, the tutorials and the extended tutorials are requested. The
+script prints the time of the former functions, which load the pickle and
+iterate over the plan for each view, and of
+:py:class:`tutorplanner.read_pickled_files.PlanIndex`, which loads the plan
+file once and builds all views in a single pass (the check of the plan is
+left out in both cases)::
+
+    python /path/to/tutor-planner/benchmarks/plan_index.py --tutors 1000 --tutors 5000
+
+The views of both implementations are compared.
+"""
+
+__author__ = "Alexander Elvers <aelvers AT inet.tu-berlin.de>"
+
+import pathlib
+import pickle
+import random
+import tempfile
+import time
+from collections import defaultdict
+
+import click
+
+from plan_arrays import random_room_plans
+from tutorplanner.input import plan_file
+from tutorplanner.read_pickled_files import PlanIndex, latex_fix
+from tutorplanner.util.settings import TASKS, TUTORIUM
+
+
+def legacy_rooms_by_day(plan):
+    rooms = {}
+    for tutor in plan:
+        for task, schedule in plan[tutor].items():
+            for day, times in schedule.items():
+                if day not in rooms:
+                    rooms[day] = {}
+                for time_, room in times.items():
+                    if room:
+                        if room not in rooms[day]:
+                            rooms[day][room] = {}
+                        rooms[day][room].update({time_: (latex_fix(tutor), task)})
+    return rooms
+
+
+def legacy_tutorials_for_tickets(plan):
+    tutorials = defaultdict(list)
+    for tutor in plan:
+        for day, times in plan[tutor][TUTORIUM].items():
+            for time_, room in times.items():
+                if room:
+                    tutorials[day].append((time_, room, tutor))
+    return tutorials
+
+
+def legacy_extended_tutorials(plan):
+    tutorials = {}
+    for tutor in plan:
+        for task in TASKS:
+            for day, times in plan[tutor][task].items():
+                if day not in tutorials:
+                    tutorials[day] = {}
+                for time_, room in times.items():
+                    if room:
+                        if time_ not in tutorials[day]:
+                            tutorials[day][time_] = {}
+                        if room not in tutorials[day][time_]:
+                            tutorials[day][time_][room] = []
+                        tutorials[day][time_][room].append(latex_fix(tutor))
+    return tutorials
+
+
+@click.command()
+@click.option("--tutors", "sizes", multiple=True, type=int, default=[1000, 5000], help="number of tutors (multiple)")
+@click.option("--seed", default=0, help="seed of the plans")
+def main(sizes, seed):
+    """
+    Compare the views of the former functions and of the plan index.
+    """
+    for size in sizes:
+        room_plans = random_room_plans([f"Tutor{i:05d}" for i in range(size)], random.Random(seed))
+        with tempfile.TemporaryDirectory() as folder:
+            folder = pathlib.Path(folder)
+            pickle_path = folder / "personalPlans_Rooms.pickle"
+            with open(pickle_path, "wb") as f:
+                pickle.dump(room_plans, f)
+            plan_file.save_plan(folder, room_plans)
+
+            start = time.perf_counter()
+            expected = []
+            for view in [legacy_rooms_by_day, legacy_tutorials_for_tickets, legacy_extended_tutorials]:
+                with open(pickle_path, "rb") as f:
+                    expected.append(view(pickle.load(f)))
+            legacy_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            index = PlanIndex(plan_file.read_plan_file(folder / plan_file.PLAN_FILE))
+            result = [index.view(name) for name in ["rooms_by_day", "tutorials_for_tickets", "extended_tutorials"]]
+            index_time = time.perf_counter() - start
+
+        if result != expected:
+            raise click.ClickException(f"{size} tutors: different views")
+        click.echo(f"{size} tutors: {legacy_time:.3f}s (former functions), {index_time:.3f}s (plan index)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Benchmark suite for initial and rolling wave planning.
+
+For each size of the sweep, a synthetic scenario is generated (see
+``scenario.py``) and initial planning and rolling wave planning are run on
+it. The suite measures the data loading and, for each level, the model
+building, solving and the extraction of the plans (from the build report of
+the planning creator, see :py:mod:`tutorplanner.gurobiinterface.instrumentation`).
+The remaining time of planning is the output writing (plan files, plots, LP
+and solution files)::
+
+    python /path/to/tutor-planner/benchmarks/planning_suite.py --size 10x5 --size 40x20 --solver highs
+
+A size is given as number of tutors and number of tutorial rooms. The
+results are written as JSON (``--output``, default ``benchmark_results.json``),
+so that the results of two revisions can be compared. The scenarios are
+generated in a temporary folder unless ``--folder`` is given.
+"""
+
+__author__ = "Alexander Elvers <aelvers AT inet.tu-berlin.de>"
+
+import contextlib
+import datetime
+import io
+import json
+import pathlib
+import tempfile
+import time
+
+import click
+
+from scenario import generate_scenario, use_scenario
+from tutorplanner.gurobiinterface.backend import BACKENDS
+from tutorplanner.input import plan
+from tutorplanner.input.data import Data
+from tutorplanner.input.plan import get_target_plan
+from tutorplanner.planning import initial, rolling
+from tutorplanner.util.settings import DAYS
+
+
+def load_data():
+    """
+    Load all data that planning needs and return the target plan.
+    """
+    data = Data()
+    data.tutor_by_name
+    data.room_by_name
+    data.availability
+    data.bookings_tutorials
+    data.bookings_pools
+    return get_target_plan()
+
+
+def run_planning(plan_levels, *args):
+    """
+    Run the planning levels and return the planning creator and the times.
+    """
+    start = time.perf_counter()
+    pc, level_solutions = plan_levels(*args)
+    total = time.perf_counter() - start
+    report = pc.build_report
+    levels = {}
+    for level, objective in level_solutions.items():
+        name = f"Level_{level}"
+        levels[name] = {
+            "objective": objective,
+            "build": report.total_time("build", name),
+            "solve": report.total_time("solve", name),
+            "extract": report.total_time("extract", name),
+        }
+    build, solve, extract = (report.total_time(phase) for phase in ("build", "solve", "extract"))
+    variables, constraints, nonzeros = pc.solver.size()
+    return pc, {
+        "total": total,
+        "build": build,
+        "solve": solve,
+        "extract": extract,
+        "output": total - build - solve - extract,
+        "variables": variables,
+        "constraints": constraints,
+        "nonzeros": nonzeros,
+        "levels": levels,
+    }
+
+
+def benchmark_scenario(folder, horizon):
+    """
+    Run initial planning and rolling wave planning for the last ``horizon``
+    days on the scenario in the folder.
+    """
+    result = {}
+    with use_scenario(folder):
+        start = time.perf_counter()
+        target_plan = load_data()
+        result["data_loading"] = time.perf_counter() - start
+
+        initial_folder = plan.get_new_plan_folder("initial")
+        pc, result["initial"] = run_planning(initial.plan_levels, target_plan, initial_folder)
+
+        past_plan = pc.get_personal_room_plans()
+        next_day = len(DAYS) - horizon + 1
+        rolling_folder = plan.get_new_plan_folder("rolling")
+        _, result["rolling"] = run_planning(rolling.plan_levels, target_plan, past_plan, next_day, rolling_folder)
+    return result
+
+
+def parse_size(size):
+    tutors, rooms = size.split("x")
+    return int(tutors), int(rooms)
+
+
+@click.command()
+@click.option("--size", "sizes", multiple=True, default=["10x5", "20x10", "40x20"],
+              help="number of tutors and tutorial rooms, e.g. 20x10 (multiple)")
+@click.option("--density", default=0.6, help="availability density of the tutors")
+@click.option("--horizon", default=5, help="number of days planned by rolling wave planning")
+@click.option("--seed", default=0, help="seed of the scenarios")
+@click.option("--solver", type=click.Choice(sorted(BACKENDS)), help="solver backend (default: gurobi)")
+@click.option("--time-limits", nargs=2, type=int, default=(20, 60), help="short and long time limit")
+@click.option("--folder", type=click.Path(file_okay=False), help="folder for the scenarios (default: temporary)")
+@click.option("--output", "output_file", default="benchmark_results.json", type=click.Path(dir_okay=False),
+              help="results file")
+@click.option("--verbose", is_flag=True, help="show the output of the planner")
+def main(sizes, density, horizon, seed, solver, time_limits, folder, output_file, verbose):
+    """
+    Run the planning benchmark on synthetic scenarios.
+    """
+    results = {"date": f"{datetime.datetime.now():%Y-%m-%d %H:%M:%S}", "solver": solver or "gurobi",
+               "density": density, "horizon": horizon, "seed": seed, "runs": []}
+    with contextlib.ExitStack() as stack:
+        if folder is None:
+            folder = stack.enter_context(tempfile.TemporaryDirectory())
+        for size in sizes:
+            tutors, rooms = parse_size(size)
+            scenario_folder = pathlib.Path(folder) / size
+            generate_scenario(scenario_folder, tutors, rooms, density, seed=seed, solver=solver,
+                              time_limits=time_limits)
+            try:
+                with contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO()):
+                    run = benchmark_scenario(scenario_folder, horizon)
+            except Exception as e:
+                # e.g. no solution within the time limit, the other sizes are still run
+                click.secho(f"{size}: {e}", fg="red")
+                results["runs"].append({"size": size, "tutors": tutors, "rooms": rooms, "error": str(e)})
+                continue
+            run.update(size=size, tutors=tutors, rooms=rooms)
+            results["runs"].append(run)
+            click.echo(f"{size}: data {run['data_loading']:.3f}s")
+            for planning in ("initial", "rolling"):
+                timing = run[planning]
+                click.echo(f"  {planning}: build {timing['build']:.3f}s, solve {timing['solve']:.3f}s, "
+                           f"extract {timing['extract']:.3f}s, output {timing['output']:.3f}s, "
+                           f"{timing['variables']} variables, {timing['constraints']} constraints")
+
+    with open(output_file, "w") as f:
+        json.dump(results, f, indent=2)
+    click.secho(f"results written to {output_file}", bold=True)
+
+
+if __name__ == "__main__":
+    main()
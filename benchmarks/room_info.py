@@ -0,0 +1,92 @@
+"""
+Micro-benchmark of the room information of the room patterns.
+
+The room patterns are generated like in the synthetic scenarios (see
+``scenario.py``): patterns of the whole university and of buildings and one
+pattern per tutorial room. The room information of all rooms is looked up
+several times (like in the evaluation of a plan) with
+:py:func:`tutorplanner.util.settings.get_room_info`. A sample of the rooms is
+looked up with a reference implementation that compiles the patterns on
+every lookup, its time is extrapolated to all lookups. The script prints the
+times and checks that the results of the sample are equal::
+
+    python /path/to/tutor-planner/benchmarks/room_info.py --rooms 1000 --rooms 5000
+"""
+
+__author__ = "Alexander Elvers <aelvers AT inet.tu-berlin.de>"
+
+import random
+import re
+import time
+
+import click
+
+from scenario import POOL_ROOMS, tutorial_room_names
+from tutorplanner.util import settings
+
+
+def get_room_info_uncompiled(room_patterns, room_name):
+    """
+    Reference implementation that compiles each pattern on every lookup.
+    """
+    info = dict(type=None, capacity=None, projector=None, tutorial_size=None)
+    for room_pattern in room_patterns:
+        pattern = room_pattern.get("pattern", "*")
+        regex = re.compile("^{}$".format(".*".join(map(re.escape, pattern.split("*")))), re.IGNORECASE)
+        if regex.match(room_name):
+            for attribute in info:
+                if attribute in room_pattern:
+                    info[attribute] = room_pattern[attribute]
+    if info["projector"] is not None:
+        info["projector"] = bool(info["projector"])
+    return info
+
+
+def generate_room_patterns(room_names, rnd):
+    room_patterns = [
+        {"pattern": "*", "type": "tutorial", "projector": 1, "capacity": 30},
+        {"pattern": "MAR 6.*", "type": "exerciseMAR", "capacity": 24},
+        {"pattern": "TEL *", "type": "exercise", "capacity": 24},
+        {"pattern": "TEL 109", "type": "grading", "capacity": 12},
+        {"pattern": "FH *", "projector": 0},
+    ]
+    room_patterns.extend({"pattern": room, "capacity": rnd.choice([20, 24, 30, 40])} for room in room_names)
+    return room_patterns
+
+
+@click.command()
+@click.option("--rooms", "sizes", multiple=True, type=int, default=[1000, 5000],
+              help="number of tutorial rooms (multiple)")
+@click.option("--lookups", default=10, help="number of lookups of each room")
+@click.option("--sample", default=100, help="number of rooms of the reference implementation")
+@click.option("--seed", default=0, help="seed of the patterns")
+def main(sizes, lookups, sample, seed):
+    """
+    Compare the lookup of the room information with and without compiled
+    patterns.
+    """
+    for size in sizes:
+        rnd = random.Random(seed)
+        room_names = tutorial_room_names(size) + POOL_ROOMS
+        room_patterns = generate_room_patterns(room_names[:size], rnd)
+        names = room_names * lookups
+        rnd.shuffle(names)
+
+        sample_names = rnd.sample(room_names, min(sample, len(room_names)))
+        start = time.perf_counter()
+        expected = {name: get_room_info_uncompiled(room_patterns, name) for name in sample_names}
+        reference_time = (time.perf_counter() - start) * len(names) / len(sample_names)
+
+        settings.settings._data = {"room_patterns": room_patterns}
+        start = time.perf_counter()
+        results = [settings.get_room_info(name) for name in names]
+        compiled_time = time.perf_counter() - start
+
+        if any(result != expected[name] for name, result in zip(names, results) if name in expected):
+            raise click.ClickException(f"{size} rooms: different room information")
+        click.echo(f"{size} rooms, {len(names)} lookups: reference {reference_time:.3f}s (extrapolated), "
+                   f"compiled {compiled_time:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
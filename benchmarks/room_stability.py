@@ -0,0 +1,117 @@
+"""
+Benchmark of the formulations of tutor--room stability.
+
+For each size, a synthetic scenario is generated (see ``scenario.py``) and
+the tasks of level 1 are planned once. With these tasks fixed, the room
+levels of initial planning (best rooms, then tutor--room stability) are
+solved with each formulation
+(``optimization_parameters.room_stability_formulation``). The script prints
+the size of the stability constraints, the build and solve time of the last
+level and its objective::
+
+    python /path/to/tutor-planner/benchmarks/room_stability.py --size 20x10 --size 40x20 --solver highs
+
+Both formulations should reach the same objective if the level is solved to
+optimality within the time limit.
+"""
+
+__author__ = "Alexander Elvers <aelvers AT inet.tu-berlin.de>"
+
+import contextlib
+import io
+import pathlib
+import tempfile
+
+import click
+
+from scenario import generate_scenario, use_scenario
+from tutorplanner.gurobiinterface.backend import BACKENDS
+from tutorplanner.gurobiinterface.initial import PlanningCreator
+from tutorplanner.input.data import Data
+from tutorplanner.input.plan import get_target_plan
+from tutorplanner.util import settings
+
+FORMULATIONS = ["per_room", "compact"]
+
+
+def plan_tasks(target_plan):
+    """
+    Solve level 1 and return the assignments of the solution.
+    """
+    pc = PlanningCreator(target_plan)
+    pc.create_model_without_rooms()
+    pc.plugin_constraint_bound_maximal_deviation_from_target_plan(max_deviation=0)
+    pc.plugin_obj_minimize_deviation_from_plan()
+    pc.solve_integer_program()
+    if not pc.get_status().is_feasible():
+        raise click.ClickException("level 1 is infeasible")
+    return [key for key in pc.schedule_entry.keys if pc.check_assignment(*key)]
+
+
+def plan_rooms(target_plan, assignments, formulation):
+    """
+    Solve the room levels for fixed tasks and return the measurements of
+    the stability level.
+    """
+    settings.settings._data["optimization_parameters"]["room_stability_formulation"] = formulation
+    pc = PlanningCreator(target_plan, level=6)
+    pc.create_fixed_task_variables(assignments)
+    pc.extend_model_with_room_support()
+    pc.plugin_objective_select_best_rooms()
+    pc.solve_integer_program()
+    if not pc.get_status().is_feasible():
+        raise click.ClickException("level 6 is infeasible")
+    pc.name = "Level_7"
+    rel = settings.settings.optimization_parameters.bounds.best_rooms._or(0.999)()
+    pc.bound_best_rooms_from_below(pc.get_status().get_objective() * rel)
+    pc.plugin_obj_maximize_tutor_room_stability()
+    pc.solve_integer_program()
+    report = pc.build_report
+    record = next(record for record in report.records if record["name"] == "create_tutor_room_stability_variables")
+    return {
+        "objective": pc.get_status().get_objective() if pc.get_status().is_feasible() else None,
+        "variables": record["variables"],
+        "constraints": record["constraints"],
+        "nonzeros": record["nonzeros"],
+        "build": report.total_time("build", "Level_7"),
+        "solve": report.total_time("solve", "Level_7"),
+    }
+
+
+@click.command()
+@click.option("--size", "sizes", multiple=True, default=["20x10", "40x20"],
+              help="number of tutors and tutorial rooms, e.g. 20x10 (multiple)")
+@click.option("--density", default=0.6, help="availability density of the tutors")
+@click.option("--seed", default=0, help="seed of the scenarios")
+@click.option("--solver", type=click.Choice(sorted(BACKENDS)), help="solver backend (default: gurobi)")
+@click.option("--time-limits", nargs=2, type=int, default=(20, 60), help="short and long time limit")
+@click.option("--folder", type=click.Path(file_okay=False), help="folder for the scenarios (default: temporary)")
+@click.option("--verbose", is_flag=True, help="show the output of the planner")
+def main(sizes, density, seed, solver, time_limits, folder, verbose):
+    """
+    Compare the formulations of tutor--room stability on synthetic scenarios.
+    """
+    with contextlib.ExitStack() as stack:
+        if folder is None:
+            folder = stack.enter_context(tempfile.TemporaryDirectory())
+        for size in sizes:
+            tutors, rooms = map(int, size.split("x"))
+            scenario_folder = pathlib.Path(folder) / size
+            generate_scenario(scenario_folder, tutors, rooms, density, seed=seed, solver=solver,
+                              time_limits=time_limits)
+            with use_scenario(scenario_folder):
+                Data()
+                target_plan = get_target_plan()
+                with contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO()):
+                    assignments = plan_tasks(target_plan)
+                for formulation in FORMULATIONS:
+                    with contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO()):
+                        result = plan_rooms(target_plan, assignments, formulation)
+                    click.echo(f"{size} {formulation}: objective {result['objective']}, "
+                               f"{result['variables']} variables, {result['constraints']} constraints, "
+                               f"{result['nonzeros']} nonzeros, build {result['build']:.3f}s, "
+                               f"solve {result['solve']:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""
+Generator of synthetic scenarios.
+
+A scenario is a complete course folder: ``settings.yaml``, the tutor
+responses (one CSV file per tutor in the format of
+:py:meth:`tutorplanner.input.tutor.Tutor.load_from_file`), the room bookings
+(``bookings.csv``) and ``planner.xlsx`` with the ``Target`` sheet. The size is
+given by the number of tutors, the number of tutorial rooms and the
+availability density of the tutors::
+
+    python /path/to/tutor-planner/benchmarks/scenario.py FOLDER --tutors 40 --rooms 15
+
+The course always has two weeks, since the planner plans ten days
+(:py:data:`tutorplanner.util.settings.DAYS`).
+
+The target plan is derived from a random plan that satisfies the working
+hours and pauses of all tutors. Each tutor works at least the lower bound
+of the fair share in each week (``max_slack`` of the planning creators), the
+availability of a week is drawn again if it does not allow this. So level 1
+of initial planning is feasible.
+"""
+
+__author__ = "Alexander Elvers <aelvers AT inet.tu-berlin.de>"
+
+import contextlib
+import csv
+import datetime
+import math
+import os
+import pathlib
+import random
+
+import click
+import yaml
+
+from tutorplanner.input import plan, rooms
+from tutorplanner.input.data import Data
+from tutorplanner.util import settings
+from tutorplanner.util.settings import DAYS, hours_real, TASKS, TUTORIUM
+
+FIRST_DAY = datetime.date(2016, 10, 17)
+TIMES = [10, 12, 14, 16]
+POOL_ROOMS = ["MAR 6.001", "MAR 6.057", "TEL 103", "TEL 106li", "TEL 106re", "TEL 109", "TEL 206li", "TEL 206re"]
+# prefixes of tutorial rooms, MAR and FH are the best rooms
+ROOM_PREFIXES = ["MAR 0.", "FH 3", "H 30", "MA 5"]
+# lower bound of the weekly working hours relative to the expected ones (max_slack of the planning creators)
+MIN_WORKLOAD = 0.6
+
+
+def course_days():
+    """
+    Return the dates of the two weeks (Monday to Friday).
+    """
+    return [FIRST_DAY + datetime.timedelta(days=7 * (i // 5) + i % 5) for i in range(len(DAYS))]
+
+
+def tutorial_room_names(number_of_rooms):
+    """
+    Return the names of the tutorial rooms.
+
+    >>> tutorial_room_names(5)
+    ['MAR 0.000', 'FH 3001', 'H 30002', 'MA 5003', 'MAR 0.004']
+    """
+    return [f"{ROOM_PREFIXES[i % len(ROOM_PREFIXES)]}{i:03d}" for i in range(number_of_rooms)]
+
+
+@contextlib.contextmanager
+def use_scenario(folder):
+    """
+    Change the working directory to the scenario and load its settings and
+    data. The previous state is restored afterwards.
+    """
+    cwd = os.getcwd()
+    old_settings = settings.settings._data
+    old_data = Data._instance
+    os.chdir(folder)
+    try:
+        settings.settings._data = settings.load_settings()._data
+        Data._instance = None
+        yield
+    finally:
+        os.chdir(cwd)
+        settings.settings._data = old_settings
+        Data._instance = old_data
+
+
+def generate_settings(folder, tutorial_rooms, rnd, solver=None, time_limits=(20, 60)):
+    days = course_days()
+    room_patterns = [
+        {"pattern": "*", "type": "tutorial", "projector": 1, "capacity": 30},
+        {"pattern": "MAR 6.*", "type": "exerciseMAR", "capacity": 24},
+        {"pattern": "TEL *", "type": "exercise", "capacity": 24},
+        {"pattern": "TEL 109", "type": "grading", "capacity": 12},
+    ]
+    room_patterns.extend({"pattern": room, "capacity": rnd.choice([20, 24, 30, 40])} for room in tutorial_rooms)
+    optimization_parameters = {"time_limits": {"short": time_limits[0], "long": time_limits[1]}}
+    if solver is not None:
+        optimization_parameters["solver"] = solver
+    data = {
+        "paths": {"tutor_responses": ["tutors"], "bookings": "bookings.csv", "planner": "planner.xlsx",
+                  "plans": "plans"},
+        "times": TIMES,
+        "days": days,
+        "forbidden_timeslots": {day: [] for day in days},
+        "room_patterns": room_patterns,
+        "optimization_parameters": optimization_parameters,
+    }
+    with open(folder / "settings.yaml", "w") as f:
+        yaml.safe_dump(data, f)
+
+
+def minimal_hours(monthly_work_hours):
+    """
+    Return the lower bound of the working hours of a tutor in a week.
+
+    >>> minimal_hours(40), minimal_hours(60), minimal_hours(80)
+    (6, 9, 12)
+    """
+    return math.ceil(monthly_work_hours / 4 * MIN_WORKLOAD)
+
+
+def working_slots(slots, hours):
+    """
+    Select up to ``hours`` of the (day, hour) slots in the given order, with
+    at most two hours in a row, so that the tutor has enough pauses. For
+    sorted slots, the number of selected slots is maximal.
+
+    >>> working_slots([(1, 10), (1, 11), (1, 12), (1, 13), (2, 10)], 10)
+    [(1, 10), (1, 11), (1, 13), (2, 10)]
+    """
+    working = []
+    selected = set()
+    for day, hour in slots:
+        if len(working) == hours:
+            break
+        if (day, hour - 1) in selected and ((day, hour - 2) in selected or (day, hour + 1) in selected) \
+                or (day, hour + 1) in selected and (day, hour + 2) in selected:
+            continue
+        working.append((day, hour))
+        selected.add((day, hour))
+    return working
+
+
+def generate_tutor(folder, number, density, rnd):
+    """
+    Write the response of a tutor. Each time slot is available with the
+    probability ``density`` (with a random availability of 1 to 3). The
+    availability of a week is drawn again until the tutor can work the
+    minimal hours (see :py:func:`minimal_hours`).
+    """
+    days = course_days()
+    monthly_work_hours = rnd.choice([40, 60, 80])
+    lines = [
+        ["Name", f"Tutor{number:04d}"], ["Vorname", "Synthetic"], ["E-Mail", f"tutor{number}@example.com"],
+        ["Fachgebiet", "INET"], ["Mobil", "-"], ["Monatsstunden", str(monthly_work_hours)],
+        ["max. Stunden ohne Pause", "3"], ["max. Tutorien ohne Pause", "2"], ["C-Kenntnisse", str(rnd.randrange(4))],
+        ["unsicher (2. Woche)", "0"],
+    ]
+    for week in range(2):
+        week_days = days[5 * week:5 * week + 5]
+        while True:
+            availability = {time: [rnd.randint(1, 3) if rnd.random() < density else 0 for _ in week_days]
+                            for time in TIMES}
+            slots = sorted((day, time + i) for time in TIMES for day in range(5) if availability[time][day]
+                           for i in range(TIMES[1] - TIMES[0]))
+            if len(working_slots(slots, math.inf)) >= minimal_hours(monthly_work_hours):
+                break
+        lines.append([])
+        lines.append(["", ""] + [f"{day:%d.%m.}" for day in week_days])
+        lines.append(["", "Uhrzeit"] + [settings.weekdays[day.weekday()] for day in week_days])
+        for time in TIMES:
+            lines.append(["", str(time)] + [str(value) for value in availability[time]])
+    with open(folder / "tutors" / f"tutor{number:04d}.csv", "w") as f:
+        csv.writer(f, delimiter="\t").writerows(lines)
+
+
+def generate_bookings(folder, tutorial_rooms, booking_density, rnd):
+    """
+    Write the room bookings. Pools are booked at all times, tutorial rooms
+    with the probability ``booking_density``.
+    """
+    all_rooms = []
+    for name in tutorial_rooms + POOL_ROOMS:
+        room = rooms.Room(name)
+        for day in course_days():
+            for time in TIMES:
+                if name in POOL_ROOMS or rnd.random() < booking_density:
+                    room.book(day, time)
+        all_rooms.append(room)
+    rooms.export_rooms_to_csv(str(folder / "bookings.csv"), all_rooms)
+
+
+def random_plan(rnd, workload=0.8, attempts=10):
+    """
+    Create the number of tutors per task and time slot of a random plan
+    that satisfies the working hours and pauses of all tutors. Each tutor
+    works ``workload`` times the expected working hours in each week, but at
+    least the minimal hours (see :py:func:`minimal_hours`). If no random
+    selection of the time slots reaches them, the time slots are selected in
+    order, which gives the maximal number of hours.
+    """
+    data = Data()
+    target_plan = plan.get_empty_plan()
+    for task in TASKS:
+        for day in DAYS:
+            for hour in hours_real(day):
+                target_plan[task][day][hour] = 0
+    for tutor in data.tutor_by_name.values():
+        for days in (DAYS[:5], DAYS[5:]):
+            minimum = minimal_hours(tutor.monthly_work_hours)
+            hours = max(round(workload * tutor.monthly_work_hours / 4), minimum)
+            slots = [(day, hour) for day in days for hour in hours_real(day)
+                     if data.availability[tutor.last_name][day][hour]]
+            for _ in range(attempts):
+                rnd.shuffle(slots)
+                working = working_slots(slots, hours)
+                if len(working) >= minimum:
+                    break
+            else:
+                working = working_slots(sorted(slots), hours)
+            for day, hour in working:
+                tasks = [task for task in TASKS if task != TUTORIUM
+                         or target_plan[TUTORIUM][day][hour] < data.get_number_of_tutorial_rooms(day, hour)]
+                task = rnd.choice(tasks)
+                target_plan[task][day][hour] += 1
+    return target_plan
+
+
+def generate_scenario(folder, tutors=20, tutorial_rooms=10, density=0.6, booking_density=0.6, seed=0,
+                      solver=None, time_limits=(20, 60)):
+    """
+    Generate a scenario in the folder.
+    """
+    rnd = random.Random(seed)
+    folder = pathlib.Path(folder)
+    (folder / "tutors").mkdir(parents=True, exist_ok=True)
+    room_names = tutorial_room_names(tutorial_rooms)
+    generate_settings(folder, room_names, rnd, solver, time_limits)
+    with use_scenario(folder):
+        for number in range(tutors):
+            generate_tutor(folder.resolve(), number, density, rnd)
+        generate_bookings(folder.resolve(), room_names, booking_density, rnd)
+        target_plan = random_plan(rnd)
+        with plan.export_plan_to_xlsx("planner.xlsx") as wb:
+            plan.write_plan_to_worksheet(wb.create_sheet("Target", 0), target_plan)
+    return folder
+
+
+@click.command()
+@click.argument("folder", type=click.Path(file_okay=False))
+@click.option("--tutors", default=20, help="number of tutors")
+@click.option("--rooms", "tutorial_rooms", default=10, help="number of tutorial rooms")
+@click.option("--density", default=0.6, help="probability that a tutor is available at a time slot")
+@click.option("--booking-density", default=0.6, help="probability that a tutorial room is booked at a time slot")
+@click.option("--seed", default=0, help="seed of the random numbers")
+@click.option("--solver", help="solver backend written to the settings")
+def main(folder, tutors, tutorial_rooms, density, booking_density, seed, solver):
+    """
+    Generate a synthetic scenario in FOLDER.
+    """
+    generate_scenario(folder, tutors, tutorial_rooms, density, booking_density, seed, solver)
+    click.echo(f"generated scenario with {tutors} tutors and {tutorial_rooms} tutorial rooms in {folder}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,8 @@ install_requires = [
     "mako",
     "xlsxwriter",
     "openpyxl",
+    "numpy",
+    "scipy",
 ]
 
 dev_requires = [
@@ -25,6 +27,7 @@ setup(
     install_requires=install_requires,
     extras_require={
         "dev": dev_requires,
+        "highs": ["highspy"],
     },
     entry_points={
         "console_scripts": [
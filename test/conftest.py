@@ -2,7 +2,11 @@ __author__ = "Alexander Elvers <aelvers AT inet.tu-berlin.de>"
 
 import datetime
 import pytest
+from tutorplanner.input import rooms, tutor
+from tutorplanner.input.data import Data
+from tutorplanner.input.plan import get_empty_plan
 from tutorplanner.util import settings
+from tutorplanner.util.settings import TUTORIUM, UEBUNG_TEL, UEBUNG_MAR, KONTROLLE
 
 
 @pytest.fixture(autouse=True)
@@ -34,3 +38,78 @@ def fix_settings(monkeypatch):
             datetime.date(2016, 10, 28): [14],
         },
     })
+
+
+def create_tutor(last_name, monthly_work_hours, max_hours_without_break, availability):
+    t = tutor.Tutor()
+    t.first_name = "Erika"
+    t.last_name = last_name
+    t.monthly_work_hours = monthly_work_hours
+    t.max_hours_without_break = max_hours_without_break
+    t.max_tutorials_without_break = 2
+    t.availability = availability
+    return last_name, t
+
+
+def create_room(name, room_type, times):
+    r = rooms.Room(name)
+    r.type = room_type
+    for day in [datetime.date(2016, 10, 17), datetime.date(2016, 10, 18)]:
+        for time in times:
+            r.book(day, time)
+    return r.name, r
+
+
+@pytest.fixture
+def small_course(monkeypatch):
+    """
+    Course of two days with the tutors A and B, C without availability and D
+    without working hours. A does not grade on the second day.
+    """
+    pytest.importorskip("highspy")
+    days = [datetime.date(2016, 10, 17), datetime.date(2016, 10, 18)]
+    monkeypatch.setitem(settings.settings._data, "room_patterns", [
+        {"pattern": "*", "type": "tutorial", "projector": 1, "capacity": 30},
+        {"pattern": "MAR 6.*", "type": "exerciseMAR", "capacity": 24},
+        {"pattern": "TEL *", "type": "exercise", "capacity": 24},
+        {"pattern": "TEL 109", "type": "grading", "capacity": 12},
+    ])
+    monkeypatch.setitem(settings.settings._data, "optimization_parameters", {"solver": "highs"})
+    data = Data()
+    monkeypatch.setattr(data, "_tutor_by_name", dict([
+        create_tutor("A", 40, 3, {day: {**dict.fromkeys(range(10, 14), 3), **dict.fromkeys(range(14, 18), 2)}
+                                  for day in days}),
+        create_tutor("B", 40, 2, {day: dict.fromkeys(range(10, 18), 2) for day in days}),
+        create_tutor("C", 40, 3, {}),
+        create_tutor("D", 0, 3, {day: dict.fromkeys(range(10, 18), 2) for day in days}),
+    ]))
+    all_times = [10, 12, 14, 16]
+    monkeypatch.setattr(data, "_room_by_name", dict([
+        create_room("MAR 0.001", "tutorial", [10]), create_room("H 3005", "tutorial", [10, 12]),
+        create_room("MAR 6.001", "exerciseMAR", all_times), create_room("MAR 6.057", "exerciseMAR", all_times),
+        create_room("TEL 103", "exercise", all_times), create_room("TEL 106li", "exercise", all_times),
+        create_room("TEL 106re", "exercise", all_times), create_room("TEL 206li", "exercise", all_times),
+        create_room("TEL 206re", "exercise", []), create_room("TEL 109", "grading", all_times),
+    ]))
+    for attribute in ["_room_by_type", "_availability", "_availability_tensor", "_tutor_positions",
+                      "_day_positions", "_hour_positions", "_bookings_tutorials", "_bookings_pools",
+                      "_rooms_external"]:
+        monkeypatch.setattr(data, attribute, None)
+    monkeypatch.setitem(settings.settings._data, "specific_working_hours", {
+        "A": {"total": {"min": 2, "max": 6}, "first_week": {"min": 2, "max": 6}, "second_week": {"min": 0, "max": 0}},
+        "B": {"total": {"min": 2, "max": 8}, "first_week": {"min": 2, "max": 8}, "second_week": {"min": 0, "max": 0}},
+    })
+    monkeypatch.setitem(settings.settings._data, "forbidden_tasks", {"A": {KONTROLLE: [days[1]]}})
+    return data
+
+
+@pytest.fixture
+def small_target_plan(small_course):
+    """
+    Target plan of the small course, the tutors can do all tasks.
+    """
+    target_plan = get_empty_plan()
+    for task, day, hour in [(TUTORIUM, 1, 10), (TUTORIUM, 1, 11), (UEBUNG_TEL, 1, 10), (UEBUNG_TEL, 1, 11),
+                            (UEBUNG_MAR, 2, 14), (KONTROLLE, 2, 15)]:
+        target_plan[task][day][hour] = 1
+    return target_plan
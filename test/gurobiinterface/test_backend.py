@@ -0,0 +1,172 @@
+__author__ = "Alexander Elvers <aelvers AT inet.tu-berlin.de>"
+
+import numpy as np
+import pytest
+
+from tutorplanner.gurobiinterface import backend
+from tutorplanner.gurobiinterface.matrix import Names, VariableBlock, ConstraintRows, add_constraints
+
+
+@pytest.fixture(params=sorted(backend.BACKENDS))
+def solver(request):
+    pytest.importorskip({"gurobi": "gurobipy", "highs": "highspy"}[request.param])
+    solver = backend.create_backend(request.param, "test")
+    solver.set_parameter("numeric_focus", 1)  # ignored by backends without this parameter
+    return solver
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        backend.create_backend("foo", "test")
+
+
+def test_solve(solver):
+    items = VariableBlock(solver, ["a", "b", "c"], vtype=backend.BINARY, name="item_{}")
+    rows = ConstraintRows(["weight"])
+    rows.add_entries(np.zeros(3), items, np.arange(3), [3.0, 2.0, 2.0])
+    add_constraints(solver, rows, backend.LESS_EQUAL, 4.0, name="{}")
+    solver.set_objective(items.linear_expression(np.array([4.0, 3.0, 2.0])), backend.MAXIMIZE)
+    status = solver.optimize()
+    assert status.is_feasible()
+    assert status.get_objective() == pytest.approx(5.0)
+    assert items.values(solver.solution).round().tolist() == [0.0, 1.0, 1.0]
+    assert status.start_accepted is None
+
+
+def test_start_and_removal(solver):
+    items = VariableBlock(solver, ["a", "b", "c", "d", "e", "f"], vtype=backend.BINARY)
+    extra = VariableBlock(solver, ["x"], lb=0.0, ub=5.0, vtype=backend.CONTINUOUS)
+    constraint = solver.add_constraint(extra.linear_expression(), backend.GREATER_EQUAL, 2.0, "extra")
+    solver.set_objective(items.linear_expression(), backend.MINIMIZE)
+    solver.optimize()
+
+    solver.remove_constraints([constraint])
+    solver.remove_variables(extra.indices)
+    solver.update()
+    assert solver.alive_indices(np.arange(solver.number_of_variables)).tolist() == items.indices.tolist()
+
+    # knapsack that is not solved by presolve, so that the start is checked
+    rows = ConstraintRows(["first", "second"])
+    rows.add_entries(np.zeros(6), items, np.arange(6), [3.0, 5.0, 7.0, 4.0, 6.0, 2.0])
+    rows.add_entries(np.ones(6), items, np.arange(6), [6.0, 2.0, 3.0, 5.0, 4.0, 7.0])
+    add_constraints(solver, rows, backend.LESS_EQUAL, [12.0, 11.0])
+    solver.set_objective(items.linear_expression(np.array([5.0, 6.0, 9.0, 7.0, 8.0, 4.0])), backend.MAXIMIZE)
+    solver.set_start(items.indices[:3], [1.0, 0.0, 1.0])
+    status = solver.optimize(has_start=True)
+    assert status.get_objective() == pytest.approx(16.0)
+    assert status.start_accepted
+    assert np.isnan(solver.solution[extra.indices]).all()
+
+    # the start exceeds the first capacity
+    solver.set_start(items.indices, [1.0, 1.0, 1.0, 0.0, 0.0, 0.0])
+    status = solver.optimize(has_start=True)
+    assert status.get_objective() == pytest.approx(16.0)
+    assert status.start_accepted is False
+
+
+def test_optimize_hierarchically(solver):
+    items = VariableBlock(solver, ["a", "b", "c", "d"], vtype=backend.BINARY)
+    rows = ConstraintRows(["count"])
+    rows.add_entries(np.zeros(4), items, np.arange(4))
+    add_constraints(solver, rows, backend.LESS_EQUAL, 2.0)
+    objectives = [
+        backend.Objective(items.linear_expression(np.array([2.0, 2.0, 1.0, 0.0])), backend.MAXIMIZE, "first")
+        .with_tolerances(0.75),
+        backend.Objective(items.linear_expression(np.array([1.0, 0.0, 0.0, -1.0])), backend.MINIMIZE, "second"),
+    ]
+    status, snapshots = solver.optimize_hierarchically(objectives)
+    assert status.is_feasible()
+    assert len(snapshots) == 2
+    assert objectives[0].expression.value(snapshots[0]) == pytest.approx(4.0)
+    # the first objective may be degraded to 3
+    assert objectives[0].expression.value(snapshots[1]) == pytest.approx(3.0)
+    assert objectives[1].expression.value(snapshots[1]) == pytest.approx(0.0)
+    assert items.values(snapshots[1]).round().tolist() == [0.0, 1.0, 1.0, 0.0]
+    assert status.get_objective() == pytest.approx(0.0)
+
+
+
+def test_optimize_level_by_level_starts(solver):
+    items = VariableBlock(solver, ["a", "b", "c", "d", "e", "f"], vtype=backend.BINARY)
+    rows = ConstraintRows(["first", "second"])
+    rows.add_entries(np.zeros(6), items, np.arange(6), [3.0, 5.0, 7.0, 4.0, 6.0, 2.0])
+    rows.add_entries(np.ones(6), items, np.arange(6), [6.0, 2.0, 3.0, 5.0, 4.0, 7.0])
+    add_constraints(solver, rows, backend.LESS_EQUAL, [12.0, 11.0])
+    objectives = [
+        backend.Objective(items.linear_expression(np.array([5.0, 6.0, 9.0, 7.0, 8.0, 4.0])), backend.MAXIMIZE,
+                          "first").with_tolerances(0.25),
+        backend.Objective(items.linear_expression(np.array([1.0, 1.0, 1.0, 1.0, 1.0, 1.0])), backend.MAXIMIZE,
+                          "second"),
+    ]
+    calls = []
+    starts = []
+    set_objective, set_start = solver.set_objective, solver.set_start
+    solver.set_objective = lambda *args: (calls.append("objective"), set_objective(*args))
+    solver.set_start = lambda indices, values: (calls.append("start"), starts.append(np.array(values)),
+                                                set_start(indices, values))
+    # the emulation of the backends without multi-objective support
+    status, snapshots = backend.SolverBackend.optimize_hierarchically(solver, objectives)
+    assert len(snapshots) == 2
+    # the second phase starts from the solution of the first phase, set after its objective
+    assert calls == ["objective", "objective", "start"]
+    assert starts[0].tolist() == snapshots[0][items.indices].tolist()
+    assert status.start_accepted
+    assert objectives[0].expression.value(snapshots[1]) >= 12.0 - 1e-6
+
+
+@pytest.mark.parametrize("anonymous_names", [False, True])
+def test_names(anonymous_names, solver, tmp_path):
+    solver = backend.create_backend(solver.name, "test", anonymous_names)
+    items = VariableBlock(solver, [("a", 1), ("b", 2)], vtype=backend.BINARY, name="item_{}_{}")
+    removed = VariableBlock(solver, ["x"], vtype=backend.BINARY, name="removed_{}")
+    rows = ConstraintRows(["weight"])
+    rows.add_entries(np.zeros(2), items, np.arange(2), [3.0, 2.0])
+    add_constraints(solver, rows, backend.LESS_EQUAL, 4.0, name="{}")
+    solver.remove_variables(removed.indices)
+    if anonymous_names:
+        # the names are neither formatted nor passed to the solver yet
+        assert all(isinstance(names, Names) for _, names in solver.pending_variable_names)
+    assert solver.variable_name(items[("b", 2)]) == "item_b_2"
+
+    solver.write(str(tmp_path / "model.lp"))
+    assert not solver.pending_variable_names
+    lp = (tmp_path / "model.lp").read_text()
+    assert "item_a_1" in lp and "item_b_2" in lp and "weight" in lp
+
+
+def test_coefficient_statistics(solver):
+    items = VariableBlock(solver, ["a", "b"], vtype=backend.BINARY)
+    expression, scale = items.linear_expression(np.array([3e6, 30.0])).normalized()
+    solver.add_constraint(expression, backend.LESS_EQUAL, (3e6 + 10) / scale)
+    solver.set_objective(items.linear_expression(np.array([0.5, 2.0])), backend.MAXIMIZE)
+    statistics = solver.coefficient_statistics()
+    assert statistics["matrix"] == pytest.approx((30.0 / scale, 3e6 / scale))
+    assert statistics["rhs"] == pytest.approx(((3e6 + 10) / scale,) * 2)
+    assert statistics["objective"] == (0.5, 2.0)
+    status = solver.optimize()
+    assert items.values(solver.solution).round().tolist() == [0.0, 1.0]
+    assert status.get_objective() == pytest.approx(2.0)
+
+
+def test_start_in_several_calls(solver):
+    items = VariableBlock(solver, ["a", "b", "c", "d"], vtype=backend.BINARY)
+    solver.add_constraint(items.linear_expression(), backend.EQUAL, 2.0)
+    solver.set_objective(items.linear_expression(np.array([1.0, 1.0, 0.0, 0.0])), backend.MAXIMIZE)
+    # both calls form one start, the second one does not replace the first one
+    solver.set_start(items.indices[:2], [1.0, 1.0])
+    solver.set_start(items.indices[2:], [0.0, 0.0])
+    if solver.name == "highs":
+        solver.pass_start()
+        assert solver.highs.getSolution().col_value == [1.0, 1.0, 0.0, 0.0]
+    status = solver.optimize(has_start=True)
+    assert status.get_objective() == pytest.approx(2.0)
+
+
+def test_continuous_model(solver):
+    values = VariableBlock(solver, ["a", "b"], lb=0.0, ub=3.0, vtype=backend.CONTINUOUS)
+    solver.add_constraint(values.linear_expression(), backend.LESS_EQUAL, 4.0)
+    solver.set_objective(values.linear_expression(np.array([1.0, 2.0])), backend.MAXIMIZE)
+    status = solver.optimize()
+    assert status.is_optimal()
+    assert status.is_feasible()
+    assert status.get_objective() == pytest.approx(7.0)
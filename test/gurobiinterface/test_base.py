@@ -0,0 +1,12 @@
+__author__ = "Alexander Elvers <aelvers AT inet.tu-berlin.de>"
+
+import itertools
+
+from tutorplanner.gurobiinterface.base import MAR_TEL_HOPS, TASK_LOCATIONS
+
+
+def test_task_locations_match_mar_tel_hops():
+    # the compact formulation of MAR/TEL hopping relies on this
+    hops = {(task, next_task) for task, next_task in itertools.product(TASK_LOCATIONS, repeat=2)
+            if TASK_LOCATIONS[task] != TASK_LOCATIONS[next_task]}
+    assert hops == set(MAR_TEL_HOPS)
@@ -0,0 +1,235 @@
+__author__ = "Alexander Elvers <aelvers AT inet.tu-berlin.de>"
+
+import collections
+
+import numpy as np
+import pytest
+import scipy.sparse
+
+from tutorplanner.gurobiinterface.backend import Objective, MAXIMIZE
+from tutorplanner.gurobiinterface.initial import PlanningCreator
+from tutorplanner.input.data import Data
+from tutorplanner.input.plan import get_empty_plan
+from tutorplanner.planning.base import compute_max_workload
+from tutorplanner.planning.initial import prepare_room_level, ROOM_LEVELS
+from tutorplanner.util import settings
+from tutorplanner.util.settings import DAYS, hours_real, TASKS, TUTORIUM, UEBUNG_MAR, UEBUNG_TEL, KONTROLLE
+
+
+def model_rows(solver):
+    """
+    Return the rows of a HiGHS model as a counter of (name, coefficients by
+    variable name, lower bound, upper bound).
+    """
+    lp = solver.highs.getLp()
+    matrix = lp.a_matrix_
+    data = (np.array(matrix.value_), np.array(matrix.index_), np.array(matrix.start_))
+    if matrix.format_.name == "kRowwise":
+        matrix = scipy.sparse.csr_matrix(data, shape=(lp.num_row_, lp.num_col_))
+    else:
+        matrix = scipy.sparse.csc_matrix(data, shape=(lp.num_row_, lp.num_col_)).tocsr()
+    rows = collections.Counter()
+    for indices, names in solver.pending_constraint_names:
+        for i, name in zip(indices, names):
+            row = matrix.getrow(i)
+            coefficients = frozenset((solver.variable_name(j), value) for j, value in zip(row.indices, row.data))
+            rows[name, coefficients, lp.row_lower_[i], lp.row_upper_[i]] += 1
+    return rows
+
+
+def row_wise_rows(pc):
+    """
+    Build the rows of the basic constraints one by one, like the model was
+    built before the constraint families were added as matrices.
+    """
+    variables = set(pc.schedule_entry.keys)
+    rows = collections.Counter()
+
+    def add(name, keys, lower, upper):
+        coefficients = frozenset((f"schedule_{tutor}_{day}_{hour}_{task}", 1.0) for tutor, day, hour, task in keys
+                                 if (tutor, day, hour, task) in variables)
+        rows[name, coefficients, lower, upper] += 1
+
+    for tutor, day, hour in dict.fromkeys(key[:3] for key in pc.schedule_entry.keys):
+        add(f"UniqueTaskAtAGivenTime_{tutor}_{day}_{hour}", [(tutor, day, hour, task) for task in TASKS],
+            -np.inf, 1.0)
+    for day in DAYS:
+        for hour in hours_real(day):
+            for task in TASKS:
+                add(f"TasksAreBoundedByTargetedPlan_{day}_{hour}_{task}",
+                    [(tutor, day, hour, task) for tutor in pc.tutors], -np.inf, pc.target_plan[task][day][hour])
+            add(f"ConcurrentTutorialsAreBoundedByNumberOfRooms_{day}_{hour}",
+                [(tutor, day, hour, TUTORIUM) for tutor in pc.tutors], -np.inf,
+                Data().get_number_of_tutorial_rooms(day, hour))
+    for tutor in pc.tutors:
+        for period, key, days in [("Over2Weeks_special", "total", DAYS), ("OverFirst", "first_week", range(1, 6)),
+                                  ("OverSecond", "second_week", range(6, 11))]:
+            keys = [(tutor, day, hour, task) for day in days for hour in hours_real(day) for task in TASKS]
+            working_hours = pc.specific_working_hours[tutor][key]
+            add(f"WorkIsSharedFairly_{period}_{tutor}_lower", keys, working_hours["min"], np.inf)
+            add(f"WorkIsSharedFairly_{period}_{tutor}_upper", keys, -np.inf, working_hours["max"])
+        t = Data().tutor_by_name[tutor]
+        for max_work, tasks in [(t.max_hours_without_break, TASKS), (t.max_tutorials_without_break, [TUTORIUM])]:
+            for day in DAYS:
+                for hour in hours_real(day)[:-max_work]:
+                    keys = [(tutor, day, hour + incr, task) for incr in range(max_work + 1) for task in tasks]
+                    if len({key[2] for key in keys if key in variables}) > max_work:
+                        add(f"TutorsHavePauses_{tutor}_{day}_{hour}", keys, -np.inf, max_work)
+    return rows
+
+
+def test_matrix_matches_row_wise_construction(small_target_plan):
+    pc = PlanningCreator(small_target_plan)
+    pc.create_model_without_rooms()
+    rows = model_rows(pc.solver)
+    assert rows == row_wise_rows(pc)
+    assert {name.split("_")[0] for name, *_ in rows} == {
+        "UniqueTaskAtAGivenTime", "TasksAreBoundedByTargetedPlan", "ConcurrentTutorialsAreBoundedByNumberOfRooms",
+        "WorkIsSharedFairly", "TutorsHavePauses"}
+
+
+def test_variables_of_available_tutors(small_target_plan):
+    pc = PlanningCreator(small_target_plan)
+    # C is not available and D has no working hours
+    assert pc.tutors == ["A", "B"]
+    pc.create_model_without_rooms()
+    assert {key[0] for key in pc.schedule_entry.keys} == {"A", "B"}
+    # the tutors are only available on the first two days
+    assert {key[1] for key in pc.schedule_entry.keys} == {1, 2}
+    # A does not grade on the second day
+    assert ("A", 1, 15, KONTROLLE) in pc.schedule_entry
+    assert not any(key[0] == "A" and key[1] == 2 and key[3] == KONTROLLE for key in pc.schedule_entry.keys)
+    assert pc.consecutive_time_slots() == [(day, hour, tutor) for day in [1, 2] for hour in range(10, 17)
+                                           for tutor in ["A", "B"]]
+    pc.plugin_constraint_bound_maximal_deviation_from_target_plan(max_deviation=0)
+    pc.plugin_obj_minimize_deviation_from_plan()
+    status = pc.solve_integer_program()
+    assert status.is_feasible()
+    assert status.get_objective() == 0
+
+    # the tutors without variables have empty plans
+    personal_plans = pc.get_personal_plans()
+    assert set(personal_plans) == {"A", "B", "C", "D"}
+    for tutor in ["C", "D"]:
+        assert not any(personal_plans[tutor][task][day][hour]
+                       for task in TASKS for day in DAYS for hour in hours_real(day))
+    assert personal_plans["B"][KONTROLLE][2][15]
+
+
+def test_room_variables_of_booked_rooms(small_target_plan):
+    pc = PlanningCreator(small_target_plan)
+    pc.create_model_without_rooms()
+    pc.extend_model_with_room_support()
+    rooms = {}
+    for tutor, day, hour, room in pc.schedule_entry_rooms.keys:
+        rooms.setdefault((tutor, day, hour), set()).add(room)
+    pools = {"MAR 6.001", "MAR 6.057", "TEL 106li", "TEL 106re", "TEL 206li"}
+    # TEL 206re is not booked, TEL 109 is always usable
+    assert rooms["A", 1, 10] == {"MAR 0.001", "H 3005", "TEL 109"} | pools
+    assert rooms["B", 1, 12] == {"H 3005", "TEL 109"} | pools
+    assert rooms["B", 2, 14] == {"TEL 109"} | pools
+    # A does not grade on the second day
+    assert rooms["A", 2, 10] == {"MAR 0.001", "H 3005"} | pools
+    # every room variable has the task variable of its room
+    assert set(rooms) == set(pc.time_slots())
+    for tutor, day, hour, room in pc.schedule_entry_rooms.keys:
+        assert (tutor, day, hour, pc.task_of_room[room]) in pc.schedule_entry
+
+    pc.plugin_constraint_bound_maximal_deviation_from_target_plan(max_deviation=0)
+    pc.plugin_objective_select_best_rooms()
+    assert pc.solve_integer_program().is_feasible()
+    room_plans = pc.get_personal_room_plans()
+    # MAR 0.001 is the best room
+    assert [room_plans[tutor][TUTORIUM][1][hour] for hour in [10, 11] for tutor in ["A", "B"]
+            if room_plans[tutor][TUTORIUM][1][hour]] == ["MAR 0.001", "MAR 0.001"]
+
+
+def solve_levels_2_and_3(pc):
+    """
+    Solve the work spread and the minimal happiness and return the
+    objectives.
+    """
+    pc.plugin_obj_minimize_work_spread()
+    work_spread = pc.solve_integer_program().get_objective()
+    pc.bound_maximal_work_spread(work_spread * 1.5)
+    pc.plugin_obj_maximize_min_happiness(compute_max_workload(pc.get_personal_plans()))
+    return work_spread, pc.solve_integer_program().get_objective()
+
+
+def test_reused_model(small_target_plan):
+    # level 2 with a new model, bounded by the target plan
+    pc = PlanningCreator(small_target_plan, level=2)
+    pc.create_model_without_rooms()
+    pc.plugin_constraint_bound_maximal_deviation_from_target_plan(max_deviation=0)
+    expected = solve_levels_2_and_3(pc)
+
+    # the model of level 1 without the deviation from the plan
+    pc = PlanningCreator(small_target_plan)
+    pc.create_model_without_rooms()
+    pc.plugin_constraint_bound_maximal_deviation_from_target_plan(max_deviation=0)
+    pc.plugin_obj_minimize_deviation_from_plan()
+    assert pc.solve_integer_program().get_objective() == 0
+    pc.remove_deviation_from_plan()
+    assert solve_levels_2_and_3(pc) == pytest.approx(expected)
+
+
+def test_start_from_previous_level(small_target_plan):
+    pc = PlanningCreator(small_target_plan)
+    # presolve solves this small model completely, then HiGHS does not report the start
+    pc.solver.highs.setOptionValue("presolve", "off")
+    pc.create_model_without_rooms()
+    pc.plugin_constraint_bound_maximal_deviation_from_target_plan(max_deviation=0)
+    pc.plugin_obj_minimize_deviation_from_plan()
+    status = pc.solve_integer_program()
+    assert status.start_accepted is None
+
+    pc.remove_deviation_from_plan()
+    pc.plugin_obj_minimize_work_spread()
+    status = pc.solve_integer_program()
+    assert status.start_accepted
+    assert status.get_objective() == pytest.approx(0.125)
+
+    # the room variables are new, the solver completes them
+    pc.extend_model_with_room_support()
+    pc.plugin_objective_select_best_rooms()
+    status = pc.solve_integer_program()
+    assert status.start_accepted
+
+
+def test_pools_are_equalized(small_course):
+    pc = PlanningCreator(get_empty_plan(), level=6)
+    # A and B are in the TEL pools at 10 and in the MAR pools at 12
+    pc.create_fixed_task_variables([(tutor, 1, hour, task) for tutor in ["A", "B"]
+                                    for hour, task in [(10, UEBUNG_TEL), (12, UEBUNG_MAR)]])
+    pc.extend_model_with_room_support()
+    # TEL 106li, TEL 106re and TEL 206li are booked on both days
+    assert set(pc.pool_reference.keys) == {(day, hour) for day in [1, 2] for hour in hours_real(day)}
+    # without equalization, both tutors could be in TEL 106li and in MAR 6.001
+    rooms = pc.schedule_entry_rooms
+    expression = rooms.linear_expression(rooms.coefficients(lambda key: key[1:] in [(1, 10, "TEL 106li"),
+                                                                                    (1, 12, "MAR 6.001")]))
+    pc.set_objective(Objective(expression, MAXIMIZE, "same_pool"))
+    status = pc.solve_integer_program()
+    assert status.get_objective() == pytest.approx(2.0)
+    room_plans = pc.get_personal_room_plans()
+    tel_rooms = {room_plans[tutor][UEBUNG_TEL][1][10] for tutor in ["A", "B"]}
+    assert len(tel_rooms) == 2 and "TEL 106li" in tel_rooms
+    assert {room_plans[tutor][UEBUNG_MAR][1][12] for tutor in ["A", "B"]} == {"MAR 6.001", "MAR 6.057"}
+
+
+@pytest.mark.parametrize("formulation", ["per_room", "compact"])
+def test_room_stability_formulations(small_course, formulation):
+    settings.settings._data["optimization_parameters"]["room_stability_formulation"] = formulation
+    pc = PlanningCreator(get_empty_plan(), level=6)
+    pc.create_fixed_task_variables([("A", 1, 11, TUTORIUM), ("A", 1, 12, TUTORIUM),
+                                    ("B", 1, 10, UEBUNG_TEL), ("B", 1, 11, UEBUNG_TEL)])
+    pc.extend_model_with_room_support()
+    objectives = []
+    for level in ROOM_LEVELS:
+        prepare_room_level(pc, level)
+        objectives.append(pc.solve_integer_program().get_objective())
+    # the best room MAR 0.001 is only booked until 12, so A changes the room, B stays in the pool
+    assert objectives == pytest.approx([30e6 + 30, 1.0])
+    room_plans = pc.get_personal_room_plans()
+    assert [room_plans["A"][TUTORIUM][1][hour] for hour in [11, 12]] == ["MAR 0.001", "H 3005"]
+    assert room_plans["B"][UEBUNG_TEL][1][10] == room_plans["B"][UEBUNG_TEL][1][11]
@@ -0,0 +1,155 @@
+__author__ = "Alexander Elvers <aelvers AT inet.tu-berlin.de>"
+
+import datetime
+
+import pytest
+
+from tutorplanner.gurobiinterface.rolling import PlanningCreator
+from tutorplanner.input import plan, rooms, tutor
+from tutorplanner.input.data import Data
+from tutorplanner.util import settings
+from tutorplanner.util.settings import DAYS, hours_real, TASKS, TUTORIUM, UEBUNG_TEL, KONTROLLE
+
+NEXT_DAY = 3
+
+
+def create_tutor(last_name, max_hours_without_break):
+    t = tutor.Tutor()
+    t.first_name = "Erika"
+    t.last_name = last_name
+    t.monthly_work_hours = 40
+    t.max_hours_without_break = max_hours_without_break
+    t.max_tutorials_without_break = max_hours_without_break
+    # available at all hours of the first three days
+    t.availability = {datetime.date(2016, 10, 17 + i): dict.fromkeys(range(10, 18), 2) for i in range(3)}
+    return last_name, t
+
+
+def create_room(name, room_type):
+    r = rooms.Room(name)
+    r.type = room_type
+    for day in range(17, 20):
+        for time in [10, 12, 14, 16]:
+            r.book(datetime.date(2016, 10, day), time)
+    return r.name, r
+
+
+@pytest.fixture(autouse=True)
+def data(monkeypatch):
+    pytest.importorskip("highspy")
+    data = Data()
+    monkeypatch.setattr(data, "_tutor_by_name", dict([create_tutor("A", 3), create_tutor("B", 2)]))
+    monkeypatch.setattr(data, "_room_by_name", dict([
+        create_room("MAR 0.001", "tutorial"), create_room("TEL 103", "exercise"),
+        create_room("TEL 106li", "exercise"), create_room("TEL 109", "grading"),
+    ]))
+    for attribute in ["_room_by_type", "_availability", "_availability_tensor", "_tutor_positions",
+                      "_day_positions", "_hour_positions", "_bookings_tutorials", "_bookings_pools",
+                      "_rooms_external"]:
+        monkeypatch.setattr(data, attribute, None)
+    monkeypatch.setitem(settings.settings._data, "specific_working_hours", {
+        "A": {"total": {"min": 0, "max": 4}, "first_week": {"min": 0, "max": 4}, "second_week": {"min": 0, "max": 0}},
+        "B": {"total": {"min": 0, "max": 20}, "first_week": {"min": 0, "max": 20},
+              "second_week": {"min": 0, "max": 0}},
+    })
+    # A only gives tutorials and B only grades on the coming day
+    monkeypatch.setitem(settings.settings._data, "forbidden_tasks", {
+        "A": {KONTROLLE: [datetime.date(2016, 10, 19)]}, "B": {TUTORIUM: [datetime.date(2016, 10, 19)]},
+    })
+    return data
+
+
+def empty_room_plan():
+    return {task: {day: dict.fromkeys(hours_real(day), "") for day in DAYS} for task in TASKS}
+
+
+@pytest.fixture
+def past_plan():
+    plans = {"A": empty_room_plan(), "B": empty_room_plan()}
+    # past assignments, B works until the end of the day before the coming days
+    plans["A"][TUTORIUM][1][10] = "MAR 0.001"
+    plans["A"][TUTORIUM][1][11] = "MAR 0.001"
+    plans["B"][UEBUNG_TEL][2][16] = "TEL 106li"
+    plans["B"][UEBUNG_TEL][2][17] = "TEL 106li"
+    # coming assignments of the past plan
+    plans["B"][KONTROLLE][3][10] = "TEL 109"
+    return plans
+
+
+def target_plan(past_plan):
+    result = plan.get_empty_plan()
+    for task in TASKS:
+        for day in DAYS:
+            for hour in hours_real(day):
+                result[task][day][hour] = sum(tutor_plan[task][day][hour] != "" for tutor_plan in past_plan.values())
+    return result
+
+
+def test_past_assignments_are_constants(data, past_plan):
+    target = target_plan(past_plan)
+    # A works at most 4 hours and already has 2 hours in the past
+    for hour in [14, 15, 16]:
+        target[TUTORIUM][NEXT_DAY][hour] = 1
+    # B has at most two hours without break, the day boundary is a break
+    target[KONTROLLE][NEXT_DAY][11] = 1
+    for hour in [13, 14, 15]:
+        target[KONTROLLE][NEXT_DAY][hour] = 1
+    pc = PlanningCreator(target, past_plan, NEXT_DAY, solver="highs")
+    assert pc.days == list(range(NEXT_DAY, 11))
+    pc.create_model_without_rooms()
+    pc.plugin_obj_minimize_deviation_from_plan()
+    status = pc.solve_integer_program()
+    assert status.is_feasible()
+    assert status.get_objective() == pytest.approx(2.0)
+
+    personal_plans = pc.get_personal_plans()
+    # the past assignments are kept
+    for tutor_name, task, day, hour in [("A", TUTORIUM, 1, 10), ("A", TUTORIUM, 1, 11),
+                                        ("B", UEBUNG_TEL, 2, 16), ("B", UEBUNG_TEL, 2, 17)]:
+        assert personal_plans[tutor_name][task][day][hour]
+    assert sum(personal_plans["A"][TUTORIUM][NEXT_DAY][hour] for hour in [14, 15, 16]) == 2
+    assert personal_plans["B"][KONTROLLE][NEXT_DAY][10] and personal_plans["B"][KONTROLLE][NEXT_DAY][11]
+    assert sum(personal_plans["B"][KONTROLLE][NEXT_DAY][hour] for hour in [13, 14, 15]) == 2
+    assignments = data.assignment_tensor(personal_plans)
+    assert pc.cube_happiness_expression().value(pc.last_solution) == pytest.approx(data.cube_happiness(assignments))
+
+    # the past assignments are constants of the work spread, without them the spread would be 0
+    pc.remove_deviation_from_plan()
+    pc.plugin_obj_minimize_work_spread()
+    status = pc.solve_integer_program()
+    workload = {name: plan.compute_workload(tutor_plan) for name, tutor_plan in pc.get_personal_plans().items()}
+    assert workload == {"A": 2, "B": 6}
+    assert status.get_objective() == pytest.approx(2 / 4 - 6 / 20)
+
+
+def test_start_from_past_plan(past_plan):
+    past_plan["A"][TUTORIUM][NEXT_DAY][14] = "MAR 0.001"
+    past_plan["A"][TUTORIUM][NEXT_DAY][15] = "MAR 0.001"
+    past_plan["B"][UEBUNG_TEL][NEXT_DAY][14] = "TEL 106li"
+    past_plan["B"][KONTROLLE][NEXT_DAY][15] = "TEL 109"
+    pc = PlanningCreator(target_plan(past_plan), past_plan, NEXT_DAY, solver="highs")
+    # presolve solves this small model completely, then HiGHS does not report the start
+    pc.solver.highs.setOptionValue("presolve", "off")
+    pc.create_model_without_rooms()
+    pc.plugin_obj_maximize_task_contingency()
+    status = pc.solve_integer_program()
+    assert status.start_accepted
+    assert status.get_objective() == pytest.approx(5.0)
+
+    # the start of the rooms level has the tasks of the last solution and the kept rooms of the past plan
+    pc.extend_model_with_room_support()
+    pc.plugin_obj_maximize_task_room_contingency()
+    started = set()
+    set_start = pc.solver.set_start
+    pc.solver.set_start = lambda indices, values: (started.update(indices.tolist()), set_start(indices, values))
+    status = pc.solve_integer_program()
+    kept_slots = {("A", NEXT_DAY, 14), ("A", NEXT_DAY, 15), ("B", NEXT_DAY, 10), ("B", NEXT_DAY, 14),
+                  ("B", NEXT_DAY, 15)}
+    assert set(pc.schedule_entry.indices.tolist()) <= started
+    # only the time slots with a kept room are started
+    room_block = pc.schedule_entry_rooms
+    assert {key[:3] for key, index in zip(room_block.keys, room_block.indices.tolist())
+            if index in started} == kept_slots
+    assert status.start_accepted
+    assert status.get_objective() == pytest.approx(5.0)
+    assert pc.get_personal_room_plans() == past_plan
@@ -0,0 +1,43 @@
+__author__ = "Alexander Elvers <aelvers AT inet.tu-berlin.de>"
+
+import numpy as np
+import pytest
+
+from tutorplanner.gurobiinterface import backend
+from tutorplanner.gurobiinterface.matrix import VariableBlock
+from tutorplanner.gurobiinterface.solution import SolutionSnapshot
+from tutorplanner.util.settings import TUTORIUM, UEBUNG_MAR
+
+
+@pytest.fixture
+def solver():
+    pytest.importorskip("highspy")
+    return backend.create_backend("highs", "test")
+
+
+def test_snapshot(solver):
+    tasks = VariableBlock(solver, [("a", 1, 10, TUTORIUM), ("a", 1, 11, UEBUNG_MAR), ("b", 1, 10, TUTORIUM)],
+                          vtype=backend.BINARY)
+    rooms = VariableBlock(solver, [("a", 1, 10, "MAR 0.001"), ("a", 1, 10, "MAR 0.002"), ("b", 1, 10, "MAR 0.002")],
+                          vtype=backend.BINARY)
+    solution = np.array([1.0, 0.0, 1.0, 0.0, 1.0, 1.0])
+    snapshot = SolutionSnapshot(solution, tasks, rooms, {("a", 2, 10, UEBUNG_MAR)}, {("a", 2, 10): "MAR 6.001"},
+                                ["a", "b", "c"], ["a", "b"])
+    solution[:] = 0.0  # the snapshot keeps its own values
+    assert snapshot.is_assigned("a", 1, 10, TUTORIUM)
+    assert not snapshot.is_assigned("a", 1, 11, UEBUNG_MAR)
+    assert snapshot.is_assigned("a", 2, 10, UEBUNG_MAR)
+    assert snapshot.room("a", 1, 10) == "MAR 0.002"
+    assert snapshot.room("a", 2, 10) == "MAR 6.001"
+    assert snapshot.room("a", 1, 11) is None
+    with pytest.raises(ValueError):
+        snapshot.values[0] = 0.0
+
+    assert snapshot.personal_plans["a"][TUTORIUM][1][10] is True
+    assert snapshot.personal_plans["c"][TUTORIUM][1][10] is False
+    assert snapshot.personal_room_plans["b"][TUTORIUM][1][10] == "MAR 0.002"
+    assert snapshot.personal_room_plans["a"][UEBUNG_MAR][1][11] == ""
+    assert snapshot.optimal_plan[TUTORIUM][1][10] == 2
+    assert snapshot.optimal_plan[UEBUNG_MAR][2][10] == 1
+    # the plans are computed once
+    assert snapshot.personal_plans is snapshot.personal_plans
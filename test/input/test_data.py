@@ -0,0 +1,71 @@
+__author__ = "Alexander Elvers <aelvers AT inet.tu-berlin.de>"
+
+import datetime
+
+import numpy as np
+import pytest
+
+from tutorplanner.input import plan, tutor
+from tutorplanner.input.data import Data
+from tutorplanner.util.settings import TUTORIUM, UEBUNG_TEL
+
+
+def create_tutor(last_name, availability):
+    t = tutor.Tutor()
+    t.first_name = "Erika"
+    t.last_name = last_name
+    t.availability = availability
+    return last_name, t
+
+
+@pytest.fixture(autouse=True)
+def fix(monkeypatch):
+    monkeypatch.setattr(Data(), "_tutor_by_name", dict([
+        create_tutor("A", {
+            datetime.date(2016, 10, 18): {10: 3, 11: 3, 12: None, 13: None},
+            datetime.date(2016, 10, 19): {10: 0, 11: 0, 12: 2, 13: 2},
+        }),
+        create_tutor("B", {
+            datetime.date(2016, 10, 18): {10: 1, 11: 1, 12: 2, 13: 2},
+        }),
+    ]))
+    for attribute in ["_availability", "_availability_tensor", "_tutor_positions", "_day_positions",
+                      "_hour_positions"]:
+        monkeypatch.setattr(Data(), attribute, None)
+
+
+def test_availability_tensor():
+    data = Data()
+    tensor = data.availability_tensor
+    assert tensor.dtype == np.int8
+    assert tensor.shape == (2, 10, 8)
+    assert data.tutor_positions == {"A": 0, "B": 1}
+    assert data.day_positions[2] == 1
+    assert data.hour_positions[10] == 0
+    assert data.get_availability("A", 2, 10) == 3
+    assert data.get_availability("A", 2, 12) == 0
+    assert data.get_availability("B", 3, 12) == 0
+    assert data.get_availability("C", 2, 10) == 0
+    assert data.availability["A"][3][12] == 2
+    assert data.availability["B"][3][12] == 0
+    assert list(data.availability_of(["A", "B", "C", "A"], [2, 2, 2, 11], [11, 12, 10, 10])) == [3, 2, 0, 0]
+    assert data.count_available_tutors()[1, 0] == 2
+    assert data.count_available_tutors()[2, 0] == 0
+
+
+def test_happiness():
+    empty = plan.get_empty_plan()
+    personal_plans = {
+        name: {task: {day: {hour: False for hour in hours} for day, hours in days.items()}
+               for task, days in empty.items()}
+        for name in ["A", "B"]
+    }
+    personal_plans["A"][TUTORIUM][2][10] = True
+    personal_plans["A"][UEBUNG_TEL][3][12] = True
+    data = Data()
+    assignments = data.assignment_tensor(personal_plans)
+    assert assignments.sum() == 2
+    assert list(data.happiness(assignments)) == [2.5, 666.0]
+    assert data.cube_happiness(assignments) == 35.0
+    assert plan.compute_happiness_of_tutors(personal_plans) == {
+        name: plan.compute_happiness(personal_plans[name], data.availability[name]) for name in ["A", "B"]}
@@ -304,3 +304,19 @@ class TestPersonalPlan:
         p2 = plan.PersonalPlan.create_from_personal_plan(p.get_personal_plan())
         assert p.plan_by_tutor == p2.plan_by_tutor
         assert p.plan_by_room == p2.plan_by_room
+
+
+def test_check_plan(tutor_list, room_list):
+    r0, r1, r2, r3, r4 = room_list
+    d0 = datetime.date(2016, 10, 18)
+    day = converter.date_to_day_index(d0)
+    p = create_empty_plan(tutor_list)
+    p["A"][TUTORIUM][day][10] = r0.name
+    # two tasks in one time slot, both rooms are checked
+    p["B"][TUTORIUM][day][10] = r1.name
+    p["B"][UEBUNG_MAR][day][10] = r0.name
+    p["C"][UEBUNG_TEL][day][10] = "TEL 0"
+    assert sorted(plan.check_plan(p, room_list)) == [
+        (d0, 10, r1.name, "B", "room is not booked"),
+        (d0, 10, "TEL 0", "C", "room does not exist"),
+    ]
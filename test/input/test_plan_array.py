@@ -0,0 +1,81 @@
+__author__ = "Alexander Elvers <aelvers AT inet.tu-berlin.de>"
+
+import numpy as np
+import pytest
+
+from tutorplanner.input import plan
+from tutorplanner.input.plan_array import (PlanArray, PersonalPlanArray, DAY_POSITIONS, HOUR_POSITIONS, NO_TASK,
+                                            NO_ROOM)
+from tutorplanner.util.settings import DAYS, hours_real, TASKS, TUTORIUM, UEBUNG_TEL, KONTROLLE
+
+
+def empty_room_plan():
+    return {task: {day: dict.fromkeys(hours_real(day), "") for day in DAYS} for task in TASKS}
+
+
+@pytest.fixture
+def room_plans():
+    plans = {"A": empty_room_plan(), "B": empty_room_plan()}
+    plans["A"][TUTORIUM][1][10] = "MAR 0.001"
+    plans["A"][TUTORIUM][1][11] = "MAR 0.001"
+    plans["A"][UEBUNG_TEL][7][14] = "TEL 106li"
+    plans["B"][TUTORIUM][1][10] = "MAR 0.002"
+    return plans
+
+
+def test_plan_array():
+    target = plan.get_empty_plan()
+    target[TUTORIUM][1][10] = 3
+    target[KONTROLLE][10][17] = 1
+    plan_array = PlanArray.from_dict(target)
+    assert plan_array.to_dict() == target
+    assert list(plan_array.workload()) == [3, 0, 0, 1]
+    other = PlanArray.from_dict(plan.get_empty_plan())
+    assert plan_array.deviation(other) == 4
+    assert plan_array.diff(other).counts[0, DAY_POSITIONS[1], HOUR_POSITIONS[10]] == 3
+
+
+def test_personal_plan_array(room_plans):
+    plans = PersonalPlanArray.from_dict(room_plans)
+    assert plans.tasks.dtype == np.int8
+    assert plans.to_dict() == room_plans
+    assert plans.to_dict(rooms=False)["A"][TUTORIUM][1][10] is True
+    assert plans.to_dict(rooms=False)["B"][TUTORIUM][1][11] is False
+    assert PersonalPlanArray.from_dict(plans.to_dict(rooms=False)).to_dict(rooms=False) == plans.to_dict(rooms=False)
+
+    assert list(plans.workload()) == [plan.compute_workload(room_plans[tutor]) for tutor in ["A", "B"]]
+    assert list(plans.workload(range(1, 6))) == [2, 1]
+    assert plans.to_plan_array().counts[0, DAY_POSITIONS[1], HOUR_POSITIONS[10]] == 2
+    assert plans.to_plan_array(["B"]).counts.sum() == 1
+
+    availability = np.zeros(plans.tasks.shape, dtype=np.int8)
+    availability[0, DAY_POSITIONS[1], :] = 3
+    availability[0, DAY_POSITIONS[7], :] = 2
+    assert list(plans.happiness(availability)) == [8 / 3, 0.0]
+    plans.tasks[1] = NO_TASK
+    assert list(plans.happiness(availability)) == [8 / 3, 666.0]
+
+
+def test_changes(room_plans):
+    old = PersonalPlanArray.from_dict(room_plans)
+    room_plans["A"][TUTORIUM][1][11] = "MAR 0.003"
+    room_plans["A"][UEBUNG_TEL][7][14] = ""
+    room_plans["B"][KONTROLLE][2][12] = "TEL 109"
+    # other tutor order and room ids
+    new = PersonalPlanArray.from_dict(room_plans, ["B", "A"])
+    assert old.diff(new).sum() == 3
+    assert list(old.changes(new)) == [
+        ("A", 1, 11, TUTORIUM, TUTORIUM, "MAR 0.001", "MAR 0.003"),
+        ("A", 7, 14, UEBUNG_TEL, None, "TEL 106li", None),
+        ("B", 2, 12, None, KONTROLLE, None, "TEL 109"),
+    ]
+    assert list(old.changes(old)) == []
+
+
+def test_unknown_room(room_plans):
+    # None is an assigned task without known room (e.g. from a failed room assignment)
+    room_plans["B"][KONTROLLE][2][12] = None
+    plans = PersonalPlanArray.from_dict(room_plans)
+    assert plans.rooms[1, DAY_POSITIONS[2], HOUR_POSITIONS[12]] == NO_ROOM
+    assert list(plans.workload()) == [3, 2]
+    assert plans.to_dict() == room_plans
@@ -0,0 +1,69 @@
+__author__ = "Alexander Elvers <aelvers AT inet.tu-berlin.de>"
+
+import pickle
+import struct
+
+import pytest
+
+from tutorplanner.input import plan_file
+from tutorplanner.input.plan_array import PersonalPlanArray
+from tutorplanner.util.settings import DAYS, hours_real, TASKS, TUTORIUM, UEBUNG_TEL
+
+
+@pytest.fixture
+def room_plans():
+    plans = {name: {task: {day: dict.fromkeys(hours_real(day), "") for day in DAYS} for task in TASKS}
+             for name in ["A", "B", "C"]}
+    plans["A"][TUTORIUM][1][10] = "MAR 0.001"
+    plans["A"][UEBUNG_TEL][7][14] = "TEL 106li"
+    plans["B"][TUTORIUM][1][10] = "MAR 0.002"
+    return plans
+
+
+def test_plan_file(tmp_path, room_plans):
+    plan_file.save_plan(tmp_path, room_plans)
+    stored = plan_file.read_plan_file(tmp_path / plan_file.PLAN_FILE)
+    assert stored.has_rooms
+    assert stored.personal_plans_array.tutor_names == ["A", "B", "C"]
+    assert not stored.personal_plans_array.tasks.flags.writeable
+    assert stored.personal_room_plans == room_plans
+    assert stored.personal_room_plans is stored.personal_room_plans
+    assert stored.personal_plans["A"][UEBUNG_TEL][7][14] is True
+    assert stored.personal_plans["C"][TUTORIUM][1][10] is False
+    assert stored.plan[TUTORIUM][1][10] == 2
+
+    # rewriting keeps the loaded plan valid
+    room_plans["C"][TUTORIUM][2][12] = "MAR 0.003"
+    plan_file.save_plan(tmp_path, PersonalPlanArray.from_dict(room_plans))
+    assert stored.personal_plans_array.to_dict()["C"][TUTORIUM][2][12] == ""
+    assert plan_file.read_plan_folder(tmp_path).personal_room_plans == room_plans
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_plan_file_without_rooms(tmp_path):
+    plan_file.save_plan(tmp_path, PersonalPlanArray([]), has_rooms=False)
+    stored = plan_file.read_plan_folder(tmp_path)
+    assert stored.personal_room_plans is None
+    assert stored.personal_plans == {}
+
+
+def test_pickled_plans(tmp_path, room_plans):
+    with open(tmp_path / "personalPlans_Rooms.pickle", "wb") as f:
+        pickle.dump(room_plans, f)
+    stored = plan_file.read_plan_folder(tmp_path)
+    assert stored.personal_room_plans == room_plans
+    assert stored.plan[TUTORIUM][1][10] == 2
+    with pytest.raises(FileNotFoundError):
+        plan_file.read_plan_folder(tmp_path / "missing")
+
+
+def test_invalid_plan_file(tmp_path, room_plans):
+    path = tmp_path / plan_file.PLAN_FILE
+    plan_file.save_plan(tmp_path, room_plans)
+    contents = path.read_bytes()
+    path.write_bytes(contents[:8] + struct.pack("<I", plan_file.FORMAT_VERSION + 1) + contents[12:])
+    with pytest.raises(ValueError, match="version"):
+        plan_file.read_plan_file(path)
+    path.write_bytes(b"\x80\x04" + contents[2:])
+    with pytest.raises(ValueError, match="not a plan file"):
+        plan_file.read_plan_file(path)
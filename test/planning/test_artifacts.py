@@ -0,0 +1,66 @@
+__author__ = "Alexander Elvers <aelvers AT inet.tu-berlin.de>"
+
+import gzip
+
+import pytest
+
+from tutorplanner.planning import artifacts
+from tutorplanner.util import settings
+
+
+def test_level_policy():
+    assert artifacts.level_policy() == "per_level"
+    settings.settings._data["artifacts"] = {"levels": "final"}
+    assert artifacts.level_policy() == "final"
+    settings.settings._data["artifacts"] = {"levels": "foo"}
+    with pytest.raises(ValueError):
+        artifacts.level_policy()
+
+
+@pytest.mark.parametrize("background", [False, True])
+def test_writer(background):
+    written = []
+    with artifacts.ArtifactWriter(background) as writer:
+        for i in range(10):
+            writer.submit(written.append, i)
+    assert written == list(range(10))
+
+
+def test_writer_error():
+    writer = artifacts.ArtifactWriter(background=True)
+    writer.submit(int, "foo")
+    with pytest.raises(ValueError):
+        writer.close()
+
+
+def test_compress(tmp_path):
+    filename = tmp_path / "Level_1foo.lp"
+    filename.write_text("Maximize\n")
+    artifacts.compress(str(filename))
+    assert not filename.exists()
+    with gzip.open(str(filename) + ".gz", "rt") as file:
+        assert file.read() == "Maximize\n"
+
+
+class FakeOptimizer:
+    def write_lp(self, filename):
+        with open(filename + "foo.lp", "w") as file:
+            file.write("Maximize\n")
+
+    def write_solution(self, filename):
+        with open(filename + ".sol", "w") as file:
+            file.write("x 1\n")
+
+
+def test_write_model_files(tmp_path):
+    filename = str(tmp_path / "Level_1")
+    # compressed by default
+    artifacts.write_model_files(FakeOptimizer(), filename)
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["Level_1.sol.gz", "Level_1foo.lp.gz"]
+    settings.settings._data["artifacts"] = {"compress": False}
+    artifacts.write_model_files(FakeOptimizer(), filename)
+    assert (tmp_path / "Level_1foo.lp").exists() and (tmp_path / "Level_1.sol").exists()
+    settings.settings._data["artifacts"] = {"models": False}
+    filename = str(tmp_path / "Level_2")
+    artifacts.write_model_files(FakeOptimizer(), filename)
+    assert not (tmp_path / "Level_2foo.lp").exists() and not (tmp_path / "Level_2foo.lp.gz").exists()
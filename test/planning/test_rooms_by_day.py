@@ -0,0 +1,39 @@
+__author__ = "Alexander Elvers <aelvers AT inet.tu-berlin.de>"
+
+import pytest
+
+from tutorplanner.gurobiinterface.initial import PlanningCreator
+from tutorplanner.planning.initial import prepare_room_level, ROOM_LEVELS
+from tutorplanner.planning.rooms import plan_rooms_by_day
+from tutorplanner.util import settings
+from tutorplanner.util.settings import TUTORIUM, UEBUNG_MAR, KONTROLLE
+
+
+def test_plan_rooms_by_day(small_target_plan, tmp_path):
+    settings.settings._data["optimization_parameters"]["room_processes"] = 2
+    settings.settings._data["artifacts"] = {"levels": "none"}
+    pc = PlanningCreator(small_target_plan)
+    pc.create_model_without_rooms()
+    pc.plugin_constraint_bound_maximal_deviation_from_target_plan(max_deviation=0)
+    pc.plugin_obj_minimize_deviation_from_plan()
+    assert pc.solve_integer_program().is_feasible()
+
+    # the workers are spawned, they get the course of the fixture instead of loading it from the files
+    room_plans, level_solutions = plan_rooms_by_day(pc, {"target_plan": small_target_plan}, prepare_room_level,
+                                                    ROOM_LEVELS, tmp_path)
+    # the rooms of both days are merged
+    assigned = {key[:3] for key in pc.schedule_entry.keys if pc.check_assignment(*key)}
+    assert {day for _, day, _ in assigned} == {1, 2}
+    assert set(room_plans.rooms) == assigned
+    personal_room_plans = room_plans.get_personal_room_plans()
+    assert [personal_room_plans[tutor][TUTORIUM][1][hour] for hour in [10, 11] for tutor in ["A", "B"]
+            if personal_room_plans[tutor][TUTORIUM][1][hour]] == ["MAR 0.001", "MAR 0.001"]
+    assert personal_room_plans["B"][KONTROLLE][2][15] == "TEL 109"
+    assert [personal_room_plans[tutor][UEBUNG_MAR][2][14] for tutor in ["A", "B"]
+            if personal_room_plans[tutor][UEBUNG_MAR][2][14]] in [["MAR 6.001"], ["MAR 6.057"]]
+
+    # the same objectives as the room levels of the whole model
+    pc.extend_model_with_room_support()
+    for level in ROOM_LEVELS:
+        prepare_room_level(pc, level)
+        assert pc.solve_integer_program().get_objective() == pytest.approx(level_solutions[level])
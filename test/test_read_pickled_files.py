@@ -0,0 +1,66 @@
+__author__ = "Alexander Elvers <aelvers AT inet.tu-berlin.de>"
+
+import os
+
+import pytest
+
+from tutorplanner import read_pickled_files as rpf
+from tutorplanner.input import plan_file
+from tutorplanner.util.settings import DAYS, hours_real, TASKS, TUTORIUM, KONTROLLE
+
+
+@pytest.fixture
+def room_plans():
+    plans = {name: {task: {day: dict.fromkeys(hours_real(day), "") for day in DAYS} for task in TASKS}
+             for name in ["Muster_mann", "Arnim"]}
+    plans["Muster_mann"][TUTORIUM][2][10] = "MAR 0.001"
+    plans["Muster_mann"][KONTROLLE][2][12] = "TEL 109"
+    plans["Arnim"][TUTORIUM][2][10] = "MAR 0.002"
+    return plans
+
+
+@pytest.fixture
+def checks(monkeypatch, tmp_path):
+    checked = []
+    monkeypatch.setattr(rpf, "get_plan_paths", lambda: {"active": tmp_path})
+    monkeypatch.setattr(rpf, "check_plan", checked.append)
+    monkeypatch.setattr(rpf, "_plan_index", None)
+    return checked
+
+
+def test_views(tmp_path, room_plans, checks):
+    plan_file.save_plan(tmp_path, room_plans)
+    assert list(rpf.get_rooms_by_day()[2].items()) == [
+        ("MAR 0.001", {10: ("Muster\\_mann", TUTORIUM)}),
+        ("TEL 109", {12: ("Muster\\_mann", KONTROLLE)}),
+        ("MAR 0.002", {10: ("Arnim", TUTORIUM)}),
+    ]
+    assert rpf.get_rooms_by_day()[3] == {}
+    assert rpf.get_tutorials_by_time() == {2: {10: [("MAR 0.001", "Muster_mann"), ("MAR 0.002", "Arnim")]}}
+    assert rpf.get_tutorials_for_tickets()[2] == [(10, "MAR 0.001", "Muster_mann"), (10, "MAR 0.002", "Arnim")]
+    assert rpf.get_tutorials_for_tickets()[3] == []
+    assert rpf.get_extended_tutorials_for_tickets()[2] == {10: {"MAR 0.001": ["Muster\\_mann"],
+                                                                "MAR 0.002": ["Arnim"]},
+                                                           12: {"TEL 109": ["Muster\\_mann"]}}
+    assert rpf.get_events_by_time()[2][10] == [(TUTORIUM, "MAR 0.001", "Muster_mann"),
+                                               (TUTORIUM, "MAR 0.002", "Arnim")]
+    assert rpf.get_schedule_per_tutor()["Muster_mann"] == [
+        dict(task=TUTORIUM, time=10, day=2, weekday="Dienstag", room="MAR 0.001"),
+        dict(task=KONTROLLE, time=12, day=2, weekday="Dienstag", room="TEL 109"),
+    ]
+    assert rpf.get_active_plan_dict() == room_plans
+    assert len(checks) == 1
+
+
+def test_reload(tmp_path, room_plans, checks):
+    plan_file.save_plan(tmp_path, room_plans)
+    index = rpf.PlanIndex.active()
+    assert rpf.PlanIndex.active() is index
+    assert rpf.get_rooms_by_day() is rpf.get_rooms_by_day()
+
+    room_plans["Arnim"][TUTORIUM][2][10] = ""
+    plan_file.save_plan(tmp_path, room_plans)
+    os.utime(tmp_path / plan_file.PLAN_FILE, ns=(0, index.key[1] + 1))
+    assert rpf.PlanIndex.active() is not index
+    assert "MAR 0.002" not in rpf.get_rooms_by_day()[2]
+    assert len(checks) == 2
@@ -0,0 +1,32 @@
+__author__ = "Alexander Elvers <aelvers AT inet.tu-berlin.de>"
+
+import pathlib
+
+import pytest
+
+from tutorplanner.gurobiinterface.initial import PlanningCreator
+from tutorplanner.input.plan import get_target_plan
+
+BENCHMARKS = pathlib.Path(__file__).resolve().parents[1] / "benchmarks"
+
+
+@pytest.fixture
+def scenario(monkeypatch):
+    pytest.importorskip("highspy")
+    monkeypatch.syspath_prepend(str(BENCHMARKS))
+    import scenario
+    return scenario
+
+
+def test_generated_scenario_is_feasible(scenario, tmp_path):
+    folder = scenario.generate_scenario(tmp_path / "10x5", tutors=10, tutorial_rooms=5, solver="highs")
+    with scenario.use_scenario(folder):
+        target_plan = get_target_plan()
+        # the tutors of the random plan can work all tasks of the target plan and their fair share
+        pc = PlanningCreator(target_plan)
+        pc.create_model_without_rooms()
+        pc.plugin_constraint_bound_maximal_deviation_from_target_plan(max_deviation=0)
+        pc.plugin_obj_minimize_deviation_from_plan()
+        status = pc.solve_integer_program()
+        assert status.is_feasible()
+        assert status.get_objective() == pytest.approx(0.0)
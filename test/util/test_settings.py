@@ -118,6 +118,19 @@ class TestSettings:
         assert s.a[0]._get("b", None)() is None
 
 
+def test_lazy_settings(tmp_path):
+    file = tmp_path / "settings.yaml"
+    s = settings.LazySettings(str(file))
+    file.write_text("a: 1\n")  # not read before the first access
+    assert s.a() == 1
+    file.write_text("a: 2\n")
+    assert s.a() == 1
+    s._data = {"a": 3}
+    assert s.a() == 3
+
+    assert settings.LazySettings(str(tmp_path / "missing.yaml"))() is None
+
+
 def test_get_room_info(monkeypatch):
     def info(type=None, capacity=None, projector=None, tutorial_size=None):
         return dict(type=type, capacity=capacity, projector=projector, tutorial_size=tutorial_size)
@@ -153,3 +166,33 @@ def test_get_room_info(monkeypatch):
     assert settings.get_room_info("MAR 0.002") == info("tutorial", None, True)
     assert settings.get_room_info("MAR 6.001") == info("exercise", 25, True)
     assert settings.get_room_info("HFT-FT 131") == info("tutorial", None, False)
+
+
+def test_get_room_info_reload(monkeypatch):
+    monkeypatch.setitem(settings.settings._data, "room_patterns", [dict(pattern="MAR *", capacity=30)])
+    assert settings.get_room_info("MAR 0.001")["capacity"] == 30
+    # reloading replaces the patterns
+    monkeypatch.setattr(settings.settings, "_data", {"room_patterns": [dict(pattern="MAR *", capacity=20)]})
+    assert settings.get_room_info("MAR 0.001")["capacity"] == 20
+    # the result can be modified
+    settings.get_room_info("MAR 0.001")["capacity"] = 10
+    assert settings.get_room_info("MAR 0.001")["capacity"] == 20
+
+
+def test_room_info_resolver():
+    resolver = settings.RoomInfoResolver([dict(pattern=f"R {i}*", capacity=i) for i in range(200)], cache_size=10)
+    assert resolver("R 1")["capacity"] == 1
+    assert resolver("R 150")["capacity"] == 150
+    assert resolver("R 1999")["capacity"] == 199
+    assert resolver("r 42")["capacity"] == 42
+    for i in range(100):
+        resolver(f"R {i}")
+    assert resolver.cached_room_info.cache_info().currsize == 10
+
+    # later wildcard patterns override concrete rooms
+    resolver = settings.RoomInfoResolver([
+        dict(pattern="MAR 0.001", type="tutorial", capacity=30),
+        dict(pattern="MAR *", capacity=20),
+        dict(pattern="mar 0.001", projector=0),
+    ])
+    assert resolver("MAR 0.001") == dict(type="tutorial", capacity=20, projector=False, tutorial_size=None)
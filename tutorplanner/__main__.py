@@ -2,50 +2,82 @@ __author__ = ("Alexander Elvers <aelvers AT inet.tu-berlin.de>, "
               "Matthias Rost <mrost AT inet.tu-berlin.de>")
 
 import glob
+import importlib
 import itertools
 import re
+import tracemalloc
 
 import click
 from pathlib import Path
 
-from . import read_pickled_files as rpf, output, update_plan
-from .input import lsf_parser, rooms, plan
-from .input.data import Data
-from .planning import initial, rolling, base as base_planning
+# The modules of the commands (input files, solver, plotting, templates) are
+# imported in the commands, so that each command only loads what it needs.
+# See benchmarks/import_time.py.
 from .util import settings, converter
 from .util.settings import DAYS, hours_real, TUTORIUM
 
 
-@click.group()
-def cli():
-    pass
+class LazyGroup(click.Group):
+    """
+    Group with subcommands that are imported on use.
 
+    lazy_commands maps the command names to "module:attribute", the module is
+    relative to this package.
+    """
 
-cli.add_command(output.cli, "output")
-cli.add_command(update_plan.cli_state, "state")
-cli.add_command(update_plan.cli_update, "update-plan")
+    def __init__(self, *args, lazy_commands=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = lazy_commands or {}
+
+    def list_commands(self, ctx):
+        return sorted([*super().list_commands(ctx), *self.lazy_commands])
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in self.lazy_commands:
+            module_name, attribute = self.lazy_commands[cmd_name].split(":")
+            return getattr(importlib.import_module(module_name, __package__), attribute)
+        return super().get_command(ctx, cmd_name)
+
+
+@click.group(cls=LazyGroup, lazy_commands={
+    "output": ".output:cli",
+    "state": ".update_plan:cli_state",
+    "update-plan": ".update_plan:cli_update",
+})
+def cli():
+    pass
 
 
 @cli.group()
-def planning():
+@click.option("--trace-memory", is_flag=True, help="measure the memory of the model building (slower)")
+def planning(trace_memory):
     """
     Run planner.
+
+    The time and size of building the model is printed at the end and saved
+    to build_report.json in the plan folder.
     """
+    if trace_memory:
+        tracemalloc.start()
 
 
 @planning.command("initial")
-def planning_initial():
+@click.option("--hierarchical", is_flag=True, help="solve all levels in one run with hierarchical objectives")
+def planning_initial(hierarchical):
     """
     Run initial planner.
 
     Initial planning starts from scratch.
     """
-    initial.main()
+    from .planning import initial
+
+    initial.main(hierarchical)
 
 
 @planning.command("rolling")
 @click.argument("next_day")
-def planning_rolling(next_day):
+@click.option("--hierarchical", is_flag=True, help="solve all levels in one run with hierarchical objectives")
+def planning_rolling(next_day, hierarchical):
     """
     Run rolling wave planner.
 
@@ -55,6 +87,8 @@ def planning_rolling(next_day):
     For days before next_day, the active plan is used. The first day that can
     have changes in rolling wave planning is next_day.
     """
+    from .planning import rolling
+
     days = settings.settings.days._or([])()
     days_dict = dict([(f"{d:%m-%d}", d) for d in days] + [(f"{d:%Y-%m-%d}", d) for d in days])
     if next_day not in days_dict:
@@ -62,7 +96,7 @@ def planning_rolling(next_day):
     next_day = days_dict[next_day]
     next_day_index = converter.date_to_day_index(next_day)
 
-    rolling.main(next_day_index)
+    rolling.main(next_day_index, hierarchical)
 
 
 @cli.command("lsf-to-csv")
@@ -73,6 +107,8 @@ def lsf_to_csv(lsf_files, csv_file):
     Convert all LSF files to CSV. The lsf_files are a glob pattern, e.g.
     'data/*.xml', so it's better to quote. The csv_file is the output file.
     """
+    from .input import lsf_parser, rooms
+
     for file in glob.glob(lsf_files):
         print("read", file)
 
@@ -103,6 +139,8 @@ def lsf_to_xlsx(output_file, lsf_xml_input_files, csv_input_files, type, include
 
     It's better to quote regular expressions or glob patterns.
     """
+    from .input import lsf_parser, rooms
+
     if verbose:
         print(f"selected include filter: {include}")
         print(f"selected exclude filter: {exclude}")
@@ -168,6 +206,8 @@ def room_info(csv_file, room_name, type, projector):
     Print room information, i.e. room name, room type, capacity, projector.
     The room names are read from csv and the rest from settings.
     """
+    from .input import rooms
+
     booked_rooms = rooms.import_rooms_from_csv(csv_file)
     room_count = 0
     capacity_sum = 0
@@ -201,6 +241,8 @@ def check_tutor_responses():
     """
     Check tutor responses.
     """
+    from .input.data import Data
+
     tutors = Data().tutor_by_name.values()
     print("Tutors without problems:")
     for t in tutors:
@@ -216,6 +258,9 @@ def export_plan(output, empty, pickled, diff):
     """
     Export plan to xlsx.
     """
+    from . import read_pickled_files as rpf, update_plan
+    from .input import plan
+
     if not (empty or pickled or diff):
         print("nothing to do")
         return
@@ -252,6 +297,9 @@ def export_plan(output, empty, pickled, diff):
 @click.option("--lsf-xml-input-files", default=None, help="booking files in xml from lsf (glob pattern)")
 @click.option("--csv-input-files", default=None, help="booking files in csv (glob pattern)")
 def check_plan(lsf_xml_input_files, csv_input_files):
+    from . import read_pickled_files as rpf
+    from .input import lsf_parser, plan, rooms
+
     booked_rooms = []
 
     if lsf_xml_input_files is not None:
@@ -277,6 +325,9 @@ def check_plan(lsf_xml_input_files, csv_input_files):
 
 @cli.command("tutorial-seat-overview")
 def tutorial_seat_overview():
+    from . import read_pickled_files as rpf
+    from .input.data import Data
+
     room_plan = rpf.get_active_plan_dict()
 
     tutorial_caps = [24, 27, 30, 33]
@@ -301,6 +352,10 @@ def find_available_tutors(day, hour):
     """
     Find available tutor at given time.
     """
+    from .input import plan
+    from .input.data import Data
+    from .planning import base as base_planning
+
     original_day = day
     days = settings.settings.days._or([])()
     days_dict = dict([(f"{d:%m-%d}", d) for d in days] + [(f"{d:%Y-%m-%d}", d) for d in days])
@@ -317,10 +372,11 @@ def find_available_tutors(day, hour):
 
     active_plan = base_planning.get_plan(plan_folder)
 
+    availability = Data().availability_tensor[:, Data().day_positions[day_index], Data().hour_positions[hour]]
     tutors_by_availability = {i: [] for i in range(4)}
     tutor_has_a_task = set()
-    for tutor_name, tutor_availability in Data().availability.items():
-        tutors_by_availability[tutor_availability[day_index][hour]].append(tutor_name)
+    for tutor_name, t in Data().tutor_positions.items():
+        tutors_by_availability[int(availability[t])].append(tutor_name)
         for task in settings.TASKS:
             if active_plan[tutor_name][task][day_index][hour]:
                 tutor_has_a_task.add(tutor_name)
@@ -346,6 +402,8 @@ def tutor_mail_addresses():
     """
     Just print mail-addresses ordered according to last name
     """
+    from .input.data import Data
+
     tutors_by_name = Data().tutor_by_name
     for tutor_name in sorted(tutors_by_name.keys()):
         print(f"{tutor_name:20s} {tutors_by_name[tutor_name].first_name:20s}: {tutors_by_name[tutor_name].email:30s}")
@@ -355,6 +413,9 @@ def tutor_mail_addresses():
 @click.argument("day")
 @click.argument("hour", type=int)
 def show_working_tutors(day, hour):
+    from . import read_pickled_files as rpf
+    from .input.data import Data
+
     original_day = day
     days = settings.settings.days._or([])()
     days_dict = dict([(f"{d:%m-%d}", d) for d in days] + [(f"{d:%Y-%m-%d}", d) for d in days])
@@ -398,6 +459,9 @@ def show_working_tutors(day, hour):
 
 
 def _relative_workload_of_tutor(tutor_name, tutor_plan):
+    from .input import plan
+    from .input.data import Data
+
     return plan.compute_workload(tutor_plan) / float(Data().tutor_by_name[tutor_name].monthly_work_hours / 2.0)
 
 
@@ -406,6 +470,11 @@ def _relative_workload_of_tutor(tutor_name, tutor_plan):
 @click.argument("path_to_new_plan")
 @click.argument("output_folder")
 def output_diff_of_plans(path_to_old_plan, path_to_new_plan, output_folder):
+    from . import output
+    from .input import plan
+    from .input.data import Data
+    from .planning import base as base_planning, rolling
+
     path_to_old_plan = Path(path_to_old_plan)
     path_to_new_plan = Path(path_to_new_plan)
     output_folder = Path(output_folder)
@@ -418,12 +487,13 @@ def output_diff_of_plans(path_to_old_plan, path_to_new_plan, output_folder):
     X = []
     Y = []
 
+    happiness = plan.compute_happiness_of_tutors(new_plan)
     for tutor, tutor_plan in new_plan.items():
         if Data().tutor_by_name[tutor].monthly_work_hours == 0:
             X.append(float("NaN"))
         else:
             X.append(_relative_workload_of_tutor(tutor, tutor_plan))
-        Y.append(plan.compute_happiness(tutor_plan, Data().availability[tutor]))
+        Y.append(happiness[tutor])
 
     output_file = str(output_folder) + "/happiness"
     output.plot_happy_and_fair(X, Y, output_file)
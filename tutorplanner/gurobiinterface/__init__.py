@@ -1,6 +1,7 @@
 """
 The ``gurobiinterface`` package contains the ``PlanningCreator`` classes that
-are used to set Gurobi variables and constraints.
+are used to set the variables and constraints of the MIP. The MIP is solved
+by a solver backend, see :py:mod:`tutorplanner.gurobiinterface.backend`.
 
 The planning steps are defined in :py:mod:`tutorplanner.planning`.
 """
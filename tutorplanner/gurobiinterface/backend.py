@@ -0,0 +1,742 @@
+"""
+The ``backend`` module contains the solver backends of the planner.
+
+A backend owns the model of one solver. Variables are referenced by their
+index (in the order of creation), constraints are added as sparse matrices
+over these indices and linear expressions are pairs of index and
+coefficient arrays (:py:class:`LinearExpression`). The planner only talks to
+this interface, so the same model can be solved with Gurobi or with the
+open-source solver HiGHS.
+
+The backend is selected with ``optimization_parameters.solver`` in the
+settings (``gurobi`` or ``highs``).
+
+Names of variables and constraints cost a lot of time and memory for large
+models. With ``optimization_parameters.anonymous_names``, the backend keeps
+the names unformatted (see :py:class:`~.matrix.Names`) and passes them to the
+solver only when the model is written or an IIS is computed.
+"""
+
+__author__ = "Alexander Elvers <aelvers AT inet.tu-berlin.de>"
+
+__all__ = [
+    "LinearExpression",
+    "Objective",
+    "SolverBackend",
+    "GurobiBackend",
+    "HighsBackend",
+    "BACKENDS",
+    "create_backend",
+    "BINARY",
+    "CONTINUOUS",
+    "LESS_EQUAL",
+    "GREATER_EQUAL",
+    "EQUAL",
+    "MINIMIZE",
+    "MAXIMIZE",
+]
+
+import bisect
+from typing import Any, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import scipy.sparse
+
+from . import status
+
+# variable types, senses and objective senses (same values as in gurobipy)
+BINARY = "B"
+CONTINUOUS = "C"
+LESS_EQUAL = "<"
+GREATER_EQUAL = ">"
+EQUAL = "="
+MINIMIZE = 1
+MAXIMIZE = -1
+
+
+class LinearExpression(NamedTuple):
+    """
+    Weighted sum of variables, given by the variable indices and their
+    coefficients, plus a constant (e.g. the contribution of the fixed past in
+    rolling wave planning).
+    """
+    indices: np.ndarray
+    coefficients: np.ndarray
+    constant: float = 0.0
+
+    def value(self, solution: np.ndarray) -> float:
+        """
+        Evaluate the expression for a solution of the backend.
+        """
+        return float(np.dot(self.coefficients, solution[self.indices])) + self.constant
+
+    def normalized(self) -> Tuple["LinearExpression", float]:
+        """
+        Divide the coefficients by a power of two, so that the largest
+        absolute coefficient is close to 1. Returns the expression and the
+        scale, i.e. the original expression is ``scale`` times the returned
+        one. Since the scale is a power of two, the division is exact. The
+        ratio of the largest to the smallest coefficient stays the same.
+
+        >>> expression, scale = LinearExpression(np.array([0, 1]), np.array([30e6, 30.0])).normalized()
+        >>> scale, expression.coefficients.tolist()
+        (33554432.0, [0.8940696716308594, 8.940696716308594e-07])
+        """
+        largest = np.abs(self.coefficients).max(initial=0.0)
+        if not largest:
+            return self, 1.0
+        scale = 2.0 ** round(np.log2(largest))
+        return LinearExpression(self.indices, self.coefficients / scale, self.constant / scale), scale
+
+
+class Objective(NamedTuple):
+    """
+    Objective of a planning level.
+
+    In a hierarchical solve, later objectives may only degrade the optimal
+    value ``z`` of this objective by ``max(relative_tolerance * |z|,
+    absolute_tolerance)``.
+    """
+    expression: LinearExpression
+    sense: int
+    name: str = ""
+    relative_tolerance: float = 0.0
+    absolute_tolerance: float = 0.0
+    time_limit: Optional[float] = None
+
+    def with_tolerances(self, bound_factor: float, absolute_tolerance: float = 0.0) -> "Objective":
+        """
+        Return the objective with the relative tolerance of a bound factor of
+        the sequential planning, e.g. 0.95 for keeping 95 % of a maximum or
+        1.05 for allowing 5 % more than a minimum.
+        """
+        return self._replace(relative_tolerance=abs(1.0 - bound_factor), absolute_tolerance=absolute_tolerance)
+
+    def bound(self, value: float):
+        """
+        Return the sense and right-hand side of the constraint that keeps the
+        objective within its tolerance of the optimal value.
+        """
+        tolerance = max(self.relative_tolerance * abs(value), self.absolute_tolerance)
+        if self.sense == MINIMIZE:
+            return LESS_EQUAL, value + tolerance
+        return GREATER_EQUAL, value - tolerance
+
+
+class SolverBackend:
+    """
+    Interface of a solver backend.
+
+    The base class keeps track of the variables that were removed, of the
+    values of the last solution and of the names that were not passed to the
+    solver yet.
+
+    If ``anonymous_names`` is enabled, names are not passed to the solver
+    when variables and constraints are added, but only before the model is
+    written (:py:meth:`pass_names`).
+    """
+
+    #: name of the backend in the settings
+    name: str = None
+
+    def __init__(self, model_name: str, anonymous_names: bool = False) -> None:
+        self.model_name = model_name
+        self.anonymous_names = anonymous_names
+        # whether the variable with this index is still part of the model
+        self.alive: List[bool] = []
+        #: values of the last solution (indexed by variable index, NaN for removed variables) or None
+        self.solution: Optional[np.ndarray] = None
+        # first variable index and names of all named blocks of variables, for looking up names
+        self.variable_name_starts: List[int] = []
+        self.variable_names: List[Sequence[str]] = []
+        # names that were not passed to the solver yet: (indices, names) and (constraint handles, names)
+        self.pending_variable_names: List[Tuple[np.ndarray, Sequence[str]]] = []
+        self.pending_constraint_names: List[Tuple[List[Any], Sequence[str]]] = []
+        # smallest and largest absolute nonzero value of the matrix, the right-hand sides and the objective
+        self.coefficient_ranges = {"matrix": (np.inf, 0.0), "rhs": (np.inf, 0.0), "objective": (np.inf, 0.0)}
+
+    @property
+    def number_of_variables(self) -> int:
+        """
+        Number of variable indices, including removed variables.
+        """
+        return len(self.alive)
+
+    def alive_indices(self, indices: Sequence[int]) -> np.ndarray:
+        """
+        Filter the indices of variables that were not removed.
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        return indices[np.asarray(self.alive, dtype=bool)[indices]] if len(indices) else indices
+
+    def add_variables(self, count: int, lb: float, ub: float, vtype: str,
+                      names: Optional[Sequence[str]] = None) -> np.ndarray:
+        """
+        Add variables and return their indices.
+        """
+        raise NotImplementedError
+
+    def add_constraints(self, matrix: scipy.sparse.csr_matrix, sense: str, rhs: np.ndarray,
+                        names: Optional[Sequence[str]] = None) -> List[Any]:
+        """
+        Add the constraints ``matrix @ x <sense> rhs``. The columns of the
+        matrix are the variable indices. Returns one handle per row.
+        """
+        raise NotImplementedError
+
+    def add_variable_names(self, indices: np.ndarray, names: Optional[Sequence[str]]) -> bool:
+        """
+        Remember the names of new variables. Returns whether the names have
+        to be passed to the solver now, otherwise they are pending.
+        """
+        if names is None or not len(indices):
+            return False
+        self.variable_name_starts.append(int(indices[0]))
+        self.variable_names.append(names)
+        if self.anonymous_names:
+            self.pending_variable_names.append((indices, names))
+            return False
+        return True
+
+    def add_constraint_names(self, constraints: List[Any], names: Optional[Sequence[str]]) -> bool:
+        """
+        Remember the names of new constraints, see :py:meth:`add_variable_names`.
+        """
+        if names is None or not constraints:
+            return False
+        if self.anonymous_names:
+            self.pending_constraint_names.append((constraints, names))
+            return False
+        return True
+
+    def record_coefficients(self, kind: str, values: Any) -> None:
+        """
+        Update the range of ``matrix``, ``rhs`` or ``objective`` values.
+        """
+        values = np.abs(np.asarray(values, dtype=float))
+        values = values[values > 0]
+        if len(values):
+            smallest, largest = self.coefficient_ranges[kind]
+            self.coefficient_ranges[kind] = min(smallest, values.min()), max(largest, values.max())
+
+    def coefficient_statistics(self) -> dict:
+        """
+        Return the ranges of the absolute nonzero values of the matrix, the
+        right-hand sides and the current objective (None if there are none).
+        """
+        return {kind: (float(smallest), float(largest)) if largest else None
+                for kind, (smallest, largest) in self.coefficient_ranges.items()}
+
+    def variable_name(self, index: int) -> Optional[str]:
+        """
+        Get the name of a variable (for debugging), also if it was not passed
+        to the solver yet.
+        """
+        i = bisect.bisect_right(self.variable_name_starts, index) - 1
+        if i < 0:
+            return None
+        position = index - self.variable_name_starts[i]
+        names = self.variable_names[i]
+        return names[position] if position < len(names) else None
+
+    def pass_names(self) -> None:
+        """
+        Pass the pending names to the solver.
+        """
+        raise NotImplementedError
+
+    def add_constraint(self, expression: LinearExpression, sense: str, rhs: float, name: str = "") -> Any:
+        """
+        Add a single constraint ``expression <sense> rhs`` and return its handle.
+        """
+        matrix = scipy.sparse.csr_matrix(
+            (np.asarray(expression.coefficients, dtype=float), np.asarray(expression.indices, dtype=np.int64),
+             np.array([0, len(expression.indices)])), shape=(1, self.number_of_variables))
+        return self.add_constraints(matrix, sense, np.array([float(rhs) - expression.constant]),
+                                    [name] if name else None)[0]
+
+    def remove_constraints(self, constraints: List[Any]) -> None:
+        raise NotImplementedError
+
+    def remove_variables(self, indices: Sequence[int]) -> None:
+        for i in indices:
+            self.alive[i] = False
+
+    def set_objective(self, expression: LinearExpression, sense: int) -> None:
+        raise NotImplementedError
+
+    def set_start(self, indices: Sequence[int], values: Sequence[float]) -> None:
+        """
+        Set start values of variables for the next solve. Variables without
+        start value are completed by the solver.
+        """
+        raise NotImplementedError
+
+    def set_hints(self, indices: Sequence[int], values: Sequence[float]) -> None:
+        """
+        Set hints for variable values. Backends without hints ignore them.
+        """
+
+    def set_parameter(self, name: str, value: Any) -> None:
+        """
+        Set a parameter. Known names are ``mip_gap``, ``time_limit``,
+        ``iteration_limit``, ``numeric_focus``, ``mip_focus`` and ``threads``. Parameters
+        that the solver does not have are ignored.
+        """
+        raise NotImplementedError
+
+    def update(self) -> None:
+        """
+        Apply pending model changes.
+        """
+
+    def optimize(self, has_start: bool = False) -> status.SolverStatus:
+        """
+        Solve the model, store the solution and return the status.
+        """
+        raise NotImplementedError
+
+    def optimize_hierarchically(self, objectives: List[Objective], has_start: bool = False):
+        """
+        Optimize the objectives lexicographically (the first objective has the
+        highest priority). Returns the status and the solution after each
+        objective.
+
+        This implementation solves one objective after the other and bounds
+        the objective by its tolerance before solving the next one.
+        """
+        snapshots = []
+        result = None
+        for objective in objectives:
+            self.set_objective(objective.expression, objective.sense)
+            if objective.time_limit is not None:
+                self.set_parameter("time_limit", objective.time_limit)
+            if snapshots:
+                # the start is set after the objective, HiGHS drops it when the objective changes
+                alive = self.alive_indices(np.arange(len(snapshots[-1])))
+                self.set_start(alive, snapshots[-1][alive])
+                has_start = True
+            result = self.optimize(has_start)
+            if self.solution is None:
+                break
+            snapshots.append(self.solution.copy())
+            sense, rhs = objective.bound(objective.expression.value(self.solution))
+            self.add_constraint(objective.expression, sense, rhs, f"hierarchy_{objective.name}")
+        return result, snapshots
+
+    def size(self):
+        """
+        Return the number of variables, constraints and nonzeros.
+        """
+        raise NotImplementedError
+
+    def write(self, filename: str) -> None:
+        """
+        Write the model (``.lp``, ``.mps``) or the solution (``.sol``).
+        """
+        raise NotImplementedError
+
+    def write_iis(self, filename: str) -> None:
+        """
+        Compute an irreducible infeasible subsystem and write it.
+        """
+        raise NotImplementedError
+
+
+class GurobiBackend(SolverBackend):
+    """
+    Backend for Gurobi using the matrix API of gurobipy.
+    """
+
+    name = "gurobi"
+
+    def __init__(self, model_name: str, anonymous_names: bool = False) -> None:
+        super().__init__(model_name, anonymous_names)
+        import gurobipy
+        self.gurobipy = gurobipy
+        self.model = gurobipy.Model(model_name)
+        self.vars = []
+
+    def add_variables(self, count, lb, ub, vtype, names=None):
+        new_vars = self.model.addMVar(count, lb=lb, ub=ub, vtype=vtype).tolist()
+        indices = np.arange(len(self.vars), len(self.vars) + count, dtype=np.int64)
+        self.vars.extend(new_vars)
+        self.alive.extend([True] * count)
+        if self.add_variable_names(indices, names):
+            self.model.setAttr("VarName", new_vars, list(names))
+        return indices
+
+    def add_constraints(self, matrix, sense, rhs, names=None):
+        n_rows = matrix.shape[0]
+        if not n_rows:
+            return []
+        rhs = np.broadcast_to(np.asarray(rhs, dtype=float), (n_rows,))
+        self.record_coefficients("matrix", matrix.data)
+        self.record_coefficients("rhs", rhs)
+        if not matrix.nnz:
+            # only empty rows
+            constrs = [self.model.addLConstr(0.0, sense, value) for value in rhs]
+        else:
+            # only pass the variables that are used in the matrix
+            used, columns = np.unique(matrix.indices, return_inverse=True)
+            matrix = scipy.sparse.csr_matrix((matrix.data, columns, matrix.indptr), shape=(n_rows, len(used)))
+            constrs = self.model.addMConstr(matrix, [self.vars[i] for i in used], sense, rhs).tolist()
+        if self.add_constraint_names(constrs, names):
+            self.model.setAttr("ConstrName", constrs, list(names))
+        return constrs
+
+    def add_constraint(self, expression, sense, rhs, name=""):
+        self.record_coefficients("matrix", expression.coefficients)
+        self.record_coefficients("rhs", [rhs - expression.constant])
+        return self.model.addLConstr(self.linear_expression(expression), sense, rhs, name)
+
+    def pass_names(self):
+        self.model.update()
+        for indices, names in self.pending_variable_names:
+            alive = [(self.vars[i], name) for i, name in zip(indices.tolist(), names) if self.alive[i]]
+            if alive:
+                self.model.setAttr("VarName", *map(list, zip(*alive)))
+        for constrs, names in self.pending_constraint_names:
+            # removed constraints have a negative index
+            alive = [(constr, name) for constr, name in zip(constrs, names) if constr.index >= 0]
+            if alive:
+                self.model.setAttr("ConstrName", *map(list, zip(*alive)))
+        self.pending_variable_names = []
+        self.pending_constraint_names = []
+
+    def linear_expression(self, expression):
+        linear_expression = self.gurobipy.LinExpr(np.asarray(expression.coefficients, dtype=float).tolist(),
+                                                  [self.vars[i] for i in expression.indices])
+        linear_expression.addConstant(expression.constant)
+        return linear_expression
+
+    def remove_constraints(self, constraints):
+        self.model.remove(constraints)
+
+    def remove_variables(self, indices):
+        self.model.remove([self.vars[i] for i in indices])
+        super().remove_variables(indices)
+
+    def set_objective(self, expression, sense):
+        self.coefficient_ranges["objective"] = (np.inf, 0.0)
+        self.record_coefficients("objective", expression.coefficients)
+        self.model.setObjective(self.linear_expression(expression), sense)
+
+    def set_start(self, indices, values):
+        self.model.setAttr("Start", [self.vars[i] for i in indices], np.asarray(values, dtype=float).tolist())
+
+    def set_hints(self, indices, values):
+        self.model.setAttr("VarHintVal", [self.vars[i] for i in indices], np.asarray(values, dtype=float).tolist())
+
+    parameter_names = {
+        "mip_gap": "MIPGap",
+        "time_limit": "TimeLimit",
+        "iteration_limit": "IterationLimit",
+        "numeric_focus": "NumericFocus",
+        "mip_focus": "MIPFocus",
+        "threads": "Threads",
+    }
+
+    def set_parameter(self, name, value):
+        self.model.setParam(self.parameter_names.get(name, name), value)
+
+    def update(self):
+        self.model.update()
+
+    def optimize(self, has_start=False):
+        GRB = self.gurobipy.GRB
+        start_messages = []
+
+        def callback(model, where):
+            if where == GRB.Callback.MESSAGE:
+                message = model.cbGet(GRB.Callback.MSG_STRING)
+                if "MIP start" in message:
+                    start_messages.append(message)
+
+        self.model.optimize(callback)
+        solution_count = self.model.getAttr("SolCount")
+        objective_value = -1
+        self.solution = None
+        if solution_count > 0:
+            objective_value = self.model.getAttr("ObjVal")
+            alive = np.flatnonzero(self.alive)
+            self.solution = np.full(len(self.vars), np.nan)
+            self.solution[alive] = self.model.getAttr("X", [self.vars[i] for i in alive])
+        return status.SolverStatus(solution_count,
+                                   self.model.getAttr("Status"),
+                                   self.model.getAttr("MIPGap"),
+                                   objective_value,
+                                   status.start_accepted(start_messages) if has_start else None)
+
+    def optimize_hierarchically(self, objectives, has_start=False):
+        """
+        Solve all objectives in one run with the multi-objective support of
+        Gurobi (``setObjectiveN``). The solution after each objective is
+        taken from the ``MULTIOBJ`` callback.
+        """
+        GRB = self.gurobipy.GRB
+        self.model.ModelSense = GRB.MINIMIZE
+        self.coefficient_ranges["objective"] = (np.inf, 0.0)
+        for i, objective in enumerate(objectives):
+            self.record_coefficients("objective", objective.expression.coefficients)
+            # maximized objectives get a negative weight
+            self.model.setObjectiveN(self.linear_expression(objective.expression), i,
+                                     priority=len(objectives) - i, weight=objective.sense,
+                                     abstol=objective.absolute_tolerance, reltol=objective.relative_tolerance,
+                                     name=objective.name)
+            if objective.time_limit is not None:
+                self.model.getMultiobjEnv(i).setParam("TimeLimit", objective.time_limit)
+
+        alive = np.flatnonzero(self.alive)
+        alive_vars = [self.vars[i] for i in alive]
+        start_messages = []
+        snapshots = []
+
+        def callback(model, where):
+            if where == GRB.Callback.MESSAGE:
+                message = model.cbGet(GRB.Callback.MSG_STRING)
+                if "MIP start" in message:
+                    start_messages.append(message)
+            elif where == GRB.Callback.MULTIOBJ and model.cbGet(GRB.Callback.MULTIOBJ_SOLCNT) > 0:
+                snapshot = np.full(len(self.vars), np.nan)
+                snapshot[alive] = model.cbGetSolution(alive_vars)
+                snapshots.append(snapshot)
+
+        self.model.optimize(callback)
+        self.model.discardMultiobjEnvs()
+        solution_count = self.model.getAttr("SolCount")
+        objective_value = -1
+        self.solution = None
+        if solution_count > 0:
+            self.solution = np.full(len(self.vars), np.nan)
+            self.solution[alive] = self.model.getAttr("X", alive_vars)
+            objective_value = objectives[-1].expression.value(self.solution)
+        # there is no MIP gap of a multi-objective solve
+        result = status.SolverStatus(solution_count,
+                                     self.model.getAttr("Status"),
+                                     0.0 if solution_count > 0 else status.INFINITY,
+                                     objective_value,
+                                     status.start_accepted(start_messages) if has_start else None)
+        return result, snapshots[:len(objectives)]
+
+    def size(self):
+        self.model.update()
+        return self.model.NumVars, self.model.NumConstrs, self.model.NumNZs
+
+    def write(self, filename):
+        self.pass_names()
+        self.model.write(filename)
+
+    def write_iis(self, filename):
+        self.pass_names()
+        self.model.computeIIS()
+        self.model.write(filename)
+
+
+class HighsBackend(SolverBackend):
+    """
+    Backend for the open-source solver HiGHS (``pip install highspy``).
+
+    Removed constraints are relaxed to free rows and removed variables are
+    fixed to 0 instead of being deleted, so that the indices stay valid.
+    Names are only passed to HiGHS when the model is written, so all names
+    are pending. Hints are not supported.
+
+    HiGHS keeps only the values of the last ``setSolution`` call, so the
+    start values are collected and passed together right before the solve.
+    """
+
+    name = "highs"
+
+    def __init__(self, model_name: str, anonymous_names: bool = False) -> None:
+        super().__init__(model_name, anonymous_names)
+        import highspy
+        self.highspy = highspy
+        self.highs = highspy.Highs()
+        self.infinity = highspy.kHighsInf
+        self.number_of_rows = 0
+        self.number_of_integer_variables = 0
+        # start values of the next solve (NaN: no start value)
+        self.start = np.array([], dtype=float)
+        self.messages = []
+        self.start_logging()
+
+    def start_logging(self):
+        """
+        Collect the log messages of HiGHS in :py:attr:`messages`.
+        """
+        self.highs.setCallback(lambda callback_type, message, *args: self.messages.append(message), None)
+        self.highs.startCallback(self.highspy.cb.HighsCallbackType.kCallbackLogging)
+
+    def restart_clock(self):
+        """
+        Move the model to a new HiGHS instance, whose run clock starts at 0.
+
+        The run clock of HiGHS adds up all solves of an instance, and the LP
+        or sub-MIP that completes a partial start only gets the time limit
+        minus this clock. Without a new instance, the completion stops at
+        once after earlier solves that took the time limit.
+        """
+        highs = self.highspy.Highs()
+        highs.passOptions(self.highs.getOptions())
+        highs.passModel(self.highs.getModel())
+        self.highs = highs
+        self.start_logging()
+
+    def add_variables(self, count, lb, ub, vtype, names=None):
+        start = self.number_of_variables
+        indices = np.arange(start, start + count, dtype=np.int64)
+        if not count:
+            return indices
+        empty = np.array([], dtype=np.int32)
+        self.highs.addCols(count, np.zeros(count), np.full(count, float(lb)), np.full(count, float(ub)),
+                           0, empty, empty, np.array([], dtype=float))
+        if vtype == BINARY:
+            self.highs.changeColsIntegrality(count, indices.astype(np.int32),
+                                             np.full(count, self.highspy.HighsVarType.kInteger))
+            self.number_of_integer_variables += count
+        self.alive.extend([True] * count)
+        if self.add_variable_names(indices, names):
+            self.pending_variable_names.append((indices, list(names)))
+        return indices
+
+    def bounds(self, sense, rhs):
+        if sense == LESS_EQUAL:
+            return np.full(len(rhs), -self.infinity), rhs
+        if sense == GREATER_EQUAL:
+            return rhs, np.full(len(rhs), self.infinity)
+        if sense == EQUAL:
+            return rhs, rhs
+        raise ValueError(f"unknown sense: {sense}")
+
+    def add_constraints(self, matrix, sense, rhs, names=None):
+        n_rows = matrix.shape[0]
+        if not n_rows:
+            return []
+        rhs = np.array(np.broadcast_to(np.asarray(rhs, dtype=float), (n_rows,)))
+        self.record_coefficients("matrix", matrix.data)
+        self.record_coefficients("rhs", rhs)
+        lower, upper = self.bounds(sense, rhs)
+        self.highs.addRows(n_rows, lower, upper, matrix.nnz, matrix.indptr.astype(np.int32),
+                           matrix.indices.astype(np.int32), matrix.data.astype(float))
+        rows = list(range(self.number_of_rows, self.number_of_rows + n_rows))
+        self.number_of_rows += n_rows
+        if self.add_constraint_names(rows, names):
+            self.pending_constraint_names.append((rows, list(names)))
+        return rows
+
+    def remove_constraints(self, constraints):
+        count = len(constraints)
+        self.highs.changeRowsBounds(count, np.asarray(constraints, dtype=np.int32),
+                                    np.full(count, -self.infinity), np.full(count, self.infinity))
+
+    def remove_variables(self, indices):
+        indices = np.asarray(indices, dtype=np.int32)
+        count = len(indices)
+        self.highs.changeColsBounds(count, indices, np.zeros(count), np.zeros(count))
+        super().remove_variables(indices)
+
+    def set_objective(self, expression, sense):
+        self.coefficient_ranges["objective"] = (np.inf, 0.0)
+        self.record_coefficients("objective", expression.coefficients)
+        costs = np.zeros(self.number_of_variables)
+        np.add.at(costs, np.asarray(expression.indices, dtype=np.int64), expression.coefficients)
+        self.highs.changeColsCost(len(costs), np.arange(len(costs), dtype=np.int32), costs)
+        self.highs.changeObjectiveOffset(float(expression.constant))
+        self.highs.changeObjectiveSense(self.highspy.ObjSense.kMaximize if sense == MAXIMIZE
+                                        else self.highspy.ObjSense.kMinimize)
+
+    def set_start(self, indices, values):
+        if len(self.start) < self.number_of_variables:
+            self.start = np.concatenate([self.start, np.full(self.number_of_variables - len(self.start), np.nan)])
+        self.start[np.asarray(indices, dtype=np.int64)] = values
+
+    def pass_start(self):
+        """
+        Pass the collected start values to HiGHS with a single ``setSolution``.
+        """
+        indices = np.flatnonzero(~np.isnan(self.start))
+        if len(indices):
+            if self.highs.getRunTime() > 0:
+                self.restart_clock()
+            self.highs.setSolution(len(indices), indices.astype(np.int32), self.start[indices])
+        self.start = np.array([], dtype=float)
+
+    # parameter -> option name and type
+    parameter_names = {
+        "mip_gap": ("mip_rel_gap", float),
+        "time_limit": ("time_limit", float),
+        "iteration_limit": ("simplex_iteration_limit", int),
+        "threads": ("threads", int),
+    }
+
+    def set_parameter(self, name, value):
+        if name in self.parameter_names:
+            option, option_type = self.parameter_names[name]
+            self.highs.setOptionValue(option, option_type(value))
+
+    model_statuses = {
+        "kOptimal": status.SolverStatus.OPTIMAL,
+        "kInfeasible": status.SolverStatus.INFEASIBLE,
+        "kUnboundedOrInfeasible": status.SolverStatus.INF_OR_UNBD,
+        "kUnbounded": status.SolverStatus.UNBOUNDED,
+        "kIterationLimit": status.SolverStatus.ITERATION_LIMIT,
+        "kTimeLimit": status.SolverStatus.TIME_LIMIT,
+        "kSolutionLimit": status.SolverStatus.SOLUTION_LIMIT,
+        "kInterrupt": status.SolverStatus.INTERRUPTED,
+    }
+
+    def optimize(self, has_start=False):
+        self.pass_start()
+        self.messages = []
+        self.highs.run()
+        info = self.highs.getInfo()
+        model_status = self.model_statuses.get(self.highs.getModelStatus().name, status.SolverStatus.LOADED)
+        solution_count = 1 if info.primal_solution_status == 2 else 0  # 2: feasible
+        objective_value = -1
+        self.solution = None
+        if solution_count > 0:
+            objective_value = info.objective_function_value
+            self.solution = np.array(self.highs.getSolution().col_value, dtype=float)
+            self.solution[~np.asarray(self.alive, dtype=bool)] = np.nan
+        # HiGHS has no MIP gap (infinity) for a model without integer variables
+        gap = info.mip_gap if self.number_of_integer_variables else 0.0
+        return status.SolverStatus(solution_count, model_status, gap, objective_value,
+                                   status.highs_start_accepted(self.messages) if has_start else None)
+
+    def size(self):
+        return self.number_of_variables, self.number_of_rows, self.highs.getNumNz()
+
+    def pass_names(self):
+        for indices, names in self.pending_variable_names:
+            for i, name in zip(indices.tolist(), names):
+                self.highs.passColName(i, name)
+        for rows, names in self.pending_constraint_names:
+            for i, name in zip(rows, names):
+                self.highs.passRowName(i, name)
+        self.pending_variable_names = []
+        self.pending_constraint_names = []
+
+    def write(self, filename):
+        if filename.endswith(".sol"):
+            self.highs.writeSolution(filename, 0)
+        else:
+            self.pass_names()
+            self.highs.writeModel(filename)
+
+    def write_iis(self, filename):
+        self.pass_names()
+        self.highs.writeIisModel(filename)
+
+
+#: backends by name
+BACKENDS = {backend.name: backend for backend in [GurobiBackend, HighsBackend]}
+
+
+def create_backend(name: str, model_name: str, anonymous_names: bool = False) -> SolverBackend:
+    """
+    Create the backend with the given name (see :py:data:`BACKENDS`).
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"unknown solver: {name} (available: {', '.join(BACKENDS)})")
+    return BACKENDS[name](model_name, anonymous_names)
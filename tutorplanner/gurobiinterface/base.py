@@ -3,44 +3,97 @@ __author__ = ("Matthias Rost <mrost AT inet.tu-berlin.de>, "
 
 __all__ = ["BasePlanningCreator"]
 
-import itertools
 import re
 
-from gurobipy import LinExpr, GRB, Model
+import numpy as np
 
-from . import status
+from .backend import create_backend, Objective, BINARY, CONTINUOUS, LESS_EQUAL, GREATER_EQUAL, EQUAL, MINIMIZE, MAXIMIZE
+from .instrumentation import BuildReport, measured
+from .matrix import VariableBlock, ConstraintRows, add_constraints
+from .solution import SolutionSnapshot
 from ..input.data import Data
-from ..input.plan import get_empty_plan
 from ..util.converter import date_to_day_index
 from ..util.settings import settings, get_room_info, DAYS, hours_real, pre_hours_real, \
     TASKS, TUTORIUM, UEBUNG_MAR, UEBUNG_TEL, KONTROLLE
 
+# pairs of tasks in consecutive hours that need a change between MAR and TEL
+MAR_TEL_HOPS = [
+    (UEBUNG_MAR, UEBUNG_TEL),
+    (UEBUNG_MAR, KONTROLLE),
+    (UEBUNG_TEL, UEBUNG_MAR),
+    (KONTROLLE, UEBUNG_MAR),
+    (KONTROLLE, TUTORIUM),
+    (UEBUNG_TEL, TUTORIUM),
+    (UEBUNG_MAR, TUTORIUM),
+    (TUTORIUM, UEBUNG_TEL),
+    (TUTORIUM, UEBUNG_MAR),
+    (TUTORIUM, KONTROLLE),
+]
+
+# locations of the tasks, the pairs of MAR_TEL_HOPS are the tasks at different locations (grading is in TEL 109)
+TASK_LOCATIONS = {
+    TUTORIUM: "tutorial",
+    UEBUNG_MAR: "MAR",
+    UEBUNG_TEL: "TEL",
+    KONTROLLE: "TEL",
+}
+
 
 class BasePlanningCreator:
     """
     Common base of initial and rolling wave planning.
     """
 
-    def __init__(self, target_plan, level=1):
+    def __init__(self, target_plan, level=1, solver=None):
         self.name = f"Level_{level}"
 
         self.max_slack = 0.6
         self.max_overload = 1.2
         self.target_plan = target_plan
         self.status = None
+        # values of the last solution (indexed by variable index), used as MIP start for the next solve
+        self.last_solution = None
+        # snapshot of the last solution for the plans, see solution_snapshot
+        self.snapshot = None
         self.level = level
-        self.model = Model(f"LevelPlanner_{level}")
+        # solver backend, see optimization_parameters.solver in the settings
+        if solver is None:
+            solver = settings.optimization_parameters.solver._or("gurobi")()
+        # names are only passed to the solver when the model is written, see backend
+        anonymous_names = settings.optimization_parameters.anonymous_names._or(False)()
+        self.solver = create_backend(solver, f"LevelPlanner_{level}", anonymous_names)
+        # measurements of the variable and constraint families, see instrumentation
+        self.build_report = BuildReport()
 
         self.specific_working_hours = settings.specific_working_hours._or({})()
         self.forbidden_tasks = settings.forbidden_tasks._or({})()
 
+        # day indices of forbidden tasks: tutor -> task -> set of days
+        self.forbidden_days = {
+            tutor: {task: {date_to_day_index(date) for date in dates} for task, dates in tasks.items()}
+            for tutor, tasks in self.forbidden_tasks.items()
+        }
+        self.tutors = [tutor for tutor in Data().tutor_by_name.keys() if self.is_planned(tutor)]
+
         self.pool_rooms = Data().get_exercise_rooms()
         self.pool_rooms.remove("TEL 103")
         self.tutorial_rooms = list(Data().room_by_type["tutorial"].keys())
         self.rooms = self.pool_rooms + self.tutorial_rooms + ["TEL 109"]
         self.mip_gap = 0.01
-
-        # variables
+        # objectives and bounds are divided by a power of two (see LinearExpression.normalized), the objective of
+        # the status is in the original units again
+        self.normalize = settings.optimization_parameters.normalize._or(True)()
+        self.objective_scale = 1.0
+        # days of the model, rolling wave planning only has the coming days and planning the rooms by day uses a
+        # single day, see restrict_to_days
+        self.days = DAYS
+        # assignments of days that are not part of the model, (tutor, day, hour, task); they are constants in the
+        # constraints and objectives (rolling wave planning)
+        self.fixed_assignments = set()
+        # rooms of the fixed assignments: (tutor, day, hour) -> room
+        self.fixed_rooms = {}
+
+        # variables (blocks indexed by (tutor, day, hour, task) and (tutor, day, hour, room))
         self.schedule_entry = None
         self.schedule_entry_rooms = None
         self.plan_deviation = None
@@ -60,81 +113,283 @@ class BasePlanningCreator:
         self.mar_tel_hopping = None
         self.mth_cons = None
 
+        # level 7
+        self.same_room = None
+
         # other levels might be missing here; no time :|
 
     def create_model_without_rooms(self):
         self.status = None
         self.create_basic_variables()
-        self.model.update()
+        self.solver.update()
         self.create_basic_constraints()
-        self.model.update()
+        self.solver.update()
 
     def extend_model_with_room_support(self):
         self.create_room_assignment_variables()
-        self.model.update()
+        self.solver.update()
         self.create_task_to_room_constraints()
 
+    @measured(phase="solve")
     def solve_integer_program(self):
-        self.model.setParam('MIPGap', self.mip_gap)
-        self.model.optimize()
-        solution_count = self.model.getAttr("solCount")
-        objective_value = -1
-        if solution_count > 0:
-            objective_value = self.model.getAttr("ObjVal")
-        self.status = status.GurobiStatus(solution_count,
-                                          self.model.getAttr("Status"),
-                                          self.model.getAttr("MIPGap"),
-                                          objective_value)
+        self.solver.set_parameter("mip_gap", self.mip_gap)
+        self.log_coefficient_statistics()
+        has_start = self.set_mip_start()
+        self.status = self.solver.optimize(has_start)
+        if self.solver.solution is not None:
+            self.last_solution = self.solver.solution
+            self.status.objective *= self.objective_scale
 
         if not self.status.is_feasible():
             print("The model was not feasible. Generating irreducible linear program..")
-            self.model.computeIIS()
-            self.model.write("foo.ilp")
+            self.solver.write_iis("foo.ilp")
             print("The irreducible linear program was written to foo.ilp, cheers.")
 
         return self.status
 
+    @measured(phase="solve")
+    def solve_hierarchically(self, objectives):
+        """
+        Solve the objectives of all levels in one run, see
+        :py:meth:`~tutorplanner.gurobiinterface.backend.SolverBackend.optimize_hierarchically`.
+        Returns the solution after each objective.
+        """
+        self.solver.set_parameter("mip_gap", self.mip_gap)
+        normalized_objectives = []
+        for objective in objectives:
+            expression, scale = self.normalize_expression(objective.expression)
+            normalized_objectives.append(objective._replace(
+                expression=expression, absolute_tolerance=objective.absolute_tolerance / scale))
+            self.objective_scale = scale
+        has_start = self.set_mip_start()
+        self.status, snapshots = self.solver.optimize_hierarchically(normalized_objectives, has_start)
+        self.log_coefficient_statistics()
+        if self.solver.solution is not None:
+            self.last_solution = self.solver.solution
+            self.status.objective *= self.objective_scale
+
+        if not self.status.is_feasible():
+            print("The model was not feasible. Generating irreducible linear program..")
+            self.solver.write_iis("foo.ilp")
+            print("The irreducible linear program was written to foo.ilp, cheers.")
+
+        return snapshots
+
+    def set_objective(self, objective):
+        """
+        Set the objective of the next solve.
+        """
+        expression, self.objective_scale = self.normalize_expression(objective.expression)
+        self.solver.set_objective(expression, objective.sense)
+        if objective.time_limit is not None:
+            self.set_time_limit(objective.time_limit)
+
+    def normalize_expression(self, expression):
+        """
+        Return the normalized expression and its scale, see
+        :py:meth:`~.backend.LinearExpression.normalized`. Without
+        ``optimization_parameters.normalize``, the expression is not changed.
+        """
+        if not self.normalize:
+            return expression, 1.0
+        return expression.normalized()
+
+    def add_bound(self, expression, sense, rhs, name=""):
+        """
+        Bound an objective of a previous level. The right-hand side is in the
+        units of the original expression.
+        """
+        expression, scale = self.normalize_expression(expression)
+        return self.solver.add_constraint(expression, sense, rhs / scale, name)
+
+    def log_coefficient_statistics(self):
+        """
+        Print the ranges of the coefficients of the model and add them to the
+        build report.
+        """
+        ranges = self.solver.coefficient_statistics()
+        self.build_report.coefficient_ranges[self.name] = ranges
+        print(f"{self.name} coefficient ranges: " + ", ".join(
+            f"{kind} [{values[0]:.0e}, {values[1]:.0e}]" if values else f"{kind} -"
+            for kind, values in ranges.items()))
+
+    def set_mip_start(self):
+        """
+        Use the last solution as MIP start. Variables that were created after
+        the last solve have no start value, Gurobi tries to complete them.
+        Returns whether a MIP start was set.
+        """
+        if self.last_solution is None:
+            return False
+        existing = self.solver.alive_indices(np.arange(len(self.last_solution)))
+        self.solver.set_start(existing, self.last_solution[existing])
+        return True
+
+    def restrict_to_days(self, days):
+        """
+        Build the model only for the given days. Fixed assignments of other
+        days are dropped.
+        """
+        self.days = list(days)
+        self.fixed_assignments = {key for key in self.fixed_assignments if key[1] in self.days}
+        self.fixed_rooms = {key: room for key, room in self.fixed_rooms.items() if key[1] in self.days}
+
+    def fixed_sums(self, project, select=None, coefficient=None):
+        """
+        Sum the (selected) fixed assignments per group, like
+        :py:meth:`~.matrix.VariableBlock.group_by` for the variables. Returns
+        a dict from the group to the sum, groups without fixed assignments are
+        missing. ``coefficient`` is a function of the key (default: 1).
+        """
+        sums = {}
+        for key in self.fixed_assignments:
+            if select is None or select(key):
+                group = project(key)
+                sums[group] = sums.get(group, 0.0) + (1.0 if coefficient is None else coefficient(key))
+        return sums
+
     ###
     ###     CREATING MAIN VARIABLES
     ###
 
+    def get_availability(self, tutor, day, hour):
+        """
+        Return the availability of the tutor, 0 if it is unknown.
+        """
+        return Data().get_availability(tutor, day, hour)
+
+    def availability_coefficients(self, keys, power=1):
+        """
+        Return the availability of the (tutor, day, hour, ...) keys (to the
+        given power) as coefficient vector, see
+        :py:meth:`~tutorplanner.input.data.Data.availability_of`.
+        """
+        if not keys:
+            return np.zeros(0)
+        tutors, days, hours = zip(*(key[:3] for key in keys))
+        return Data().availability_of(tutors, days, hours).astype(float) ** power
+
+    def is_planned(self, tutor):
+        """
+        Return whether the tutor is part of the model. Tutors without working
+        hours or without any availability are left out.
+        """
+        if Data().tutor_by_name[tutor].monthly_work_hours == 0 and tutor not in self.specific_working_hours:
+            return False
+        slots = [(day, hour) for day in DAYS for hour in hours_real(day)]
+        return bool((self.availability_coefficients([(tutor, day, hour) for day, hour in slots]) >= 1).any())
+
+    def is_assignable(self, tutor, day, hour, task):
+        """
+        Return whether the tutor can do the task at the given time, i.e.
+        whether there is a variable for it.
+        """
+        if self.get_availability(tutor, day, hour) < 1:
+            return False
+        return day not in self.forbidden_days.get(tutor, {}).get(task, ())
+
+    @measured
     def create_basic_variables(self):
         print("..constructing Variables")
-        # tutor -> day -> time -> task
-        self.schedule_entry = {}
-
-        for tutor in Data().tutor_by_name.keys():
-            self.schedule_entry[tutor] = {}
-            for day in DAYS:
-                self.schedule_entry[tutor][day] = {}
-                for hour in hours_real(day):
-                    self.schedule_entry[tutor][day][hour] = {}
-                    for task in TASKS:
-                        variable_id = f"schedule_{tutor}_{day}_{hour}_{task}"
-                        self.schedule_entry[tutor][day][hour][task] = self.model.addVar(
-                            lb=0.0, ub=1.0, obj=0.0, vtype=GRB.BINARY, name=variable_id)
-
+        # (tutor, day, hour, task), only for assignable tasks
+        self.schedule_entry = VariableBlock(
+            self.solver, [(tutor, day, hour, task)
+                         for tutor in self.tutors for day in self.days for hour in hours_real(day) for task in TASKS
+                         if self.is_assignable(tutor, day, hour, task)],
+            lb=0.0, ub=1.0, vtype=BINARY, name="schedule_{}_{}_{}_{}")
+        print(f"  {len(self.schedule_entry)} task variables for {len(self.tutors)} tutors")
+
+    def create_room_compatibility_index(self):
+        """
+        Precompute the task of each room and the rooms that can be used at
+        each time slot.
+
+        ``self.task_of_room`` maps a room to the task it is used for,
+        ``self.rooms_by_slot`` maps (day, hour) to the task and the list of
+        usable rooms for that task. Rooms have to be booked except for TEL 103
+        and TEL 109.
+        """
+        self.task_of_room = {}
+        for room in self.rooms:
+            if room in self.tutorial_rooms:
+                self.task_of_room[room] = TUTORIUM
+            elif room == "TEL 109":
+                self.task_of_room[room] = KONTROLLE
+            elif "TEL" in room and "109" not in room:
+                self.task_of_room[room] = UEBUNG_TEL
+            elif "MAR" in room:
+                self.task_of_room[room] = UEBUNG_MAR
+
+        bookings_pools = Data().bookings_pools
+        bookings_tutorials = Data().bookings_tutorials
+        self.rooms_by_slot = {}
+        for day in self.days:
+            for hour in hours_real(day):
+                booked_pools = set(bookings_pools.get(day, {}).get(hour, ()))
+                booked_tutorial_rooms = set(bookings_tutorials.get(day, {}).get(hour, ()))
+                rooms_by_task = self.rooms_by_slot[day, hour] = {task: [] for task in TASKS}
+                for room, task in self.task_of_room.items():
+                    if room == "TEL 103" or room == "TEL 109":
+                        # WE DO NOT CONSIDER TEL 103 / 109
+                        booked = True
+                    elif "TEL" in room or room == "MAR 6.001" or room == "MAR 6.057":
+                        # if it is a pool room, we get the reservations from ..
+                        booked = room in booked_pools
+                    else:
+                        booked = room in booked_tutorial_rooms
+                    if booked:
+                        rooms_by_task[task].append(room)
+
+    def get_usable_rooms(self, tutor, day, hour):
+        """
+        Return the rooms that the tutor can be assigned to at the given time.
+        """
+        return [room for task, rooms in self.rooms_by_slot[day, hour].items()
+                if (tutor, day, hour, task) in self.schedule_entry for room in rooms]
+
+    @measured
+    def create_fixed_task_variables(self, assignments):
+        """
+        Create task variables only for the given (tutor, day, hour, task)
+        assignments and fix them to 1. This freezes the tasks of a solution,
+        so that only the rooms are planned.
+        """
+        self.schedule_entry = VariableBlock(self.solver, list(assignments), lb=1.0, ub=1.0, vtype=BINARY,
+                                            name="schedule_{}_{}_{}_{}")
+
+    @measured
     def create_room_assignment_variables(self):
-        self.schedule_entry_rooms = {}
-        for tutor in Data().tutor_by_name.keys():
-            self.schedule_entry_rooms[tutor] = {}
-            for day in DAYS:
-                self.schedule_entry_rooms[tutor][day] = {}
-                for hour in hours_real(day):
-                    self.schedule_entry_rooms[tutor][day][hour] = {}
-                    for room in self.rooms:
-                        variable_id = f"schedule_{tutor}_{day}_{hour}_{room}"
-                        self.schedule_entry_rooms[tutor][day][hour][room] = self.model.addVar(
-                            lb=0.0, ub=1.0, obj=0.0, vtype=GRB.BINARY, name=variable_id)
+        self.create_room_compatibility_index()
+        # (tutor, day, hour, room), only for booked rooms of tasks that the tutor can do at that time
+        self.schedule_entry_rooms = VariableBlock(
+            self.solver, [(tutor, day, hour, room) for tutor, day, hour in self.time_slots()
+                         for room in self.get_usable_rooms(tutor, day, hour)],
+            lb=0.0, ub=1.0, vtype=BINARY, name="schedule_{}_{}_{}_{}")
+        print(f"  {len(self.schedule_entry_rooms)} room variables")
+
+    def time_slots(self):
+        """
+        Return all (tutor, day, hour) triples that have task variables.
+        """
+        return list(dict.fromkeys(key[:3] for key in self.schedule_entry.keys))
+
+    def consecutive_time_slots(self):
+        """
+        Return all (day, hour, tutor) triples that have task variables at
+        hour and hour + 1.
+        """
+        time_slots = set(self.time_slots())
+        return [(day, hour, tutor) for day in self.days for hour in pre_hours_real(day) for tutor in self.tutors
+                if (tutor, day, hour) in time_slots and (tutor, day, hour + 1) in time_slots]
 
     ###
     ###     CREATING BASIC CONSTRAINTS -- BEGIN
     ###
 
+    @measured
     def create_basic_constraints(self):
         print("..constructing Constraints")
         self.create_constraint_unique_task_at_a_given_time()
-        self.create_constraint_tutor_has_time_for_task()
         self.create_constraint_tasks_are_bounded_by_targeted_plan()
         self.create_constraint_concurrent_tutorials_are_bounded_by_number_of_rooms()
         # self.createConstraint_EachTutorIsSomehowHappy()  # TODO
@@ -142,136 +397,99 @@ class BasePlanningCreator:
         self.create_constraint_tutors_have_pauses()
         print(".. Constraints ready.")
 
+    @measured
     def create_constraint_unique_task_at_a_given_time(self):
         print("  ..constructing UniqueTaskAtAGivenTime")
-        for tutor in Data().tutor_by_name.keys():
-            for day in DAYS:
-                for hour in hours_real(day):
-                    expr = LinExpr([(1.0, self.schedule_entry[tutor][day][hour][task]) for task in TASKS])
-                    constr_name = f"UniqueTaskAtAGivenTime_{tutor}_{day}_{hour}"
-                    self.model.addConstr(expr, GRB.LESS_EQUAL, 1.0, name=constr_name)
-
-    def create_constraint_tutor_has_time_for_task(self):
-        print("  ..constructing TutorHasTimeForTask")
-        # this is equivalent to forbidding any assignments at times at which she does not have time
-        for tutor in Data().tutor_by_name.keys():
-            expr = LinExpr([(1.0, self.schedule_entry[tutor][day][hour][task])
-                            for day in DAYS for hour in hours_real(day)
-                            for task in TASKS if Data().availability[tutor][day][hour] < 1])
-            constr_name = f"TutorHasTimeForTask_{tutor}"
-            if tutor in self.forbidden_tasks:
-                print(f"Tutor {tutor} has forbidden TASKS {self.forbidden_tasks[tutor]}")
-                expr2 = LinExpr([(1.0, self.schedule_entry[tutor][date_to_day_index(date)][hour][task])
-                                 for task in self.forbidden_tasks[tutor]
-                                 for date in self.forbidden_tasks[tutor][task]
-                                 for hour in hours_real(date_to_day_index(date))])
-                print(expr2)
-                expr.add(expr2)
-            self.model.addConstr(expr, GRB.EQUAL, 0.0, name=constr_name)
+        rows = self.schedule_entry.group_by(lambda key: key[:3], groups=self.time_slots())
+        add_constraints(self.solver, rows, LESS_EQUAL, 1.0, name="UniqueTaskAtAGivenTime_{}_{}_{}")
 
+    @measured
     def create_constraint_tasks_are_bounded_by_targeted_plan(self):
         print("  ..constructing TasksAreBoundedByTargetedPlan")
-        for day in DAYS:
-            for hour in hours_real(day):
-                for task in TASKS:
-                    expr = LinExpr(
-                        [(1.0, self.schedule_entry[tutor][day][hour][task]) for tutor in Data().tutor_by_name.keys()])
-                    constr_name = f"TasksAreBoundedByTargetedPlan_{day}_{hour}_{task}"
-                    self.model.addConstr(expr, GRB.LESS_EQUAL, self.target_plan[task][day][hour], name=constr_name)
+        groups = [(day, hour, task) for day in self.days for hour in hours_real(day) for task in TASKS]
+        rows = self.schedule_entry.group_by(lambda key: key[1:], groups=groups)
+        add_constraints(self.solver, rows, LESS_EQUAL,
+                        [self.target_plan[task][day][hour] for day, hour, task in groups],
+                        name="TasksAreBoundedByTargetedPlan_{}_{}_{}")
 
+    @measured
     def create_constraint_concurrent_tutorials_are_bounded_by_number_of_rooms(self):
         print("  ..constructing ConcurrentTutorialsAreBoundedByNumberOfRooms")
-        for day in DAYS:
-            for hour in hours_real(day):
-                expr = LinExpr(
-                    [(1.0, self.schedule_entry[tutor][day][hour][TUTORIUM]) for tutor in Data().tutor_by_name])
-                constr_name = f"ConcurrentTutorialsAreBoundedByNumberOfRooms_{day}_{hour}"
-                self.model.addConstr(expr, GRB.LESS_EQUAL, Data().get_number_of_tutorial_rooms(day, hour),
-                                     name=constr_name)
-
+        groups = [(day, hour) for day in self.days for hour in hours_real(day)]
+        rows = self.schedule_entry.group_by(lambda key: key[1:3], select=lambda key: key[3] == TUTORIUM,
+                                            groups=groups)
+        add_constraints(self.solver, rows, LESS_EQUAL,
+                        [Data().get_number_of_tutorial_rooms(day, hour) for day, hour in groups],
+                        name="ConcurrentTutorialsAreBoundedByNumberOfRooms_{}_{}")
+
+    @measured
     def create_constraint_work_is_shared_fairly(self):
         print("  ..constructing WorkIsSharedFairly")
-        # working hour bounds for both weeks
-        for tutor in Data().tutor_by_name.keys():
-            if tutor in self.specific_working_hours:
-                expr = LinExpr([(1.0, self.schedule_entry[tutor][day][hour][task])
-                                for day in DAYS for hour in hours_real(day) for task in TASKS])
-                specific_working_hours = self.specific_working_hours[tutor]["total"]
-                min = specific_working_hours["min"]
-                max = specific_working_hours["max"]
-                constr_name = f"WorkIsSharedFairly_Over2Weeks_special_{tutor}"
-                self.model.addConstr(expr, GRB.GREATER_EQUAL, min, name=constr_name + "_lower")
-                self.model.addConstr(expr, GRB.LESS_EQUAL, max, name=constr_name + "_upper")
-            else:
-                expr = LinExpr([(1.0, self.schedule_entry[tutor][day][hour][task])
-                                for day in DAYS for hour in hours_real(day) for task in TASKS])
-                constr_name = f"WorkIsSharedFairly_Over2Weeks_{tutor}"
-                two_weeks_working_hours = Data().tutor_by_name[tutor].monthly_work_hours / 2.0
-                self.model.addConstr(expr, GRB.GREATER_EQUAL, two_weeks_working_hours * self.max_slack,
-                                     name=constr_name + "_lower")
-                self.model.addConstr(expr, GRB.LESS_EQUAL, two_weeks_working_hours, name=constr_name + "_upper")
-        # working hour bounds for first week
-        for tutor in Data().tutor_by_name.keys():
-            expr = LinExpr([(1.0, self.schedule_entry[tutor][day][hour][task])
-                            for day in range(1, 6) for hour in hours_real(day) for task in TASKS])
-            if tutor in self.specific_working_hours:
-                specific_working_hours = self.specific_working_hours[tutor]["first_week"]
-                min = specific_working_hours["min"]
-                max = specific_working_hours["max"]
-                constr_name = f"WorkIsSharedFairly_OverFirst_{tutor}"
-                self.model.addConstr(expr, GRB.GREATER_EQUAL, min, name=constr_name + "_lower")
-                self.model.addConstr(expr, GRB.LESS_EQUAL, max, name=constr_name + "_upper")
-            else:
-                constr_name = f"WorkIsSharedFairly_OverFirst_{tutor}"
-                weekly_working_hours = Data().tutor_by_name[tutor].monthly_work_hours / 4.0
-                self.model.addConstr(expr, GRB.GREATER_EQUAL, weekly_working_hours * self.max_slack,
-                                     name=constr_name + "_lower")
-                self.model.addConstr(expr, GRB.LESS_EQUAL, weekly_working_hours * self.max_overload,
-                                     name=constr_name + "_upper")
-        # working hour bounds for second week
-        for tutor in Data().tutor_by_name.keys():
-            expr = LinExpr([(1.0, self.schedule_entry[tutor][day][hour][task])
-                            for day in range(6, 11, 1) for hour in hours_real(day) for task in TASKS])
-            if tutor in self.specific_working_hours:
-                specific_working_hours = self.specific_working_hours[tutor]["second_week"]
-                min = specific_working_hours["min"]
-                max = specific_working_hours["max"]
-                constr_name = f"WorkIsSharedFairly_OverSecond_{tutor}"
-                self.model.addConstr(expr, GRB.GREATER_EQUAL, min, name=constr_name + "_lower")
-                self.model.addConstr(expr, GRB.LESS_EQUAL, max, name=constr_name + "_upper")
-            else:
-                constr_name = f"WorkIsSharedFairly_OverSecond_{tutor}"
-                weekly_working_hours = Data().tutor_by_name[tutor].monthly_work_hours / 4.0
-                self.model.addConstr(expr, GRB.GREATER_EQUAL, weekly_working_hours * self.max_slack,
-                                     name=constr_name + "_lower")
-                self.model.addConstr(expr, GRB.LESS_EQUAL, weekly_working_hours * self.max_overload,
-                                     name=constr_name + "_upper")
-
+        tutor_by_name = Data().tutor_by_name
+        periods = [
+            # name, specific working hours key, days, default factor of lower and upper bound
+            ("Over2Weeks", "total", DAYS, 2.0, 1.0),
+            ("OverFirst", "first_week", range(1, 6), 4.0, self.max_overload),
+            ("OverSecond", "second_week", range(6, 11), 4.0, self.max_overload),
+        ]
+        for period, specific_key, days, fraction, overload in periods:
+            if not set(days) & set(self.days):
+                # the period is in the past
+                continue
+            rows = self.schedule_entry.group_by(lambda key: key[0], select=lambda key: key[1] in days,
+                                                groups=self.tutors)
+            fixed = self.fixed_sums(lambda key: key[0], select=lambda key: key[1] in days)
+            lower = []
+            upper = []
+            names = []
+            for tutor in self.tutors:
+                if tutor in self.specific_working_hours:
+                    specific_working_hours = self.specific_working_hours[tutor][specific_key]
+                    lower.append(specific_working_hours["min"])
+                    upper.append(specific_working_hours["max"])
+                    if specific_key == "total":
+                        names.append(f"WorkIsSharedFairly_{period}_special_{tutor}")
+                    else:
+                        names.append(f"WorkIsSharedFairly_{period}_{tutor}")
+                else:
+                    working_hours = tutor_by_name[tutor].monthly_work_hours / fraction
+                    lower.append(working_hours * self.max_slack)
+                    upper.append(working_hours * overload)
+                    names.append(f"WorkIsSharedFairly_{period}_{tutor}")
+            fixed = np.array([fixed.get(tutor, 0.0) for tutor in self.tutors])
+            add_constraints(self.solver, rows, GREATER_EQUAL, np.array(lower) - fixed,
+                            name=[n + "_lower" for n in names])
+            add_constraints(self.solver, rows, LESS_EQUAL, np.array(upper) - fixed, name=[n + "_upper" for n in names])
+
+    @measured
     def create_constraint_tutors_have_pauses(self):
         print("  ..constructing TutorsHavePauses")
-        for tutor in Data().tutor_by_name.keys():
-            max_work_overall = Data().tutor_by_name[tutor].max_hours_without_break
-            for day in DAYS:
-                hours = hours_real(day)
-                if max_work_overall > len(hours):
-                    continue
-                for hour in hours[:-max_work_overall]:
-                    expr = LinExpr([(1.0, self.schedule_entry[tutor][day][hour + incr][task])
-                                    for incr in range(max_work_overall + 1) for task in TASKS])
-                    constr_name = f"TutorsHavePauses_{tutor}_{day}_{hour}"
-                    self.model.addConstr(expr, GRB.LESS_EQUAL, max_work_overall, name=constr_name)
-
-        for tutor in Data().tutor_by_name.keys():
-            max_work_tuts = Data().tutor_by_name[tutor].max_tutorials_without_break
-            for day in DAYS:
-                hours = hours_real(day)
-                if max_work_tuts > len(hours):
-                    continue
-                for hour in hours[:-max_work_tuts]:
-                    expr = LinExpr([(1.0, self.schedule_entry[tutor][day][hour + incr][TUTORIUM])
-                                    for incr in range(max_work_tuts + 1)])
-                    constr_name = f"TutorsHavePauses_{tutor}_{day}_{hour}"
-                    self.model.addConstr(expr, GRB.LESS_EQUAL, max_work_tuts, name=constr_name)
+        tutor_by_name = Data().tutor_by_name
+        for max_work_of, tasks in [(lambda tutor: tutor.max_hours_without_break, TASKS),
+                                   (lambda tutor: tutor.max_tutorials_without_break, [TUTORIUM])]:
+            rows = ConstraintRows()
+            rhs = []
+            row_keys = []
+            variable_keys = []
+            for tutor in self.tutors:
+                max_work = max_work_of(tutor_by_name[tutor])
+                # the windows are within a day, days of fixed assignments have no window
+                for day in self.days:
+                    hours = hours_real(day)
+                    if max_work > len(hours):
+                        continue
+                    for hour in hours[:-max_work]:
+                        window = [(tutor, day, hour + incr, task) for incr in range(max_work + 1) for task in tasks
+                                  if (tutor, day, hour + incr, task) in self.schedule_entry]
+                        if len({key[2] for key in window}) <= max_work:
+                            # the tutor cannot work in all hours of the window anyway
+                            continue
+                        rows.row((tutor, day, hour))
+                        rhs.append(max_work)
+                        row_keys.extend([(tutor, day, hour)] * len(window))
+                        variable_keys.extend(window)
+            rows.add_terms(row_keys, self.schedule_entry, variable_keys)
+            add_constraints(self.solver, rows, LESS_EQUAL, rhs, name="TutorsHavePauses_{}_{}_{}")
 
     ###
     ###     CREATING BASIC CONSTRAINTS -- END
@@ -281,166 +499,93 @@ class BasePlanningCreator:
     ###     CREATING ROOM CONSTRAINTS -- BEGIN
     ###
 
+    @measured
     def create_task_to_room_constraints(self):
         self.construct_variables_and_constraints_on_external_room_usages()
         self.create_constraint_equalized_split_of_tutors_for_pools()
         self.create_mapping_between_normal_schedule_and_rooms()
         self.no_overlapping_tutorial_room_bookings()
-        self.no_room_bookings_when_not_available()
 
+    @measured
     def construct_variables_and_constraints_on_external_room_usages(self):
-        self.external_room_usage = {}
-        for day in DAYS:
-            self.external_room_usage[day] = {}
-            for room in Data().rooms_external:
-                variable_id = f"externalRoomUsage_{day}_{room}"
-
-                self.external_room_usage[day][room] = self.model.addVar(
-                    lb=0.0, ub=1.0, obj=0.0, vtype=GRB.BINARY, name=variable_id)
-
-        self.model.update()
-
-        for day in DAYS:
-            for hour in hours_real(day):
-                for room in Data().rooms_external:
-
-                    expr = LinExpr([(1.0, self.schedule_entry_rooms[tutor][day][hour][room])
-                                    for tutor in Data().tutor_by_name.keys()])
-                    expr2 = LinExpr([(-1.0, self.external_room_usage[day][room])])
-                    expr.add(expr2)
-
-                    constr_name = f"computeExternalDay_{day}_{hour}_{room}"
-                    self.model.addConstr(expr, GRB.LESS_EQUAL, 0.0, name=constr_name)
-
+        rooms_external = Data().rooms_external
+        self.external_room_usage = VariableBlock(
+            self.solver, [(day, room) for day in self.days for room in rooms_external],
+            lb=0.0, ub=1.0, vtype=BINARY, name="externalRoomUsage_{}_{}")
+
+        groups = [(day, hour, room) for day in self.days for hour in hours_real(day) for room in rooms_external]
+        rows = self.schedule_entry_rooms.group_by(lambda key: key[1:], groups=groups)
+        for day, hour, room in groups:
+            rows.add_term((day, hour, room), self.external_room_usage, (day, room), -1.0)
+        add_constraints(self.solver, rows, LESS_EQUAL, 0.0, name="computeExternalDay_{}_{}_{}")
+
+    @measured
     def create_constraint_equalized_split_of_tutors_for_pools(self):
         pool_locations = ["MAR", "TEL"]
+        bookings_pools = Data().bookings_pools
 
-        self.model.update()
-
-        self.pool_slack = {}
-        for day in DAYS:
-            self.pool_slack[day] = {}
-            for hour in hours_real(day):
-                self.pool_slack[day][hour] = {}
-                for location in pool_locations:
-                    variable_id = f"poolSlack_{day}_{hour}_{location}"
-                    self.pool_slack[day][hour][location] = self.model.addVar(
-                        lb=-1.0, ub=1.0, obj=0.0, vtype=GRB.CONTINUOUS, name=variable_id)
-
-        self.model.update()
-
-        for day, values in self.pool_slack.items():
-            for hour, values2 in values.items():
-                for location, values3 in values2.items():
-                    slack_variable = values3
-                    if "TEL" in location:
-                        tel106_rooms = [x for x in Data().bookings_pools[day][hour] if x.startswith("TEL 106")]
-                        tel206_rooms = [x for x in Data().bookings_pools[day][hour] if x.startswith("TEL 206")]
-                        tel_rooms = tel106_rooms + tel206_rooms
-                        if len(tel_rooms) > 1:
-                            for room_a, room_b in itertools.combinations(tel_rooms, 2):
-                                variable_id = f"poolSlack_{day}_{hour}_{room_a}_{room_b}"
-                                slack_variable = self.model.addVar(
-                                    lb=-1.0, ub=1.0, obj=0.0, vtype=GRB.CONTINUOUS, name=variable_id)
-                                expr = LinExpr()
-                                expr.addTerms(1.0, slack_variable)
-                                expr_room_a = LinExpr([(1.0, self.schedule_entry_rooms[tutor][day][hour][room_a])
-                                                       for tutor in Data().tutor_by_name.keys()])
-                                expr_room_b = LinExpr([(-1.0, self.schedule_entry_rooms[tutor][day][hour][room_b])
-                                                       for tutor in Data().tutor_by_name.keys()])
-                                expr.add(expr_room_a)
-                                expr.add(expr_room_b)
-                                constr_name = f"equalizedUsage_{room_a}_{room_b}_{day}_{hour}"
-                                self.model.update()
-                                self.model.addConstr(expr, GRB.EQUAL, 0.0, name=constr_name)
-                    elif "MAR" in location:
-                        if "MAR 6.001" in Data().bookings_pools[day][hour] \
-                                and "MAR 6.057" in Data().bookings_pools[day][hour]:
-                            expr = LinExpr()
-                            expr.addTerms(1.0, slack_variable)
-                            expr_room_a = LinExpr([(1.0, self.schedule_entry_rooms[tutor][day][hour]["MAR 6.001"])
-                                                   for tutor in Data().tutor_by_name.keys()])
-                            expr_room_b = LinExpr([(-1.0, self.schedule_entry_rooms[tutor][day][hour]["MAR 6.057"])
-                                                   for tutor in Data().tutor_by_name.keys()])
-                            expr.add(expr_room_a)
-                            expr.add(expr_room_b)
-                            constr_name = f"equalizedUsage_{location}_{day}_{hour}"
-                            self.model.addConstr(expr, GRB.EQUAL, 0.0, name=constr_name)
-                    else:
-                        print("unhandled " + location)
+        self.pool_slack = VariableBlock(
+            self.solver, [(day, hour, location) for day in self.days for hour in hours_real(day)
+                         for location in pool_locations],
+            lb=-1.0, ub=1.0, vtype=CONTINUOUS, name="poolSlack_{}_{}_{}")
 
-    def create_mapping_between_normal_schedule_and_rooms(self):
-        # no two rooms at a given time for tutor
-        for tutor in Data().tutor_by_name.keys():
-            for day in DAYS:
-                for hour in hours_real(day):
-                    expr = LinExpr([(1.0, self.schedule_entry_rooms[tutor][day][hour][room]) for room in self.rooms])
-                    constr_name = f"UniqueRoomAtAGivenTime_{tutor}_{day}_{hour}"
-                    self.model.addConstr(expr, GRB.LESS_EQUAL, 1.0, name=constr_name)
-
-        # if in the task planning a tutor is used for some task, then one of the rooms must be selected accordingly
-        for tutor in Data().tutor_by_name.keys():
-            for day in DAYS:
-                for hour in hours_real(day):
-
-                    # for POOLS - TEL
-                    expr = LinExpr([(1.0, self.schedule_entry_rooms[tutor][day][hour][poolRoom])
-                                    for poolRoom in self.pool_rooms if ("TEL" in poolRoom and "109" not in poolRoom)])
-                    constr_name = f"Room-Task-Enforcement-Pools-TEL_{tutor}_{day}_{hour}"
-                    expr.addTerms(-1.0, self.schedule_entry[tutor][day][hour][UEBUNG_TEL])
-                    self.model.addConstr(expr, GRB.EQUAL, 0.0, name=constr_name)
-
-                    # for POOLS - MAR
-                    expr = LinExpr([(1.0, self.schedule_entry_rooms[tutor][day][hour][poolRoom])
-                                    for poolRoom in self.pool_rooms if "MAR" in poolRoom])
-                    constr_name = f"Room-Task-Enforcement-Pools-MAR_{tutor}_{day}_{hour}"
-                    expr.addTerms(-1.0, self.schedule_entry[tutor][day][hour][UEBUNG_MAR])
-                    self.model.addConstr(expr, GRB.EQUAL, 0.0, name=constr_name)
-
-                    # for KONTROLLE
-                    expr = LinExpr([(1.0, self.schedule_entry_rooms[tutor][day][hour]["TEL 109"])])
-                    constr_name = f"Room-Task-Enforcement-Kontrolle_{tutor}_{day}_{hour}"
-                    expr.addTerms(-1.0, self.schedule_entry[tutor][day][hour][KONTROLLE])
-                    self.model.addConstr(expr, GRB.EQUAL, 0.0, name=constr_name)
-
-                    # for POOLS - TEL
-                    expr = LinExpr([(1.0, self.schedule_entry_rooms[tutor][day][hour][tutRoom])
-                                    for tutRoom in self.tutorial_rooms])
-                    constr_name = f"Room-Task-Enforcement-Pools-TEL_{tutor}_{day}_{hour}"
-                    expr.addTerms(-1.0, self.schedule_entry[tutor][day][hour][TUTORIUM])
-                    self.model.addConstr(expr, GRB.EQUAL, 0.0, name=constr_name)
+        def add_usage(rows, row_key, day, hour, room, coefficient):
+            rows.add_terms([row_key] * len(self.tutors), self.schedule_entry_rooms,
+                           [(tutor, day, hour, room) for tutor in self.tutors], coefficient)
 
-    def no_overlapping_tutorial_room_bookings(self):
-        for day in DAYS:
+        # TEL: the usage of all booked rooms is between a reference and the reference + 1, which is the same as a
+        # difference of at most 1 for each pair of rooms, but with one constraint per room
+        tel_rooms = {}
+        for day in self.days:
             for hour in hours_real(day):
-                for room in self.tutorial_rooms:
-                    expr = LinExpr([(1.0, self.schedule_entry_rooms[tutor][day][hour][room])
-                                    for tutor in Data().tutor_by_name.keys()])
-                    constr_name = f"UniqueAssignmentToTutorialRooms_{room}_{day}_{hour}"
-                    self.model.addConstr(expr, GRB.LESS_EQUAL, 1.0, name=constr_name)
-
-    def no_room_bookings_when_not_available(self):
-        for day in DAYS:
+                rooms = [x for x in bookings_pools[day][hour] if x.startswith(("TEL 106", "TEL 206"))]
+                if len(rooms) > 1:
+                    tel_rooms[day, hour] = rooms
+        self.pool_reference = VariableBlock(self.solver, tel_rooms, lb=0.0, ub=len(self.tutors), vtype=CONTINUOUS,
+                                            name="poolReference_{}_{}")
+        self.pool_deviation = VariableBlock(
+            self.solver, [(day, hour, room) for (day, hour), rooms in tel_rooms.items() for room in rooms],
+            lb=0.0, ub=1.0, vtype=CONTINUOUS, name="poolDeviation_{}_{}_{}")
+        rows = ConstraintRows()
+        for day, hour, room in self.pool_deviation.keys:
+            row_key = (room, day, hour)
+            add_usage(rows, row_key, day, hour, room, 1.0)
+            rows.add_term(row_key, self.pool_reference, (day, hour), -1.0)
+            rows.add_term(row_key, self.pool_deviation, (day, hour, room), -1.0)
+        add_constraints(self.solver, rows, EQUAL, 0.0, name="equalizedUsage_{}_{}_{}")
+
+        # MAR: one slack per time slot
+        rows = ConstraintRows()
+        for day in self.days:
             for hour in hours_real(day):
-                for room in self.rooms:
-                    if room == "TEL 103" or room == "TEL 109":
-                        # WE DO NOT CONSIDER TEL 103 / 109
-                        continue
-                    if "TEL" in room or room == "MAR 6.001" or room == "MAR 6.057":
-                        # if it is a pool room, we get the reservations from ..
-                        reservations = Data().bookings_pools
-                        if room not in reservations[day][hour]:
-                            expr = LinExpr([(1.0, self.schedule_entry_rooms[tutor][day][hour][room])
-                                            for tutor in Data().tutor_by_name.keys()])
-                            constr_name = f"NonBookedRoom_{room}_{day}_{hour}"
-                            self.model.addConstr(expr, GRB.EQUAL, 0.0, name=constr_name)
-                    else:
-                        reservations = Data().bookings_tutorials
-                        if room not in reservations[day][hour]:
-                            expr = LinExpr([(1.0, self.schedule_entry_rooms[tutor][day][hour][room])
-                                            for tutor in Data().tutor_by_name.keys()])
-                            constr_name = f"NonBookedRoom_{room}_{day}_{hour}"
-                            self.model.addConstr(expr, GRB.EQUAL, 0.0, name=constr_name)
+                if "MAR 6.001" in bookings_pools[day][hour] and "MAR 6.057" in bookings_pools[day][hour]:
+                    row_key = ("MAR", day, hour)
+                    rows.add_term(row_key, self.pool_slack, (day, hour, "MAR"))
+                    add_usage(rows, row_key, day, hour, "MAR 6.001", 1.0)
+                    add_usage(rows, row_key, day, hour, "MAR 6.057", -1.0)
+        add_constraints(self.solver, rows, EQUAL, 0.0, name="equalizedUsage_{}_{}_{}")
+
+    @measured
+    def create_mapping_between_normal_schedule_and_rooms(self):
+        # if in the task planning a tutor is used for some task, then one of the rooms must be selected accordingly;
+        # as every room serves one task, this also ensures that a tutor is in at most one room at a given time
+        task_of_room = self.task_of_room
+        for task, constr_name in [
+                (UEBUNG_TEL, "Room-Task-Enforcement-Pools-TEL_{}_{}_{}"),
+                (UEBUNG_MAR, "Room-Task-Enforcement-Pools-MAR_{}_{}_{}"),
+                (KONTROLLE, "Room-Task-Enforcement-Kontrolle_{}_{}_{}"),
+                (TUTORIUM, "Room-Task-Enforcement-Tutorials_{}_{}_{}")]:
+            rows = self.schedule_entry.group_by(lambda key: key[:3], select=lambda key: key[3] == task,
+                                                coefficient=-1.0)
+            rows.add_grouped(self.schedule_entry_rooms, lambda key: key[:3],
+                             select=lambda key: task_of_room[key[3]] == task)
+            add_constraints(self.solver, rows, EQUAL, 0.0, name=constr_name)
+
+    @measured
+    def no_overlapping_tutorial_room_bookings(self):
+        groups = [(room, day, hour) for day in self.days for hour in hours_real(day) for room in self.tutorial_rooms]
+        rows = self.schedule_entry_rooms.group_by(lambda key: (key[3], key[1], key[2]), groups=groups)
+        add_constraints(self.solver, rows, LESS_EQUAL, 1.0, name="UniqueAssignmentToTutorialRooms_{}_{}_{}")
 
     ###
     ###     CREATING ROOM CONSTRAINTS -- END
@@ -450,55 +595,60 @@ class BasePlanningCreator:
     ###     LEVEL 1:
     ###
 
-    def plugin_obj_minimize_deviation_from_plan(self):
-        print(" ..creating objective to minimize the deviation from the plan")
-
+    @measured
+    def deviation_from_plan_objective(self):
         if self.plan_deviation is None:
             print("   ..creating the appropriate variables")
-            self.plan_deviation = {}
-            for day in DAYS:
-                self.plan_deviation[day] = {}
-                for hour in hours_real(day):
-                    self.plan_deviation[day][hour] = {}
-                    for task in TASKS:
-                        variable_id = f"planDeviation_{day}_{hour}_{task}"
-                        self.plan_deviation[day][hour][task] = self.model.addVar(
-                            lb=-0.0, ub=20.0, obj=0.0, vtype=GRB.CONTINUOUS, name=variable_id)
-            self.model.update()
+            self.plan_deviation = VariableBlock(
+                self.solver, [(day, hour, task) for day in self.days for hour in hours_real(day) for task in TASKS],
+                lb=0.0, ub=20.0, vtype=CONTINUOUS, name="planDeviation_{}_{}_{}")
         else:
             print("   ..appropriate variables were already created")
 
         if self.compute_deviation_from_plan is None:
             print("   ..creating the appropriate variables")
-            self.compute_deviation_from_plan = []
-            for day in DAYS:
-                for hour in hours_real(day):
-                    for task in TASKS:
-                        expr = LinExpr([(1.0, self.schedule_entry[tutor][day][hour][task])
-                                        for tutor in Data().tutor_by_name.keys()])
-                        expr.addTerms(1.0, self.plan_deviation[day][hour][task])
-                        constr_name = f"computeLocalDeviationFromTargetPlan_{day}_{hour}_{task}"
-                        self.compute_deviation_from_plan.append(self.model.addConstr(
-                            expr, GRB.EQUAL, self.target_plan[task][day][hour], name=constr_name))
+            rows = self.schedule_entry.group_by(lambda key: key[1:], groups=self.plan_deviation.keys)
+            rows.add_grouped(self.plan_deviation, lambda key: key)
+            self.compute_deviation_from_plan = add_constraints(
+                self.solver, rows, EQUAL,
+                [self.target_plan[task][day][hour] for day, hour, task in rows.keys],
+                name="computeLocalDeviationFromTargetPlan_{}_{}_{}")
+
+        return Objective(self.plan_deviation.linear_expression(), MINIMIZE, "deviation_from_plan")
 
+    @measured
+    def plugin_obj_minimize_deviation_from_plan(self):
+        print(" ..creating objective to minimize the deviation from the plan")
+        objective = self.deviation_from_plan_objective()
         print(" ..setting the objective function")
-        expr = LinExpr([(1.0, self.plan_deviation[day][hour][task])
-                        for day in DAYS for hour in hours_real(day) for task in TASKS])
-        self.model.setObjective(expr, GRB.MINIMIZE)
+        self.set_objective(objective)
+
+    def remove_deviation_from_plan(self):
+        """
+        Remove the variables and constraints of the level 1 objective, so
+        that the model can be reused for the next levels.
+        """
+        print(" ..removing the deviation from the plan")
+        if self.compute_deviation_from_plan is not None:
+            self.solver.remove_constraints(self.compute_deviation_from_plan)
+            self.compute_deviation_from_plan = None
+        if self.plan_deviation is not None:
+            self.solver.remove_variables(self.plan_deviation.indices)
+            self.plan_deviation = None
+        self.solver.update()
 
     ###
     ###     LEVEL 2:
     ###
 
+    @measured
     def plugin_constraint_bound_maximal_deviation_from_target_plan(self, max_deviation):
         print("  ..constructing boundMaximalDeviationFromTargetPlan")
-        for day in DAYS:
-            for hour in hours_real(day):
-                for task in TASKS:
-                    expr = LinExpr([(1.0, self.schedule_entry[tutor][day][hour][task])
-                                    for tutor in Data().tutor_by_name.keys()])
-                    constr_name = f"boundMaximalDeviationFromTargetPlan_{day}_{hour}_{task}"
-                    self.model.addConstr(expr, GRB.GREATER_EQUAL, self.target_plan[task][day][hour] - max_deviation, name=constr_name)
+        groups = [(day, hour, task) for day in self.days for hour in hours_real(day) for task in TASKS]
+        rows = self.schedule_entry.group_by(lambda key: key[1:], groups=groups)
+        add_constraints(self.solver, rows, GREATER_EQUAL,
+                        [self.target_plan[task][day][hour] - max_deviation for day, hour, task in groups],
+                        name="boundMaximalDeviationFromTargetPlan_{}_{}_{}")
 
     ###
     ###     LEVEL 3:
@@ -506,48 +656,62 @@ class BasePlanningCreator:
 
     def construct_work_spread_variables(self):
         if self.var_work_spread is None:
-            self.var_work_spread = {}
-            variable_id = "min_rel_work"
-            self.var_work_spread["min"] = self.model.addVar(
-                lb=0.0, ub=1.0, obj=0.0, vtype=GRB.CONTINUOUS, name=variable_id)
-            variable_id = "max_rel_work"
-            self.var_work_spread["max"] = self.model.addVar(
-                lb=0.0, ub=1.0, obj=0.0, vtype=GRB.CONTINUOUS, name=variable_id)
-            self.model.update()
+            self.var_work_spread = VariableBlock(self.solver, ["min", "max"], lb=0.0, ub=1.0,
+                                                 vtype=CONTINUOUS, name="{}_rel_work")
+
+    def expected_work_time(self, tutor):
+        """
+        Return the working hours of the tutor over both weeks.
+        """
+        if tutor in self.specific_working_hours:
+            return self.specific_working_hours[tutor]["total"]["max"]
+        return Data().tutor_by_name[tutor].monthly_work_hours / 2.0
+
+    def maximal_workload_bound(self):
+        """
+        Return an upper bound of the maximal workload (see
+        :py:func:`tutorplanner.planning.base.compute_max_workload`) that is
+        given by the working hours constraints.
+        """
+        tutor_by_name = Data().tutor_by_name
+        return max((self.expected_work_time(tutor) / (tutor_by_name[tutor].monthly_work_hours / 2.0)
+                    for tutor in self.tutors if tutor_by_name[tutor].monthly_work_hours), default=1.0)
 
     def construct_work_spread_constraints(self):
         if self.ws_constraints is None:
             self.ws_constraints = []
-            for tutor in Data().tutor_by_name.keys():
-                if tutor in self.specific_working_hours:
-                    expected_work_time = self.specific_working_hours[tutor]["total"]["max"]
-                else:
-                    expected_work_time = Data().tutor_by_name[tutor].monthly_work_hours / 2.0
-                expr = LinExpr([(1.0 / expected_work_time, self.schedule_entry[tutor][day][hour][task])
-                                for day in DAYS for hour in hours_real(day) for task in TASKS])
-                constr_name = f"bound_work_spread_from_above_{tutor}"
-                self.model.addConstr(expr, GRB.LESS_EQUAL, self.var_work_spread["max"], name=constr_name)
-                constr_name = f"bound_work_spread_from_below_{tutor}"
-                self.model.addConstr(expr, GRB.GREATER_EQUAL, self.var_work_spread["min"], name=constr_name)
-
-    def plugin_obj_minimize_work_spread(self):
+            expected_work_time = {tutor: self.expected_work_time(tutor) for tutor in self.tutors}
+            fixed = self.fixed_sums(lambda key: key[0], coefficient=lambda key: 1.0 / expected_work_time[key[0]])
+            rhs = [-fixed.get(tutor, 0.0) for tutor in self.tutors]
+            for bound, sense in [("max", LESS_EQUAL), ("min", GREATER_EQUAL)]:
+                rows = self.schedule_entry.group_by(lambda key: key[0], groups=self.tutors,
+                                                    coefficient=lambda key: 1.0 / expected_work_time[key[0]])
+                for tutor in self.tutors:
+                    rows.add_term(tutor, self.var_work_spread, bound, -1.0)
+                direction = "above" if bound == "max" else "below"
+                add_constraints(self.solver, rows, sense, rhs, name=f"bound_work_spread_from_{direction}_{{}}")
+
+    def work_spread_expression(self):
+        return self.var_work_spread.linear_expression(
+            self.var_work_spread.coefficients(lambda key: 1.0 if key == "max" else -1.0))
+
+    @measured
+    def work_spread_objective(self):
         self.construct_work_spread_variables()
         self.construct_work_spread_constraints()
-        expr = LinExpr()
-        expr.addTerms(1.0, self.var_work_spread["max"])
-        expr.addTerms(-1.0, self.var_work_spread["min"])
-        self.model.setObjective(expr, GRB.MINIMIZE)
+        return Objective(self.work_spread_expression(), MINIMIZE, "work_spread",
+                         time_limit=settings.optimization_parameters.time_limits.short._or(20)())
 
+    @measured
+    def plugin_obj_minimize_work_spread(self):
+        self.set_objective(self.work_spread_objective())
         self.set_relative_mip_gap(0.01)
-        self.set_time_limit(settings.optimization_parameters.time_limits.short._or(20)())
 
+    @measured
     def bound_maximal_work_spread(self, maximal_work_spread):
         self.construct_work_spread_variables()
         self.construct_work_spread_constraints()
-        expr = LinExpr()
-        expr.addTerms(1.0, self.var_work_spread["max"])
-        expr.addTerms(-1.0, self.var_work_spread["min"])
-        self.model.addConstr(expr, GRB.LESS_EQUAL, maximal_work_spread, "bound_maximal_work_spread")
+        self.add_bound(self.work_spread_expression(), LESS_EQUAL, maximal_work_spread, "bound_maximal_work_spread")
 
     ###
     ###     LEVEL 4
@@ -555,64 +719,64 @@ class BasePlanningCreator:
 
     def construct_minimal_happiness_variables(self):
         if self.var_minimal_happiness is None:
-            self.var_minimal_happiness = self.model.addVar(
-                lb=0.9, ub=3.0, obj=0.0, vtype=GRB.CONTINUOUS, name="minimal_tutor_happiness")
-            self.model.update()
+            self.var_minimal_happiness = VariableBlock(self.solver, ["minimal_tutor_happiness"], lb=0.9, ub=3.0,
+                                                       vtype=CONTINUOUS, name="{}")
 
     def construct_minimal_happiness_constraints(self, max_workload):
         if self.mh_constraints is None:
-            self.mh_constraints = []
-
-            for tutor in Data().tutor_by_name.keys():
-                expr = LinExpr([(Data().availability[tutor][day][hour], self.schedule_entry[tutor][day][hour][task])
-                                for day in DAYS for hour in hours_real(day) for task in TASKS])
-                if tutor in self.specific_working_hours:
-                    two_weeks_working_hours = self.specific_working_hours[tutor]["total"]["max"]
-                else:
-                    two_weeks_working_hours = Data().tutor_by_name[tutor].monthly_work_hours / 2.0
-                expr.addTerms(-1.0 * two_weeks_working_hours * max_workload, self.var_minimal_happiness)
-                self.mh_constraints.append(
-                    self.model.addConstr(expr, GRB.GREATER_EQUAL, 0, name=f"bound_minimal_happiness_{tutor}"))
-
-    def plugin_obj_maximize_min_happiness(self, max_workload):
+            rows = self.schedule_entry.group_by(lambda key: key[0], groups=self.tutors,
+                                                coefficient=self.availability_coefficients(self.schedule_entry.keys))
+            for tutor in self.tutors:
+                rows.add_term(tutor, self.var_minimal_happiness, "minimal_tutor_happiness",
+                              -1.0 * self.expected_work_time(tutor) * max_workload)
+            fixed = self.fixed_sums(lambda key: key[0], coefficient=lambda key: self.get_availability(*key[:3]))
+            self.mh_constraints = add_constraints(self.solver, rows, GREATER_EQUAL,
+                                                  [-fixed.get(tutor, 0.0) for tutor in self.tutors],
+                                                  name="bound_minimal_happiness_{}")
+
+    @measured
+    def min_happiness_objective(self, max_workload):
         self.construct_minimal_happiness_variables()
         self.construct_minimal_happiness_constraints(max_workload)
-        expr = LinExpr(self.var_minimal_happiness)
-        self.model.setObjective(expr, GRB.MAXIMIZE)
+        return Objective(self.var_minimal_happiness.linear_expression(), MAXIMIZE, "min_happiness",
+                         time_limit=settings.optimization_parameters.time_limits.short._or(20)())
 
+    @measured
+    def plugin_obj_maximize_min_happiness(self, max_workload):
+        self.set_objective(self.min_happiness_objective(max_workload))
         self.set_relative_mip_gap(0.01)
-        self.set_time_limit(settings.optimization_parameters.time_limits.short._or(20)())
 
+    @measured
     def bound_min_happiness(self, max_workload, minimal_happiness):
         self.construct_minimal_happiness_variables()
         self.construct_minimal_happiness_constraints(max_workload)
-        expr = LinExpr(self.var_minimal_happiness)
-        self.mh_constraints.append(
-            self.model.addConstr(expr, GRB.GREATER_EQUAL, minimal_happiness, "bound_min_happiness"))
+        self.mh_constraints.append(self.add_bound(
+            self.var_minimal_happiness.linear_expression(), GREATER_EQUAL, minimal_happiness, "bound_min_happiness"))
 
     ###
     ###     LEVEL 5
     ###
 
+    def cube_happiness_expression(self):
+        expression = self.schedule_entry.linear_expression(
+            self.availability_coefficients(self.schedule_entry.keys, power=3))
+        fixed = self.fixed_sums(lambda key: None, coefficient=lambda key: self.get_availability(*key[:3])**3)
+        return expression._replace(constant=fixed.get(None, 0.0))
+
+    @measured
+    def cube_happiness_objective(self):
+        return Objective(self.cube_happiness_expression(), MAXIMIZE, "cube_happiness",
+                         time_limit=settings.optimization_parameters.time_limits.short._or(20)())
+
+    @measured
     def plugin_obj_maximize_cube_happiness(self):
-        obj = LinExpr([
-            (Data().availability[tutor][day][hour]**3, self.schedule_entry[tutor][day][hour][task])
-            for tutor in Data().tutor_by_name.keys()
-            for day in DAYS
-            for hour in hours_real(day)
-            for task in TASKS])
-        self.model.setObjective(obj, GRB.MAXIMIZE)
+        self.set_objective(self.cube_happiness_objective())
         self.set_relative_mip_gap(0.01)
-        self.set_time_limit(settings.optimization_parameters.time_limits.short._or(20)())
 
+    @measured
     def bound_cube_happiness_from_below(self, happiness_value):
-        cube_happiness = LinExpr([
-            (Data().availability[tutor][day][hour]**3, self.schedule_entry[tutor][day][hour][task])
-            for tutor in Data().tutor_by_name.keys()
-            for day in DAYS
-            for hour in hours_real(day)
-            for task in TASKS])
-        self.model.addConstr(cube_happiness, GRB.GREATER_EQUAL, happiness_value)
+        cube_happiness = self.cube_happiness_expression()
+        self.add_bound(cube_happiness, GREATER_EQUAL, happiness_value)
 
     ###
     ###     LEVEL 6
@@ -620,111 +784,107 @@ class BasePlanningCreator:
 
     def create_mar_tel_hopping_variables(self):
         if self.mar_tel_hopping is None:
-            self.mar_tel_hopping = {}
-            for day in DAYS:
-                self.mar_tel_hopping[day] = {}
-                for hour in hours_real(day):
-                    self.mar_tel_hopping[day][hour] = {}
-                    for tutor in Data().tutor_by_name.keys():
-                        variable_id = f"changeMAR_TEL_{day}_{hour}_{tutor}"
-                        self.mar_tel_hopping[day][hour][tutor] = self.model.addVar(
-                            lb=0.0, ub=1.0, obj=0.0, vtype=GRB.CONTINUOUS, name=variable_id)
-
-            self.model.update()
+            self.mar_tel_hopping = VariableBlock(
+                self.solver, self.consecutive_time_slots(),
+                lb=0.0, ub=1.0, vtype=CONTINUOUS, name="changeMAR_TEL_{}_{}_{}")
 
+    @measured
     def create_mar_tel_hopping_constraints(self):
+        """
+        Create the constraints of the hopping variables. The formulation is
+        selected with ``optimization_parameters.mar_tel_hopping_formulation``:
+        ``pairwise`` (default) has one constraint per pair of tasks at
+        different locations, ``compact`` one per location.
+        """
         self.create_mar_tel_hopping_variables()
         if self.mth_cons is None:
-            self.mth_cons = []
-            for day in DAYS:
-                for hour in pre_hours_real(day):
-                    for tutor in Data().tutor_by_name.keys():
-                        expr = LinExpr([(1.0, self.schedule_entry[tutor][day][hour][UEBUNG_MAR])])
-                        expr2 = LinExpr([(1.0, self.schedule_entry[tutor][day][hour + 1][UEBUNG_TEL])])
-                        expr.add(expr2)
-                        expr.addTerms(-1.0, self.mar_tel_hopping[day][hour][tutor])
-                        constr_name = f"computeLocalDeviationFromTargetPlan1_{day}_{hour}_{tutor}"
-                        self.model.addConstr(expr, GRB.LESS_EQUAL, 1.0, name=constr_name)
-
-                        expr = LinExpr([(1.0, self.schedule_entry[tutor][day][hour][UEBUNG_MAR])])
-                        expr2 = LinExpr([(1.0, self.schedule_entry[tutor][day][hour + 1][KONTROLLE])])
-                        expr.add(expr2)
-                        expr.addTerms(-1.0, self.mar_tel_hopping[day][hour][tutor])
-                        constr_name = f"computeLocalDeviationFromTargetPlan2_{day}_{hour}_{tutor}"
-                        self.model.addConstr(expr, GRB.LESS_EQUAL, 1.0, name=constr_name)
-
-                        expr = LinExpr([(1.0, self.schedule_entry[tutor][day][hour][UEBUNG_TEL])])
-                        expr2 = LinExpr([(1.0, self.schedule_entry[tutor][day][hour + 1][UEBUNG_MAR])])
-                        expr.add(expr2)
-                        expr.addTerms(-1.0, self.mar_tel_hopping[day][hour][tutor])
-                        constr_name = f"computeLocalDeviationFromTargetPlan3_{day}_{hour}_{tutor}"
-                        self.model.addConstr(expr, GRB.LESS_EQUAL, 1.0, name=constr_name)
-
-                        expr = LinExpr([(1.0, self.schedule_entry[tutor][day][hour][KONTROLLE])])
-                        expr2 = LinExpr([(1.0, self.schedule_entry[tutor][day][hour + 1][UEBUNG_MAR])])
-                        expr.add(expr2)
-                        expr.addTerms(-1.0, self.mar_tel_hopping[day][hour][tutor])
-                        constr_name = f"computeLocalDeviationFromTargetPlan4_{day}_{hour}_{tutor}"
-                        self.model.addConstr(expr, GRB.LESS_EQUAL, 1.0, name=constr_name)
-
-                        expr = LinExpr([(1.0, self.schedule_entry[tutor][day][hour][KONTROLLE])])
-                        expr2 = LinExpr([(1.0, self.schedule_entry[tutor][day][hour + 1][TUTORIUM])])
-                        expr.add(expr2)
-                        expr.addTerms(-1.0, self.mar_tel_hopping[day][hour][tutor])
-                        constr_name = f"computeLocalDeviationFromTargetPlan5_{day}_{hour}_{tutor}"
-                        self.model.addConstr(expr, GRB.LESS_EQUAL, 1.0, name=constr_name)
-
-                        expr = LinExpr([(1.0, self.schedule_entry[tutor][day][hour][UEBUNG_TEL])])
-                        expr2 = LinExpr([(1.0, self.schedule_entry[tutor][day][hour + 1][TUTORIUM])])
-                        expr.add(expr2)
-                        expr.addTerms(-1.0, self.mar_tel_hopping[day][hour][tutor])
-                        constr_name = f"computeLocalDeviationFromTargetPlan6_{day}_{hour}_{tutor}"
-                        self.model.addConstr(expr, GRB.LESS_EQUAL, 1.0, name=constr_name)
-
-                        expr = LinExpr([(1.0, self.schedule_entry[tutor][day][hour][UEBUNG_MAR])])
-                        expr2 = LinExpr([(1.0, self.schedule_entry[tutor][day][hour + 1][TUTORIUM])])
-                        expr.add(expr2)
-                        expr.addTerms(-1.0, self.mar_tel_hopping[day][hour][tutor])
-                        constr_name = f"computeLocalDeviationFromTargetPlan7_{day}_{hour}_{tutor}"
-                        self.model.addConstr(expr, GRB.LESS_EQUAL, 1.0, name=constr_name)
-
-                        expr = LinExpr([(1.0, self.schedule_entry[tutor][day][hour][TUTORIUM])])
-                        expr2 = LinExpr([(1.0, self.schedule_entry[tutor][day][hour + 1][UEBUNG_TEL])])
-                        expr.add(expr2)
-                        expr.addTerms(-1.0, self.mar_tel_hopping[day][hour][tutor])
-                        constr_name = f"computeLocalDeviationFromTargetPlan8_{day}_{hour}_{tutor}"
-                        self.model.addConstr(expr, GRB.LESS_EQUAL, 1.0, name=constr_name)
-
-                        expr = LinExpr([(1.0, self.schedule_entry[tutor][day][hour][TUTORIUM])])
-                        expr2 = LinExpr([(1.0, self.schedule_entry[tutor][day][hour + 1][UEBUNG_MAR])])
-                        expr.add(expr2)
-                        expr.addTerms(-1.0, self.mar_tel_hopping[day][hour][tutor])
-                        constr_name = f"computeLocalDeviationFromTargetPlan9_{day}_{hour}_{tutor}"
-                        self.model.addConstr(expr, GRB.LESS_EQUAL, 1.0, name=constr_name)
-
-                        expr = LinExpr([(1.0, self.schedule_entry[tutor][day][hour][TUTORIUM])])
-                        expr2 = LinExpr([(1.0, self.schedule_entry[tutor][day][hour + 1][KONTROLLE])])
-                        expr.add(expr2)
-                        expr.addTerms(-1.0, self.mar_tel_hopping[day][hour][tutor])
-                        constr_name = f"computeLocalDeviationFromTargetPlan10_{day}_{hour}_{tutor}"
-                        self.model.addConstr(expr, GRB.LESS_EQUAL, 1.0, name=constr_name)
+            formulation = settings.optimization_parameters.mar_tel_hopping_formulation._or("pairwise")()
+            if formulation == "pairwise":
+                self.mth_cons = self.create_pairwise_mar_tel_hopping_constraints()
+            elif formulation == "compact":
+                self.mth_cons = self.create_compact_mar_tel_hopping_constraints()
+            else:
+                raise ValueError(f"unknown MAR/TEL hopping formulation: {formulation}")
+
+    def create_pairwise_mar_tel_hopping_constraints(self):
+        """
+        A tutor hops if the task at hour and the task at hour + 1 are one of
+        the pairs of ``MAR_TEL_HOPS`` (ten constraints per time slot).
+        """
+        constraints = []
+        keys = self.mar_tel_hopping.keys
+        hopping = np.arange(len(keys))
+        for number, (task, next_task) in enumerate(MAR_TEL_HOPS, start=1):
+            rows = ConstraintRows(keys)
+            own = np.arange(len(keys))
+            rows.add_entries(own, self.schedule_entry,
+                             self.schedule_entry.columns((tutor, day, hour, task) for day, hour, tutor in keys))
+            rows.add_entries(own, self.schedule_entry,
+                             self.schedule_entry.columns((tutor, day, hour + 1, next_task)
+                                                         for day, hour, tutor in keys))
+            rows.add_entries(own, self.mar_tel_hopping, hopping, -1.0)
+            constraints.extend(add_constraints(
+                self.solver, rows, LESS_EQUAL, 1.0,
+                name=f"computeLocalDeviationFromTargetPlan{number}_{{}}_{{}}_{{}}"))
+        return constraints
+
+    def create_compact_mar_tel_hopping_constraints(self):
+        """
+        A tutor hops if they are at a location at hour and work at another
+        location at hour + 1 (three constraints per time slot, one per
+        location of ``TASK_LOCATIONS``). Since a tutor has at most one task
+        at a time, each constraint of the pairwise formulation is implied by
+        the constraint of the location of its first task, so the LP
+        relaxation is at least as tight.
+        """
+        constraints = []
+        keys = self.mar_tel_hopping.keys
+        own = np.arange(len(keys))
+        for location in dict.fromkeys(TASK_LOCATIONS.values()):
+            rows = ConstraintRows(keys)
+            for task, task_location in TASK_LOCATIONS.items():
+                if task_location == location:
+                    # at the location at hour
+                    columns = self.schedule_entry.columns((tutor, day, hour, task) for day, hour, tutor in keys)
+                else:
+                    # at another location at hour + 1
+                    columns = self.schedule_entry.columns((tutor, day, hour + 1, task) for day, hour, tutor in keys)
+                rows.add_entries(own, self.schedule_entry, columns)
+            rows.add_entries(own, self.mar_tel_hopping, own, -1.0)
+            constraints.extend(add_constraints(self.solver, rows, LESS_EQUAL, 1.0,
+                                               name=f"computeMarTelHopping_{location}_{{}}_{{}}_{{}}"))
+        return constraints
+
+    def mar_tel_hopping_expression(self):
+        """
+        Return the number of hoppings, the hoppings of the fixed assignments
+        are the constant.
+        """
+        locations = {key[:3]: TASK_LOCATIONS[key[3]] for key in self.fixed_assignments}
+        fixed = sum(locations.get((tutor, day, hour + 1), location) != location
+                    for (tutor, day, hour), location in locations.items())
+        return self.mar_tel_hopping.linear_expression()._replace(constant=float(fixed))
+
+    @measured
+    def mar_tel_hopping_objective(self):
+        self.create_mar_tel_hopping_variables()
+        self.create_mar_tel_hopping_constraints()
+        return Objective(self.mar_tel_hopping_expression(), MINIMIZE, "mar_tel_hopping",
+                         time_limit=settings.optimization_parameters.time_limits.short._or(20)())
 
+    @measured
     def plugin_obj_minimize_mar_tel_hopping(self):
         print(" ..creating objective to minimize Mar Tel hoppings")
-        self.create_mar_tel_hopping_variables()
-        self.create_mar_tel_hopping_constraints()
+        objective = self.mar_tel_hopping_objective()
         print(" ..final steps")
-        expr = LinExpr([(1.0, self.mar_tel_hopping[day][hour][tutor])
-                        for day in DAYS for hour in hours_real(day) for tutor in Data().tutor_by_name.keys()])
-        self.model.setObjective(expr, GRB.MINIMIZE)
+        self.set_objective(objective)
         self.set_relative_mip_gap(0.01)
-        self.set_time_limit(settings.optimization_parameters.time_limits.short._or(20)())
 
+    @measured
     def create_constraint_minimal_mar_tel_hopping(self, max_number_of_mar_tel_hoppings):
-        expr = LinExpr([(1.0, self.mar_tel_hopping[day][hour][tutor])
-                        for day in DAYS for hour in hours_real(day) for tutor in Data().tutor_by_name.keys()])
+        expr = self.mar_tel_hopping_expression()
         constr_name = "boundMaximalTEL_MAR_Hopping"
-        self.model.addConstr(expr, GRB.LESS_EQUAL, max_number_of_mar_tel_hoppings, name=constr_name)
+        self.add_bound(expr, LESS_EQUAL, max_number_of_mar_tel_hoppings, constr_name)
 
     ###
     ###     LEVEL 7
@@ -755,142 +915,208 @@ class BasePlanningCreator:
                 raise Exception("Could not determine priority")
         return result
 
-    def plugin_objective_select_best_rooms(self):
+    def best_rooms_expression(self):
         priorities_of_rooms = self.get_priorities_of_rooms()
-        expr = LinExpr([(priorities_of_rooms[room], self.schedule_entry_rooms[tutor][day][hour][room])
-                        for tutor in Data().tutor_by_name.keys()
-                        for day in DAYS for hour in hours_real(day) for room in self.rooms])
-        self.model.setObjective(expr, GRB.MAXIMIZE)
+        expression = self.schedule_entry_rooms.linear_expression(
+            self.schedule_entry_rooms.coefficients(lambda key: priorities_of_rooms[key[3]]))
+        # rooms of fixed assignments might not be booked anymore
+        fixed = sum(priorities_of_rooms.get(room, 0) for room in self.fixed_rooms.values())
+        return expression._replace(constant=float(fixed))
+
+    @measured
+    def best_rooms_objective(self):
+        return Objective(self.best_rooms_expression(), MAXIMIZE, "best_rooms",
+                         time_limit=settings.optimization_parameters.time_limits.short._or(20)())
+
+    @measured
+    def plugin_objective_select_best_rooms(self):
+        self.set_objective(self.best_rooms_objective())
         self.set_relative_mip_gap(0.01)
-        self.set_time_limit(settings.optimization_parameters.time_limits.short._or(20)())
 
+    @measured
     def bound_best_rooms_from_below(self, prio_sum):
-        priorities_of_rooms = self.get_priorities_of_rooms()
-        expr = LinExpr([(priorities_of_rooms[room], self.schedule_entry_rooms[tutor][day][hour][room])
-                        for tutor in Data().tutor_by_name.keys()
-                        for day in DAYS for hour in hours_real(day) for room in self.rooms])
-        self.model.addConstr(expr, GRB.GREATER_EQUAL, prio_sum)
+        self.add_bound(self.best_rooms_expression(), GREATER_EQUAL, prio_sum)
 
     ###
     ###     LEVEL 8
     ###
 
+    @measured
+    def create_tutor_room_stability_variables(self):
+        """
+        Create the stability variables and their constraints. The formulation
+        is selected with ``optimization_parameters.room_stability_formulation``:
+        ``per_room`` (default) has a variable and three constraints per room
+        that the tutor can use in both hours, ``compact`` has one variable per
+        pair of consecutive hours of a tutor.
+        """
+        if self.same_room is not None:
+            return
+        formulation = settings.optimization_parameters.room_stability_formulation._or("per_room")()
+        if formulation == "per_room":
+            self.create_per_room_stability_variables()
+        elif formulation == "compact":
+            self.create_compact_room_stability_variables()
+        else:
+            raise ValueError(f"unknown room stability formulation: {formulation}")
+
+    def create_per_room_stability_variables(self):
+        """
+        ``same_room`` is 1 if the tutor is in the room at hour and hour + 1.
+        """
+        rooms = self.schedule_entry_rooms
+        self.same_room = VariableBlock(
+            self.solver, [(day, hour, tutor, room) for day, hour, tutor in self.consecutive_time_slots()
+                         for room in self.rooms
+                         if (tutor, day, hour, room) in rooms and (tutor, day, hour + 1, room) in rooms],
+            lb=0.0, ub=1.0, vtype=CONTINUOUS, name="changeMAR_TEL_{}_{}_{}_{}")
+        print("  ..constructing constraints to set ")
+        keys = self.same_room.keys
+        own = np.arange(len(keys))
+        current = self.schedule_entry_rooms.columns((tutor, day, hour, room) for day, hour, tutor, room in keys)
+        following = self.schedule_entry_rooms.columns((tutor, day, hour + 1, room) for day, hour, tutor, room in keys)
+        both = ConstraintRows(keys)
+        both.add_entries(own, self.schedule_entry_rooms, current)
+        both.add_entries(own, self.schedule_entry_rooms, following)
+        both.add_entries(own, self.same_room, own, -1.0)
+        first = ConstraintRows(keys)
+        first.add_entries(own, self.schedule_entry_rooms, current, -1.0)
+        first.add_entries(own, self.same_room, own)
+        second = ConstraintRows(keys)
+        second.add_entries(own, self.schedule_entry_rooms, following, -1.0)
+        second.add_entries(own, self.same_room, own)
+        add_constraints(self.solver, both, LESS_EQUAL, 1.0, name="computeLocalDeviationFromTargetPlan1_{}_{}_{}")
+        add_constraints(self.solver, first, LESS_EQUAL, 0.0, name="computeLocalDeviationFromTargetPlan2_{}_{}_{}")
+        add_constraints(self.solver, second, LESS_EQUAL, 0.0, name="computeLocalDeviationFromTargetPlan3_{}_{}_{}")
+
+    def create_compact_room_stability_variables(self):
+        """
+        ``same_room`` is 1 if the tutor stays in a room from hour to hour + 1.
+        It is only created for (day, hour, tutor) with a room that the tutor
+        can use in both hours. A tutor is in at most one room at a time, so:
+
+        * the tutor has to be in one of these common rooms at hour and
+        * leaving a room at hour + 1 (in the room at hour, but not at hour + 1)
+          forces ``same_room`` to 0, which is one constraint per common room.
+
+        The lower bound of ``same_room`` (both hours in the same room) is not
+        needed, since stability is maximized or bounded from below.
+        """
+        rooms = self.schedule_entry_rooms
+        common_rooms = {}
+        for day, hour, tutor in self.consecutive_time_slots():
+            common = [room for room in self.rooms
+                      if (tutor, day, hour, room) in rooms and (tutor, day, hour + 1, room) in rooms]
+            if common:
+                common_rooms[day, hour, tutor] = common
+        self.same_room = VariableBlock(self.solver, common_rooms, lb=0.0, ub=1.0, vtype=CONTINUOUS,
+                                       name="sameRoom_{}_{}_{}")
+        print("  ..constructing constraints to set ")
+        in_common_room = ConstraintRows(self.same_room.keys)
+        for (day, hour, tutor), common in common_rooms.items():
+            in_common_room.add_terms([(day, hour, tutor)] * len(common), rooms,
+                                     [(tutor, day, hour, room) for room in common], -1.0)
+        in_common_room.add_entries(np.arange(len(self.same_room)), self.same_room, np.arange(len(self.same_room)))
+        add_constraints(self.solver, in_common_room, LESS_EQUAL, 0.0, name="sameRoomIsCommon_{}_{}_{}")
+
+        keys = [(day, hour, tutor, room) for (day, hour, tutor), common in common_rooms.items() for room in common]
+        own = np.arange(len(keys))
+        leaving = ConstraintRows(keys)
+        leaving.add_entries(own, rooms, rooms.columns((tutor, day, hour, room) for day, hour, tutor, room in keys))
+        leaving.add_entries(own, rooms, rooms.columns((tutor, day, hour + 1, room) for day, hour, tutor, room in keys),
+                            -1.0)
+        leaving.add_entries(own, self.same_room, self.same_room.columns(key[:3] for key in keys))
+        add_constraints(self.solver, leaving, LESS_EQUAL, 1.0, name="leavingRoom_{}_{}_{}_{}")
+
+    def tutor_room_stability_expression(self):
+        """
+        Return the number of consecutive hours in the same room, the fixed
+        rooms are the constant.
+        """
+        fixed = sum(self.fixed_rooms.get((tutor, day, hour + 1)) == room
+                    for (tutor, day, hour), room in self.fixed_rooms.items())
+        return self.same_room.linear_expression()._replace(constant=float(fixed))
+
+    @measured
+    def tutor_room_stability_objective(self):
+        self.create_tutor_room_stability_variables()
+        return Objective(self.tutor_room_stability_expression(), MAXIMIZE, "tutor_room_stability",
+                         time_limit=settings.optimization_parameters.time_limits.long._or(300)())
+
+    @measured
     def plugin_obj_maximize_tutor_room_stability(self):
         print(" ..creating objective to minimize the room hoppings")
-        self.same_room = {}
-        for day in DAYS:
-            self.same_room[day] = {}
-            for hour in pre_hours_real(day):
-                self.same_room[day][hour] = {}
-                for tutor in Data().tutor_by_name.keys():
-                    self.same_room[day][hour][tutor] = {}
-                    for room in self.rooms:
-                        variable_id = f"changeMAR_TEL_{day}_{hour}_{tutor}_{room}"
-                        self.same_room[day][hour][tutor][room] = self.model.addVar(
-                            lb=0.0, ub=1.0, obj=0.0, vtype=GRB.CONTINUOUS, name=variable_id)
-        self.model.update()
-        print("  ..constructing constraints to set ")
-        for day in DAYS:
-            for hour in pre_hours_real(day):
-                for tutor in Data().tutor_by_name.keys():
-                    for room in self.rooms:
-                        expr = LinExpr([(1.0, self.schedule_entry_rooms[tutor][day][hour][room])])
-                        expr2 = LinExpr([(1.0, self.schedule_entry_rooms[tutor][day][hour + 1][room])])
-                        expr.add(expr2)
-                        expr.addTerms(-1.0, self.same_room[day][hour][tutor][room])
-                        constr_name = f"computeLocalDeviationFromTargetPlan1_{day}_{hour}_{tutor}"
-                        self.model.addConstr(expr, GRB.LESS_EQUAL, 1.0, name=constr_name)
-
-                        expr = LinExpr([(-1.0, self.schedule_entry_rooms[tutor][day][hour][room])])
-                        expr.addTerms(1.0, self.same_room[day][hour][tutor][room])
-                        constr_name = f"computeLocalDeviationFromTargetPlan2_{day}_{hour}_{tutor}"
-                        self.model.addConstr(expr, GRB.LESS_EQUAL, 0.0, name=constr_name)
-
-                        expr = LinExpr([(-1.0, self.schedule_entry_rooms[tutor][day][hour + 1][room])])
-                        expr.addTerms(1.0, self.same_room[day][hour][tutor][room])
-                        constr_name = f"computeLocalDeviationFromTargetPlan3_{day}_{hour}_{tutor}"
-                        self.model.addConstr(expr, GRB.LESS_EQUAL, 0.0, name=constr_name)
-
+        objective = self.tutor_room_stability_objective()
         print(" ..final steps")
-        expr = LinExpr([(1.0, self.same_room[day][hour][tutor][room])
-                        for day in DAYS for hour in pre_hours_real(day)
-                        for tutor in Data().tutor_by_name.keys() for room in self.rooms])
-        self.model.setObjective(expr, GRB.MAXIMIZE)
+        self.set_objective(objective)
 
         self.set_relative_mip_gap(0.01)
-        self.set_time_limit(settings.optimization_parameters.time_limits.long._or(300)())
-        self.model.setParam("NumericFocus", 2)
-        self.model.setParam("MIPFocus", 1)
-
-    def check_assignment(self, tutor, day, hour, task):
+        self.solver.set_parameter("numeric_focus", 2)
+        self.solver.set_parameter("mip_focus", 1)
+
+    def solution_snapshot(self):
+        """
+        Return the snapshot of the last solution, see
+        :py:class:`~.solution.SolutionSnapshot`. It is created once per
+        solution and reused by the plans, or None if there is no feasible
+        solution.
+        """
         if self.status is None or not self.status.is_feasible():
             print("ERROR!")
             return None
-        return self.schedule_entry[tutor][day][hour][task].X > 0.5
+        if self.snapshot is None or self.snapshot.solution is not self.last_solution:
+            self.snapshot = self.create_solution_snapshot()
+        return self.snapshot
+
+    @measured(phase="extract")
+    def create_solution_snapshot(self):
+        return SolutionSnapshot(self.last_solution, self.schedule_entry, self.schedule_entry_rooms,
+                                self.fixed_assignments, self.fixed_rooms, Data().tutor_by_name.keys(), self.tutors)
+
+    def check_assignment(self, tutor, day, hour, task):
+        snapshot = self.solution_snapshot()
+        if snapshot is None:
+            return None
+        return snapshot.is_assigned(tutor, day, hour, task)
 
     def find_room(self, tutor, day, hour):
-        if self.status is None or not self.status.is_feasible():
-            print("ERROR!")
+        snapshot = self.solution_snapshot()
+        if snapshot is None:
             return None
-        result = None
-        for room in self.rooms:
-            if self.schedule_entry_rooms[tutor][day][hour][room].X > 0.5:
-                result = room
-                break
+        result = snapshot.room(tutor, day, hour)
         if result is None:
             print("ERROR!")
-            return None
         return result
 
+    @measured(phase="extract")
     def get_personal_plans(self):
-        result = {}
-        for tutor in Data().tutor_by_name.keys():
-            new_plan = get_empty_plan()
-            for day in DAYS:
-                for hour in hours_real(day):
-                    for task in TASKS:
-                        new_plan[task][day][hour] = self.check_assignment(tutor, day, hour, task)
-            result[tutor] = new_plan
-        return result
+        snapshot = self.solution_snapshot()
+        return None if snapshot is None else snapshot.personal_plans
 
+    @measured(phase="extract")
     def get_personal_room_plans(self):
-        result = {}
-        for tutor in Data().tutor_by_name.keys():
-            new_plan = get_empty_plan()
-            for day in DAYS:
-                for hour in hours_real(day):
-                    for task in TASKS:
-                        if self.check_assignment(tutor, day, hour, task):
-                            new_plan[task][day][hour] = self.find_room(tutor, day, hour)
-                        else:
-                            new_plan[task][day][hour] = ""
-            result[tutor] = new_plan
-        return result
+        snapshot = self.solution_snapshot()
+        return None if snapshot is None else snapshot.personal_room_plans
 
+    @measured(phase="extract")
     def get_optimal_plan(self):
-        new_plan = get_empty_plan()
-        for day in DAYS:
-            for hour in hours_real(day):
-                for task in TASKS:
-                    new_plan[task][day][hour] = sum([self.check_assignment(tutor, day, hour, task)
-                                                     for tutor in Data().tutor_by_name.keys()])
-        return new_plan
+        snapshot = self.solution_snapshot()
+        return None if snapshot is None else snapshot.optimal_plan
 
     def get_status(self):
         return self.status
 
     def write_solution(self, filename):
-        self.model.write(filename + ".sol")
+        self.solver.write(filename + ".sol")
 
     def write_lp(self, filename):
-        self.model.update()
-        self.model.write(filename + "foo.lp")
+        self.solver.write(filename + "foo.lp")
 
     def set_relative_mip_gap(self, mip_gap):
-        self.model.setParam('MIPGap', mip_gap)
+        self.solver.set_parameter("mip_gap", mip_gap)
 
     def set_time_limit(self, time_limit):
-        self.model.setParam('TimeLimit', time_limit)
+        self.solver.set_parameter("time_limit", time_limit)
 
     def set_simplex_iterations(self, iterations):
-        self.model.setParam('IterationLimit', iterations)
+        self.solver.set_parameter("iteration_limit", iterations)
@@ -10,5 +10,5 @@ class PlanningCreator(BasePlanningCreator):
     The ``PlanningCreator`` for initial planning has no special methods or attributes.
     """
 
-    def __init__(self, target_plan, level=1):
-        super().__init__(target_plan, level)
+    def __init__(self, target_plan, level=1, solver=None):
+        super().__init__(target_plan, level, solver)
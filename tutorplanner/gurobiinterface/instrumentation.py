@@ -0,0 +1,120 @@
+"""
+Instrumentation of the model building.
+
+Every variable and constraint family of the planning creators is measured:
+the wall time, the number of variables, constraints and nonzeros that are
+added and the change of the Python memory. Solving and the extraction of the
+plans from the solution are measured as well, as phases ``solve`` and
+``extract`` (the phase of the families is ``build``). The memory is only measured if
+:py:mod:`tracemalloc` is tracing (``--trace-memory`` of ``planning``), since
+tracing slows down the model building.
+
+The ranges of the coefficients of the model are recorded per level when it
+is solved (see ``coefficient_statistics`` of the solver backend).
+
+Measurements can be nested, e.g. ``create_basic_constraints`` contains the
+measurements of its constraints. The numbers of a measurement include the
+ones of the nested measurements.
+"""
+
+__author__ = "Alexander Elvers <aelvers AT inet.tu-berlin.de>"
+
+__all__ = ["BuildReport", "measured"]
+
+import contextlib
+import functools
+import json
+import time
+import tracemalloc
+
+
+class BuildReport:
+    """
+    Measurements of the model building of a planning creator.
+    """
+
+    def __init__(self):
+        #: list of measurements (dicts) in the order they were started
+        self.records = []
+        self.depth = 0
+        #: level -> ranges of the matrix, right-hand side and objective coefficients
+        self.coefficient_ranges = {}
+
+    @contextlib.contextmanager
+    def measure(self, name, solver, level="", phase="build"):
+        """
+        Measure the code in the ``with`` block. The size of the model is
+        taken from the solver backend.
+        """
+        record = {"name": name, "level": level, "phase": phase, "depth": self.depth}
+        self.records.append(record)
+        self.depth += 1
+        variables, constraints, nonzeros = solver.size()
+        memory = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["time"] = time.perf_counter() - start
+            self.depth -= 1
+            new_variables, new_constraints, new_nonzeros = solver.size()
+            record["variables"] = new_variables - variables
+            record["constraints"] = new_constraints - constraints
+            record["nonzeros"] = new_nonzeros - nonzeros
+            record["memory"] = None
+            if memory is not None and tracemalloc.is_tracing():
+                record["memory"] = tracemalloc.get_traced_memory()[0] - memory
+
+    def total_time(self, phase="build", level=None):
+        """
+        Return the time of the top-level measurements of a phase, optionally
+        only of one level.
+        """
+        return sum(record["time"] for record in self.records
+                   if record["depth"] == 0 and record["phase"] == phase and level in (None, record["level"]))
+
+    def write(self, filename):
+        """
+        Write the measurements as JSON.
+        """
+        with open(filename, "w") as file:
+            json.dump({"total_time": {phase: self.total_time(phase) for phase in ("build", "solve", "extract")},
+                       "coefficient_ranges": self.coefficient_ranges,
+                       "records": self.records}, file, indent=2)
+
+    def format_table(self):
+        """
+        Return the measurements as table. Nested measurements are indented.
+
+        >>> report = BuildReport()
+        >>> report.records = [{"name": "create_basic_constraints", "level": "Level_1", "phase": "build", "depth": 0,
+        ...                    "time": 0.5, "variables": 0, "constraints": 20, "nonzeros": 100, "memory": None}]
+        >>> print(report.format_table())
+        level    phase    family                   time [s]  variables  constraints  nonzeros  memory [KiB]
+        Level_1  build    create_basic_constraints    0.500          0           20       100             -
+        """
+        names = ["  " * record["depth"] + record["name"] for record in self.records]
+        width = max(map(len, names), default=6)
+        lines = [f"{'level':<8} {'phase':<8} {'family':<{width}} {'time [s]':>8} {'variables':>10} "
+                 f"{'constraints':>12} {'nonzeros':>9} {'memory [KiB]':>13}"]
+        for name, record in zip(names, self.records):
+            memory = "-" if record["memory"] is None else f"{record['memory'] / 1024:.0f}"
+            lines.append(f"{record['level']:<8} {record['phase']:<8} {name:<{width}} {record['time']:>8.3f} "
+                         f"{record['variables']:>10} {record['constraints']:>12} {record['nonzeros']:>9} {memory:>13}")
+        return "\n".join(lines)
+
+
+def measured(method=None, phase="build"):
+    """
+    Decorator for methods of planning creators that add variables or
+    constraints. The measurement is added to the ``build_report`` of the
+    planning creator. Other phases are given as ``@measured(phase="solve")``.
+    """
+    if method is None:
+        return functools.partial(measured, phase=phase)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.build_report.measure(method.__name__, self.solver, self.name, phase):
+            return method(self, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,314 @@
+"""
+The ``matrix`` module contains helpers for building the MIP in batches.
+
+Variables are created as :py:class:`VariableBlock` objects. A block is a
+range of variables of the solver backend whose entries are indexed by
+semantic keys like ``(tutor, day, hour, task)``. Constraint families are
+written as sparse coefficient matrices over these blocks and added to the
+model with a single call instead of one expression per row.
+
+Names of variables and constraints are passed to the backend as
+:py:class:`Names`, which are only formatted from the keys when they are
+needed (see ``anonymous_names`` of :py:class:`~.backend.SolverBackend`).
+"""
+
+__author__ = ("Matthias Rost <mrost AT inet.tu-berlin.de>, "
+              "Alexander Elvers <aelvers AT inet.tu-berlin.de>")
+
+__all__ = [
+    "Names",
+    "VariableBlock",
+    "ConstraintRows",
+    "add_constraints",
+]
+
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import scipy.sparse
+
+from .backend import LinearExpression
+
+
+class Names(Sequence):
+    """
+    Names of variables or constraints given by a format string and the keys.
+    A name is only formatted when it is accessed.
+
+    >>> names = Names("schedule_{}_{}", [("Mustermann", 3), ("Musterfrau", 4)])
+    >>> names[1]
+    'schedule_Musterfrau_4'
+    >>> list(names)
+    ['schedule_Mustermann_3', 'schedule_Musterfrau_4']
+    """
+
+    def __init__(self, name: str, keys: Sequence[Hashable]) -> None:
+        self.name = name
+        self.keys = keys
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __getitem__(self, i: Union[int, slice]):
+        if isinstance(i, slice):
+            return [format_name(self.name, key) for key in self.keys[i]]
+        return format_name(self.name, self.keys[i])
+
+    def __iter__(self):
+        return (format_name(self.name, key) for key in self.keys)
+
+
+class VariableBlock:
+    """
+    Block of variables that is indexed by semantic keys.
+
+    ``keys[i]`` is the key of the i-th entry, ``indices[i]`` is the index of
+    its variable in the solver backend. If ``name`` is given, it is used as a
+    format string for the variable names, e.g. ``"schedule_{}_{}_{}_{}"`` for
+    keys of length 4.
+    """
+
+    keys: List[Hashable]
+    position: Dict[Hashable, int]
+    indices: np.ndarray
+
+    def __init__(self, solver, keys: Iterable[Hashable], lb: float = 0.0, ub: float = 1.0, vtype: str = "B",
+                 name: Optional[str] = None) -> None:
+        self.keys = list(keys)
+        self.position = {key: i for i, key in enumerate(self.keys)}
+        names = Names(name, self.keys) if name is not None else None
+        self.indices = solver.add_variables(len(self.keys), lb, ub, vtype, names)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.position
+
+    def __getitem__(self, key: Hashable) -> int:
+        return int(self.indices[self.position[key]])
+
+    def get(self, key: Hashable, default: Any = None):
+        """
+        Get the variable index of the key or default if it does not exist.
+        """
+        i = self.position.get(key)
+        if i is None:
+            return default
+        return int(self.indices[i])
+
+    def columns(self, keys: Iterable[Hashable]) -> np.ndarray:
+        """
+        Get the positions of the keys, -1 for keys that are not in the block.
+        """
+        get = self.position.get
+        return np.fromiter((get(key, -1) for key in keys), dtype=np.int64)
+
+    def group_by(self, project: Callable[[Any], Hashable], select: Optional[Callable[[Any], bool]] = None,
+                 groups: Optional[Sequence[Hashable]] = None, coefficient: Any = 1.0) -> "ConstraintRows":
+        """
+        Sum the (selected) variables per group.
+
+        ``project`` maps a key to its group key, i.e. to the row of the
+        resulting matrix. If ``groups`` is given, it fixes the row order and
+        also produces empty rows for groups without variables. Variables of
+        other groups are skipped. ``coefficient`` is either a constant or a
+        function of the key.
+        """
+        rows = ConstraintRows(groups)
+        return rows.add_grouped(self, project, select, coefficient, create=groups is None)
+
+    def coefficients(self, coefficient: Callable[[Any], float]) -> np.ndarray:
+        """
+        Get a dense coefficient vector over this block.
+        """
+        return np.fromiter((coefficient(key) for key in self.keys), dtype=float, count=len(self.keys))
+
+    def linear_expression(self, coefficients: Optional[np.ndarray] = None) -> LinearExpression:
+        """
+        Get the weighted sum of the variables (e.g. for objectives). Variables
+        with a zero coefficient are left out.
+        """
+        if coefficients is None:
+            return LinearExpression(self.indices, np.ones(len(self.indices)))
+        nonzero = np.flatnonzero(coefficients)
+        return LinearExpression(self.indices[nonzero], coefficients[nonzero])
+
+    def values(self, solution: np.ndarray) -> np.ndarray:
+        """
+        Get the values of the variables in a solution of the backend.
+        """
+        return solution[self.indices]
+
+
+class ConstraintRows:
+    """
+    Sparse rows of a constraint family over one or more variable blocks.
+
+    Rows are identified by keys. The coefficients are collected as triplets
+    and turned into one ``scipy.sparse`` matrix per block or over all
+    variables of the backend.
+    """
+
+    keys: List[Hashable]
+
+    def __init__(self, keys: Optional[Iterable[Hashable]] = None) -> None:
+        self.keys = list(keys) if keys is not None else []
+        self._row_of = {key: i for i, key in enumerate(self.keys)}
+        # id of block -> (block, rows, columns, values), the first list of each holds single entries
+        self._entries: Dict[int, Tuple[VariableBlock, List[Any], List[Any], List[Any]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def row(self, key: Hashable, create: bool = True) -> Optional[int]:
+        """
+        Get the row index of the key. Unknown keys create new rows if
+        ``create`` is enabled, otherwise ``None`` is returned.
+        """
+        row = self._row_of.get(key)
+        if row is None and create:
+            row = self._row_of[key] = len(self.keys)
+            self.keys.append(key)
+        return row
+
+    def rows(self, keys: Iterable[Hashable], create: bool = True) -> np.ndarray:
+        """
+        Get the row indices of the keys, see :py:meth:`row`. Unknown keys are
+        -1 if ``create`` is disabled.
+        """
+        if create:
+            return np.fromiter((self.row(key) for key in keys), dtype=np.int64)
+        get = self._row_of.get
+        return np.fromiter((get(key, -1) for key in keys), dtype=np.int64)
+
+    def _block_entries(self, block: VariableBlock):
+        entries = self._entries.get(id(block))
+        if entries is None:
+            entries = self._entries[id(block)] = (block, [[]], [[]], [[]])
+        return entries
+
+    def add(self, row: int, block: VariableBlock, column: int, coefficient: float = 1.0) -> None:
+        """
+        Add a coefficient for the variable at position ``column`` of the block.
+        """
+        _, rows, columns, values = self._block_entries(block)
+        rows[0].append(row)
+        columns[0].append(column)
+        values[0].append(coefficient)
+
+    def add_entries(self, rows: np.ndarray, block: VariableBlock, columns: np.ndarray, coefficients: Any = 1.0) -> None:
+        """
+        Add coefficients for arrays of rows and columns at once. Entries with
+        a negative row or column (i.e. unknown keys) or a zero coefficient are
+        skipped.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        columns = np.asarray(columns, dtype=np.int64)
+        coefficients = np.broadcast_to(np.asarray(coefficients, dtype=float), rows.shape)
+        valid = (rows >= 0) & (columns >= 0) & (coefficients != 0)
+        if not valid.all():
+            rows, columns, coefficients = rows[valid], columns[valid], coefficients[valid]
+        _, block_rows, block_columns, block_values = self._block_entries(block)
+        block_rows.append(rows)
+        block_columns.append(columns)
+        block_values.append(coefficients)
+
+    def add_term(self, key: Hashable, block: VariableBlock, variable_key: Hashable,
+                 coefficient: float = 1.0) -> None:
+        """
+        Add a coefficient for a variable given by its key. Missing variables
+        are treated as zero.
+        """
+        column = block.position.get(variable_key)
+        if column is not None:
+            self.add(self.row(key), block, column, coefficient)
+
+    def add_terms(self, keys: Iterable[Hashable], block: VariableBlock, variable_keys: Iterable[Hashable],
+                  coefficient: Any = 1.0) -> None:
+        """
+        Add a coefficient for each pair of row key and variable key. Missing
+        variables are treated as zero.
+        """
+        self.add_entries(self.rows(keys), block, block.columns(variable_keys), coefficient)
+
+    def add_grouped(self, block: VariableBlock, project: Callable[[Any], Hashable],
+                    select: Optional[Callable[[Any], bool]] = None, coefficient: Any = 1.0,
+                    create: bool = False) -> "ConstraintRows":
+        """
+        Add the (selected) variables of a block to the row of their group.
+
+        See :py:meth:`VariableBlock.group_by`. Variables of unknown groups are
+        skipped unless ``create`` is enabled.
+        """
+        if select is None:
+            columns = np.arange(len(block), dtype=np.int64)
+            selected_keys = block.keys
+        else:
+            columns = np.fromiter((i for i, key in enumerate(block.keys) if select(key)), dtype=np.int64)
+            selected_keys = [block.keys[i] for i in columns]
+        if callable(coefficient):
+            coefficient = np.fromiter(map(coefficient, selected_keys), dtype=float, count=len(selected_keys))
+        self.add_entries(self.rows(map(project, selected_keys), create=create), block, columns, coefficient)
+        return self
+
+    def matrix(self, block: VariableBlock) -> scipy.sparse.csr_matrix:
+        """
+        Get the coefficient matrix of a block.
+        """
+        _, rows, columns, values = self._entries.get(id(block), (block, [[]], [[]], [[]]))
+        return scipy.sparse.csr_matrix(
+            (np.concatenate([np.asarray(v, dtype=float) for v in values]),
+             (np.concatenate([np.asarray(r, dtype=np.int64) for r in rows]),
+              np.concatenate([np.asarray(c, dtype=np.int64) for c in columns]))),
+            shape=(len(self.keys), len(block)))
+
+    def solver_matrix(self, number_of_variables: int) -> scipy.sparse.csr_matrix:
+        """
+        Get the coefficient matrix of all rows whose columns are the variable
+        indices of the backend.
+        """
+        rows, columns, values = [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)], [np.zeros(0)]
+        for block, block_rows, block_columns, block_values in self._entries.values():
+            rows.extend(np.asarray(r, dtype=np.int64) for r in block_rows)
+            columns.extend(block.indices[np.asarray(c, dtype=np.int64)] for c in block_columns)
+            values.extend(np.asarray(v, dtype=float) for v in block_values)
+        return scipy.sparse.csr_matrix((np.concatenate(values), (np.concatenate(rows), np.concatenate(columns))),
+                                       shape=(len(self.keys), number_of_variables))
+
+    def number_of_nonzeros(self) -> int:
+        return sum(len(v) for _, _, _, values in self._entries.values() for v in values)
+
+
+def format_name(name: str, key: Hashable) -> str:
+    """
+    Format a variable or constraint name from a key.
+
+    >>> format_name("schedule_{}_{}", ("Mustermann", 3))
+    'schedule_Mustermann_3'
+    >>> format_name("minimal_tutor_happiness", None)
+    'minimal_tutor_happiness'
+    """
+    if isinstance(key, tuple):
+        return name.format(*key)
+    return name.format(key)
+
+
+def add_constraints(solver, rows: ConstraintRows, sense: str, rhs: Any, name: Any = None) -> List[Any]:
+    """
+    Add all rows as one batch of constraints ``rows <sense> rhs``.
+
+    ``sense`` is one of ``"<"``, ``">"`` or ``"="``, ``rhs`` is a constant or
+    one value per row. The name is either a format string that is filled with
+    the row keys or a list with one name per row. Returns the list of created
+    constraint handles.
+    """
+    if not len(rows):
+        return []
+    if sense not in ("<", ">", "="):
+        raise ValueError(f"unknown sense: {sense}")
+    rhs = np.broadcast_to(np.asarray(rhs, dtype=float), (len(rows),))
+    if isinstance(name, str):
+        name = Names(name, rows.keys)
+    # empty rows are kept as in the row-wise model
+    return solver.add_constraints(rows.solver_matrix(solver.number_of_variables), sense, rhs, name)
@@ -2,11 +2,12 @@ __author__ = "Matthias Rost <mrost AT inet.tu-berlin.de>"
 
 __all__ = ["PlanningCreator"]
 
-from gurobipy import LinExpr, GRB, Model
+import numpy as np
 
+from .backend import Objective, GREATER_EQUAL, MAXIMIZE
 from .base import BasePlanningCreator
-from ..input.data import Data
-from ..util.settings import DAYS, hours_real, pre_hours_real, TASKS
+from .instrumentation import measured
+from ..util.settings import settings, hours_real, TASKS
 
 
 def past_days(next_day_to_be_planned):
@@ -29,80 +30,151 @@ class PlanningCreator(BasePlanningCreator):
     plan.
     """
 
-    def __init__(self, target_plan, past_plan, next_day, level=1):
-        super().__init__(target_plan, level)
-
+    def __init__(self, target_plan, past_plan, next_day, level=1, solver=None):
         self.past_plan = past_plan
         self.next_day = next_day
+        # use the past plan also as hints (VarHintVal) for the coming days
+        self.use_hints = settings.optimization_parameters.past_plan_hints._or(False)()
+        # variable blocks that already got start values from the past plan
+        self.started_blocks = set()
+
+        super().__init__(target_plan, level, solver)
 
+        # the model only has the coming days, the past assignments are constants
+        self.days = list(coming_days(next_day))
+        for tutor in self.tutors:
+            for day in past_days(next_day):
+                for hour in hours_real(day):
+                    for task in TASKS:
+                        if self.has_past_assignment(tutor, day, hour, task):
+                            self.fixed_assignments.add((tutor, day, hour, task))
+                            self.fixed_rooms[tutor, day, hour] = past_plan[tutor][task][day][hour]
+
+    def has_past_assignment(self, tutor, day, hour, task):
+        """
+        Return whether the task is assigned to the tutor in the past plan and
+        has to be kept.
+        """
+        return day < self.next_day and tutor in self.past_plan and self.past_plan[tutor][task][day][hour] != ""
+
+    def is_planned(self, tutor):
+        if super().is_planned(tutor):
+            return True
+        return any(self.has_past_assignment(tutor, day, hour, task)
+                   for day in past_days(self.next_day) for hour in hours_real(day) for task in TASKS)
+
+    def past_task_value(self, key):
+        """
+        Return 1 if the task is assigned to the tutor in the past plan, else 0.
+        """
+        tutor, day, hour, task = key
+        return 1.0 if tutor in self.past_plan and self.past_plan[tutor][task][day][hour] != "" else 0.0
+
+    def past_room_value(self, key):
+        """
+        Return 1 if the tutor is in the room in the past plan and still has the
+        task of the room in the last solution, else 0.
+        """
+        tutor, day, hour, room = key
+        if tutor not in self.past_plan or self.past_plan[tutor][self.task_of_room[room]][day][hour] != room:
+            return 0.0
+        if self.last_solution is None:
+            return 1.0
+        variable = self.schedule_entry.get((tutor, day, hour, self.task_of_room[room]))
+        return 1.0 if variable is not None and self.last_solution[variable] > 0.5 else 0.0
+
+    def set_mip_start(self):
+        """
+        Use the last solution as MIP start. Variables that are not part of it
+        get their start values from the past plan, i.e. all schedule entries
+        in the first level and, in the first level with rooms, the room
+        variables of the time slots whose room can be kept (the solver
+        completes the other time slots). If enabled, the past plan is also
+        used as hints for the coming days.
+        """
+        has_start = super().set_mip_start()
+        coming = set(coming_days(self.next_day))
+        for block, value in [(self.schedule_entry, self.past_task_value),
+                             (self.schedule_entry_rooms, self.past_room_value)]:
+            if block is None or id(block) in self.started_blocks:
+                continue
+            self.started_blocks.add(id(block))
+            values = block.coefficients(value)
+            started = np.arange(len(block))
+            if block is self.schedule_entry_rooms:
+                # only time slots with a kept room, the solver completes the other time slots
+                kept = {block.keys[i][:3] for i in np.flatnonzero(values)}
+                started = np.fromiter((i for i, key in enumerate(block.keys) if key[:3] in kept), dtype=np.int64)
+            self.solver.set_start(block.indices[started], values[started])
+            has_start = True
+            if self.use_hints:
+                hinted = [i for i, key in enumerate(block.keys) if key[1] in coming]
+                self.solver.set_hints(block.indices[hinted], values[hinted])
+        return has_start
+
+    def create_fixed_task_variables(self, assignments):
+        super().create_fixed_task_variables(assignments)
+        # the fixed tasks need no start values from the past plan
+        self.started_blocks.add(id(self.schedule_entry))
+
+    @measured
     def bound_tutor_room_stability(self, tutor_room_stability):
-        expr = LinExpr([(1.0, self.same_room[day][hour][tutor][room])
-                        for day in DAYS for hour in pre_hours_real(day)
-                        for tutor in Data().tutor_by_name.keys() for room in self.rooms])
-        self.model.addConstr(expr, GRB.GREATER_EQUAL, tutor_room_stability, "last_bound")
-        self.model.update()
+        expr = self.tutor_room_stability_expression()
+        self.add_bound(expr, GREATER_EQUAL, tutor_room_stability, "last_bound")
+        self.solver.update()
 
     ###
     ###     ROLLING WAVE
     ###
 
+    def task_contingency_expression(self):
+        """
+        Return the number of future assignments that are kept from the past plan.
+        """
+        coming = set(coming_days(self.next_day))
+        past_plan = self.past_plan
+        return self.schedule_entry.linear_expression(self.schedule_entry.coefficients(
+            lambda key: 1.0 if key[1] in coming and key[0] in past_plan
+            and past_plan[key[0]][key[3]][key[1]][key[2]] != "" else 0.0))
+
+    @measured
     def create_constraint_bound_task_contingency(self, task_contingency):
-        expr = LinExpr()
-        for day in coming_days(self.next_day):
-            for hour in hours_real(day):
-                for tutor in Data().tutor_by_name.keys():
-                    for task in TASKS:
-                        if self.past_plan[tutor][task][day][hour] != "":
-                            expr.addTerms(1.0, self.schedule_entry[tutor][day][hour][task])
+        expr = self.task_contingency_expression()
 
         print(" ..final steps")
         constr_name = "boundOnTaskContingency"
-        self.model.addConstr(expr, GRB.GREATER_EQUAL, task_contingency, name=constr_name)
+        self.add_bound(expr, GREATER_EQUAL, task_contingency, constr_name)
+
+    @measured
+    def task_contingency_objective(self):
+        return Objective(self.task_contingency_expression(), MAXIMIZE, "task_contingency")
 
+    @measured
     def plugin_obj_maximize_task_contingency(self):
         print(" ..creating objective to maximize Task Contingency")
-        expr = LinExpr()
-        for day in coming_days(self.next_day):
-            for hour in hours_real(day):
-                for tutor in Data().tutor_by_name.keys():
-                    for task in TASKS:
-                        if self.past_plan[tutor][task][day][hour] != "":
-                            expr.addTerms(1.0, self.schedule_entry[tutor][day][hour][task])
+        objective = self.task_contingency_objective()
 
         print(" ..final steps")
-        self.model.setObjective(expr, GRB.MAXIMIZE)
+        self.set_objective(objective)
+
+    @measured
+    def task_room_contingency_objective(self):
+        coming = set(coming_days(self.next_day))
+        past_plan = self.past_plan
 
+        def kept_rooms(key):
+            tutor, day, hour, room = key
+            if day not in coming or tutor not in past_plan:
+                return 0.0
+            return float(sum(past_plan[tutor][task][day][hour] == room for task in TASKS))
+
+        expr = self.schedule_entry_rooms.linear_expression(self.schedule_entry_rooms.coefficients(kept_rooms))
+        return Objective(expr, MAXIMIZE, "task_room_contingency")
+
+    @measured
     def plugin_obj_maximize_task_room_contingency(self):
         print(" ..creating objective to maximize Task-Room Contingency")
-        expr = LinExpr()
-        for day in coming_days(self.next_day):
-            for hour in hours_real(day):
-                for tutor in Data().tutor_by_name.keys():
-                    for task in TASKS:
-                        past_room = self.past_plan[tutor][task][day][hour]
-                        if past_room != "":
-                            expr.addTerms(1.0, self.schedule_entry_rooms[tutor][day][hour][past_room])
+        objective = self.task_room_contingency_objective()
 
         print(" ..final steps")
-        self.model.setObjective(expr, GRB.MAXIMIZE)
-
-    def fix_past_assignments(self):
-        for tutor in Data().tutor_by_name.keys():
-            for day in past_days(self.next_day):
-                for hour in hours_real(day):
-                    for task in TASKS:
-                        if self.past_plan[tutor][task][day][hour] != "":
-                            expr = LinExpr([(1.0, self.schedule_entry[tutor][day][hour][task])])
-                            constr_name = f"fixPastAssignments_{tutor}_{day}_{hour}_{task}"
-                            self.model.addConstr(expr, GRB.EQUAL, 1.0, name=constr_name)
-
-    def fix_past_assignments_to_rooms(self):
-        for tutor in Data().tutor_by_name.keys():
-            for day in past_days(self.next_day):
-                for hour in hours_real(day):
-                    for task in TASKS:
-                        past_room = self.past_plan[tutor][task][day][hour]
-                        if past_room != "":
-                            expr = LinExpr([(1.0, self.schedule_entry_rooms[tutor][day][hour][past_room])])
-                            constr_name = f"fixPastRoomAssignments_{tutor}_{day}_{hour}_{task}"
-                            self.model.addConstr(expr, GRB.EQUAL, 1.0, name=constr_name)
+        self.set_objective(objective)
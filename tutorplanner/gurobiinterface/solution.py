@@ -0,0 +1,115 @@
+"""
+The ``solution`` module contains the snapshot of a solution of the planning
+creator.
+
+The values of all variables are read from the solver at once after each
+solve (see :py:attr:`~.backend.SolverBackend.solution`). The snapshot keeps a
+read-only copy of them, together with the assigned tasks and rooms, and
+derives the plans from it only once. The planning creators reuse the snapshot
+until the next solution is set.
+"""
+
+__author__ = "Alexander Elvers <aelvers AT inet.tu-berlin.de>"
+
+__all__ = ["SolutionSnapshot"]
+
+import numpy as np
+
+from ..input.plan import get_empty_plan
+from ..util.settings import DAYS, hours_real, TASKS
+
+
+class SolutionSnapshot:
+    """
+    Immutable view of a solution.
+
+    ``schedule_entry`` and ``schedule_entry_rooms`` are the variable blocks
+    of the tasks and rooms (the latter can be None), ``fixed_assignments``
+    and ``fixed_rooms`` are the assignments that are not part of the model
+    (see :py:class:`~.base.BasePlanningCreator`). ``all_tutors`` are the
+    tutors of the personal plans, ``tutors`` the tutors of the model.
+
+    The plans are computed on first access and shared afterwards, they must
+    not be modified.
+    """
+
+    def __init__(self, solution, schedule_entry, schedule_entry_rooms, fixed_assignments, fixed_rooms, all_tutors,
+                 tutors):
+        #: the solution that the snapshot was taken from
+        self.solution = solution
+        #: values of all variables (read-only)
+        self.values = np.array(solution, dtype=float)
+        self.values.setflags(write=False)
+        #: whether a task variable is 1, indexed like the task block (read-only)
+        self.assigned = schedule_entry.values(self.values) > 0.5
+        self.assigned.setflags(write=False)
+        #: assigned (tutor, day, hour, task)
+        self.assignments = frozenset(schedule_entry.keys[i] for i in np.flatnonzero(self.assigned)).union(
+            fixed_assignments)
+        #: (tutor, day, hour) -> room
+        self.rooms = dict(fixed_rooms)
+        if schedule_entry_rooms is not None:
+            for i in np.flatnonzero(schedule_entry_rooms.values(self.values) > 0.5):
+                tutor, day, hour, room = schedule_entry_rooms.keys[i]
+                self.rooms.setdefault((tutor, day, hour), room)
+        self.all_tutors = list(all_tutors)
+        self.tutors = list(tutors)
+        self._personal_plans = None
+        self._personal_room_plans = None
+        self._optimal_plan = None
+
+    def is_assigned(self, tutor, day, hour, task):
+        """
+        Return whether the task is assigned to the tutor.
+        """
+        return (tutor, day, hour, task) in self.assignments
+
+    def room(self, tutor, day, hour):
+        """
+        Return the room of the tutor or None.
+        """
+        return self.rooms.get((tutor, day, hour))
+
+    def empty_personal_plans(self, value):
+        return {tutor: {task: {day: dict.fromkeys(hours_real(day), value) for day in DAYS} for task in TASKS}
+                for tutor in self.all_tutors}
+
+    @property
+    def personal_plans(self):
+        """
+        Personal plans with True for the assigned tasks.
+        """
+        if self._personal_plans is None:
+            self._personal_plans = self.empty_personal_plans(False)
+            for tutor, day, hour, task in self.assignments:
+                if tutor in self._personal_plans:
+                    self._personal_plans[tutor][task][day][hour] = True
+        return self._personal_plans
+
+    @property
+    def personal_room_plans(self):
+        """
+        Personal plans with the room of the assigned tasks, "" otherwise.
+        """
+        if self._personal_room_plans is None:
+            self._personal_room_plans = self.empty_personal_plans("")
+            for tutor, day, hour, task in self.assignments:
+                if tutor in self._personal_room_plans:
+                    room = self.room(tutor, day, hour)
+                    if room is None:
+                        print("ERROR!")
+                    self._personal_room_plans[tutor][task][day][hour] = room
+        return self._personal_room_plans
+
+    @property
+    def optimal_plan(self):
+        """
+        Number of tutors per task and time slot.
+        """
+        if self._optimal_plan is None:
+            self._optimal_plan = get_empty_plan()
+            tutors = set(self.tutors)
+            for tutor, day, hour, task in self.assignments:
+                if tutor in tutors:
+                    self._optimal_plan[task][day][hour] += 1
+        return self._optimal_plan
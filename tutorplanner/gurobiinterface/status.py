@@ -1,13 +1,17 @@
 __author__ = "Matthias Rost <mrost AT inet.tu-berlin.de>"
 
-__all__ = ["GurobiStatus"]
+__all__ = ["SolverStatus", "GurobiStatus", "start_accepted", "highs_start_accepted"]
 
-from gurobipy import GRB
+# infinity of Gurobi, every gap at least this large is infinite
+INFINITY = 1e100
 
 
-class GurobiStatus:
+class SolverStatus:
     """
     Wrapper for evaluating MIP results
+
+    The status codes are the ones of Gurobi, other backends translate their
+    codes.
     """
 
     #: Model is loaded, but no solution information is available.
@@ -49,15 +53,22 @@ class GurobiStatus:
     #: Gurobi Compute Server environment), but the associated optimization run is not yet complete.
     IN_PROGRESS = 14
 
-    def __init__(self, sol_count=0, status=1, gap=GRB.INFINITY, objective=-1):
+    def __init__(self, sol_count=0, status=1, gap=INFINITY, objective=-1, start_accepted=None):
         self.sol_count = sol_count
         self.status = status
         self.gap = gap
         self.objective = objective
+        #: whether the MIP start was accepted, None if there was no MIP start
+        self.start_accepted = start_accepted
 
     def get_objective(self):
         return self.objective
 
+    def get_start_description(self):
+        if self.start_accepted is None:
+            return "no MIP start"
+        return "MIP start accepted" if self.start_accepted else "MIP start rejected"
+
     def is_feasible(self):
         result = self.sol_count > 0
         if self.status == self.INFEASIBLE:
@@ -68,9 +79,50 @@ class GurobiStatus:
             result = False
         if self.status == self.NUMERIC:
             result = False
-        if self.gap == GRB.INFINITY:
+        if self.gap >= INFINITY:
             result = False
         return result
 
     def is_optimal(self):
         return self.status == self.OPTIMAL
+
+
+# old name of SolverStatus
+GurobiStatus = SolverStatus
+
+
+def start_accepted(messages):
+    """
+    Check the log messages of Gurobi about the MIP start whether it led to
+    a solution.
+
+    >>> start_accepted(["Loaded user MIP start with objective 12\\n"])
+    True
+    >>> start_accepted(["User MIP start did not produce a new incumbent solution\\n"])
+    False
+    """
+    for message in messages:
+        if "Loaded" in message or "produced solution" in message:
+            return True
+    return False
+
+
+def highs_start_accepted(messages):
+    """
+    Check the log messages of HiGHS whether the start solution was accepted.
+    HiGHS reports the start only if it was used, after completing a partial
+    start by a sub-MIP or an LP. Without this report the start was rejected,
+    its completion failed (e.g. by the time limit) or HiGHS dropped it.
+
+    >>> highs_start_accepted(["MIP start solution is feasible, objective value is 338\\n"])
+    True
+    >>> highs_start_accepted(["User-supplied values of discrete variables cannot yield feasible solution\\n"])
+    False
+    >>> highs_start_accepted(["Attempting to find feasible solution by solving LP for user-supplied values",
+    ...                       "Model status        : Time limit reached\\n",
+    ...                       "  Solution status   feasible\\n"])
+    False
+    >>> highs_start_accepted(["  Solution status   feasible\\n"])
+    False
+    """
+    return any("MIP start solution is feasible" in message for message in messages)
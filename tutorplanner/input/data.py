@@ -4,12 +4,14 @@ __author__ = ("Matthias Rost <mrost AT inet.tu-berlin.de>, "
 __all__ = ["Data"]
 
 from collections import OrderedDict
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
 
 from . import tutor
 from . import rooms
 from ..util import converter
-from ..util.settings import settings
+from ..util.settings import settings, DAYS, hours_real, TASKS
 
 
 class SingletonMeta(type):
@@ -41,6 +43,12 @@ class Data(metaclass=SingletonMeta):
 
     # tutor name -> day index -> hour -> availability value
     _availability: Optional[Dict[str, Dict[int, Dict[int, int]]]] = None
+    # tutor x day x hour -> availability value, see availability_tensor
+    _availability_tensor: Optional[np.ndarray] = None
+    # tutor name / day index / hour -> position in the availability tensor
+    _tutor_positions: Optional[Dict[str, int]] = None
+    _day_positions: Optional[Dict[int, int]] = None
+    _hour_positions: Optional[Dict[int, int]] = None
     # day index -> hour -> list of room names
     _bookings_tutorials: Optional[Dict[int, Dict[int, List[str]]]] = None
     # day index -> hour -> list of room names
@@ -78,23 +86,140 @@ class Data(metaclass=SingletonMeta):
         return self._room_by_type
 
     @property
-    def availability(self) -> Dict[str, Dict[int, Dict[int, int]]]:
+    def availability_tensor(self) -> np.ndarray:
         """
-        tutor availability
+        tutor availability as int8 array (tutor x day x hour), 0 if unknown
+
+        The positions are given by tutor_positions (in the order of
+        tutor_by_name), day_positions (day indices) and hour_positions.
         """
-        if self._availability is None:
-            self._availability = {}  # tutor, day index, hour
-            # TODO: use datetime.date instead of day index
+        if self._availability_tensor is None:
+            days = set(DAYS)
+            hours = {hour for day in DAYS for hour in hours_real(day)}
+            for t in self.tutor_by_name.values():
+                for day, day_availability in t.availability.items():
+                    days.add(converter.date_to_day_index(day))
+                    hours.update(day_availability)
+            self._tutor_positions = {name: i for i, name in enumerate(self.tutor_by_name)}
+            self._day_positions = {day: i for i, day in enumerate(sorted(days))}
+            self._hour_positions = {hour: i for i, hour in enumerate(sorted(hours))}
+            tensor = np.zeros((len(self._tutor_positions), len(self._day_positions), len(self._hour_positions)),
+                              dtype=np.int8)
             for t in self.tutor_by_name.values():
-                self._availability[t.last_name] = {}
                 for day, day_availability in t.availability.items():
-                    d = converter.date_to_day_index(day)
-                    self._availability[t.last_name][d] = {}
+                    d = self._day_positions[converter.date_to_day_index(day)]
                     for hour, availability in day_availability.items():
-                        self._availability[t.last_name][d][hour] = availability if availability is not None else 0
-                        # self.availability[t.last_name][d][hour+1] = availability if availability is not None else 0
+                        tensor[self._tutor_positions[t.last_name], d, self._hour_positions[hour]] = availability or 0
+            tensor.setflags(write=False)
+            self._availability_tensor = tensor
+        return self._availability_tensor
+
+    @property
+    def tutor_positions(self) -> Dict[str, int]:
+        """
+        tutor name -> position in the availability tensor
+        """
+        self.availability_tensor
+        return self._tutor_positions
+
+    @property
+    def day_positions(self) -> Dict[int, int]:
+        """
+        day index -> position in the availability tensor
+        """
+        self.availability_tensor
+        return self._day_positions
+
+    @property
+    def hour_positions(self) -> Dict[int, int]:
+        """
+        hour -> position in the availability tensor
+        """
+        self.availability_tensor
+        return self._hour_positions
+
+    @property
+    def availability(self) -> Dict[str, Dict[int, Dict[int, int]]]:
+        """
+        tutor availability (view of the availability tensor)
+        """
+        if self._availability is None:
+            values = self.availability_tensor.tolist()
+            self._availability = {
+                name: {day: dict(zip(self.hour_positions, values[t][d])) for day, d in self.day_positions.items()}
+                for name, t in self.tutor_positions.items()
+            }
         return self._availability
 
+    def get_availability(self, tutor_name: str, day: int, hour: int) -> int:
+        """
+        Get the availability of the tutor at the time slot, 0 if it is unknown.
+        """
+        t = self.tutor_positions.get(tutor_name)
+        d = self.day_positions.get(day)
+        h = self.hour_positions.get(hour)
+        if t is None or d is None or h is None:
+            return 0
+        return int(self.availability_tensor[t, d, h])
+
+    def availability_of(self, tutor_names: Iterable[str], days: Iterable[int], hours: Iterable[int]) -> np.ndarray:
+        """
+        Get the availability of the time slots given element-wise by the tutor
+        names, day indices and hours as int8 array, 0 if it is unknown.
+        """
+        positions = [
+            np.fromiter((index.get(key, -1) for key in keys), dtype=np.int64)
+            for index, keys in [(self.tutor_positions, tutor_names), (self.day_positions, days),
+                                (self.hour_positions, hours)]
+        ]
+        known = (positions[0] >= 0) & (positions[1] >= 0) & (positions[2] >= 0)
+        result = np.zeros(len(known), dtype=np.int8)
+        result[known] = self.availability_tensor[tuple(p[known] for p in positions)]
+        return result
+
+    def count_available_tutors(self) -> np.ndarray:
+        """
+        Get the number of available tutors as array (day x hour).
+        """
+        return np.count_nonzero(self.availability_tensor > 0, axis=0)
+
+    def assignment_tensor(self, personal_plans: Dict[str, Any]) -> np.ndarray:
+        """
+        Get the number of assigned tasks of the personal plans as array (tutor
+        x day x hour) with the positions of the availability tensor. Tutors
+        without plan have no tasks.
+        """
+        assignments = np.zeros(self.availability_tensor.shape, dtype=np.int16)
+        for name, personal_plan in personal_plans.items():
+            t = self.tutor_positions.get(name)
+            if t is None:
+                continue
+            for task in TASKS:
+                for day in DAYS:
+                    d = self.day_positions[day]
+                    for hour in hours_real(day):
+                        if personal_plan[task][day][hour]:
+                            assignments[t, d, self.hour_positions[hour]] += 1
+        return assignments
+
+    def happiness(self, assignments: np.ndarray) -> np.ndarray:
+        """
+        Get the happiness of the tutors, i.e. the mean availability of their
+        assigned tasks (666 without tasks), for an assignment tensor.
+        """
+        workload = assignments.sum(axis=(1, 2))
+        satisfied = (assignments * self.availability_tensor).sum(axis=(1, 2))
+        happiness = np.full(len(workload), 666.0)
+        np.divide(satisfied, workload, out=happiness, where=workload > 0)
+        return happiness
+
+    def cube_happiness(self, assignments: np.ndarray) -> float:
+        """
+        Get the sum of the cubed availability of the assigned tasks (the
+        objective of cube happiness) for an assignment tensor.
+        """
+        return float((assignments * self.availability_tensor.astype(np.int64) ** 3).sum())
+
     @property
     def bookings_tutorials(self) -> Dict[int, Dict[int, List[str]]]:
         """
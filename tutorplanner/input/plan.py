@@ -9,6 +9,7 @@ __all__ = [
     "compute_workload_first_week",
     "compute_workload_second_week",
     "compute_happiness",
+    "compute_happiness_of_tutors",
     "count_available_tutors",
     "count_available_rooms",
     "export_plan_to_xlsx",
@@ -25,10 +26,7 @@ import itertools
 import pathlib
 import yaml
 from functools import reduce
-from typing import Dict, Set, List, Iterable, Tuple, Optional, Any, cast, Iterator
-
-from openpyxl import load_workbook, Workbook
-from openpyxl.worksheet import Worksheet
+from typing import Dict, Set, List, Iterable, Tuple, Optional, Any, cast, Iterator, TYPE_CHECKING
 
 from .data import Data
 from .rooms import Room
@@ -36,6 +34,11 @@ from .tutor import Tutor
 from ..util import converter, settings
 from ..util.settings import DAYS, hours_real, TASKS, TUTORIUM, UEBUNG_MAR, UEBUNG_TEL, KONTROLLE
 
+if TYPE_CHECKING:
+    # openpyxl is imported when it is used to keep the command line fast
+    from openpyxl import Workbook
+    from openpyxl.worksheet import Worksheet
+
 
 # type aliases
 # task type -> day index -> hour -> count
@@ -231,6 +234,16 @@ def compute_happiness(plan: PlanDict, availability: Dict[int, Dict[int, int]]) -
     return 666
 
 
+def compute_happiness_of_tutors(tutor_plans: PersonalPlanDict) -> Dict[str, float]:
+    """
+    Compute the happiness of all tutors of the personal plans at once (see
+    :py:func:`compute_happiness`).
+    """
+    data = Data()
+    happiness = data.happiness(data.assignment_tensor(tutor_plans)).tolist()
+    return {tutor: happiness[data.tutor_positions[tutor]] for tutor in tutor_plans if tutor in data.tutor_positions}
+
+
 def count_available_tutors(tutors: Iterable[Tutor], day: datetime.date, time: int) -> int:
     count = 0
     for tutor in tutors:
@@ -260,7 +273,7 @@ type_map_inverse = {v: k for k, v in type_map.items()}
 slot_types = ["tutorial", "exercise", "exerciseMAR", "grading"]
 
 
-def write_plan_to_worksheet(ws: Worksheet, plan: PlanDict) -> None:
+def write_plan_to_worksheet(ws: "Worksheet", plan: PlanDict) -> None:
     """
     Write plan to worksheet.
     """
@@ -269,7 +282,7 @@ def write_plan_to_worksheet(ws: Worksheet, plan: PlanDict) -> None:
     days: List[datetime.date] = settings.settings.days()
     forbidden_timeslots = settings.settings.forbidden_timeslots()
 
-    tutors = Data().tutor_by_name.values()
+    available_tutors = Data().count_available_tutors()
     rooms_ = Data().room_by_name.values()
 
     empty_lines = 2
@@ -288,7 +301,8 @@ def write_plan_to_worksheet(ws: Worksheet, plan: PlanDict) -> None:
         columns = [cast(List[Optional[Any]], slot_types) + [None, "avail. tutors", "tutorial rooms", "tutorial seats", "exercise seats", "exerciseMAR seats"]]
         for time in times:
             column = []
-            avail_tutors = count_available_tutors(tutors, day, time)
+            hour = Data().hour_positions.get(time)
+            avail_tutors = 0 if hour is None else int(available_tutors[Data().day_positions[day_index], hour])
             avail_tutorials = count_available_rooms(rooms_, "tutorial", day, time)
             avail_exercises = count_available_rooms(rooms_, "exercise", day, time)
             avail_exercises_mar = count_available_rooms(rooms_, "exerciseMAR", day, time)
@@ -314,10 +328,12 @@ def write_plan_to_worksheet(ws: Worksheet, plan: PlanDict) -> None:
 
 
 @contextlib.contextmanager
-def export_plan_to_xlsx(path: Optional[str] = None) -> Iterator[Workbook]:
+def export_plan_to_xlsx(path: Optional[str] = None) -> Iterator["Workbook"]:
     """
     Write plan to xlsx.
     """
+    from openpyxl import load_workbook, Workbook
+
     if path is None:
         path = settings.settings.paths.planner()
 
@@ -336,6 +352,8 @@ def import_plan_from_xlsx() -> PlanDict:
     """
     Read plan from xlsx.
     """
+    from openpyxl import load_workbook
+
     path = settings.settings.paths.planner()
     times = reduce(list.__add__, [[t, t + 1] for t in settings.settings.times()])
     days = settings.settings.days()
@@ -400,6 +418,8 @@ def check_plan(plan: PersonalPlanDict, rooms: Iterable[Room]) -> List[Tuple[date
     """
     rooms_dict = {r.name: r for r in rooms}
     errors = []
+    booked: Dict[Tuple[str, int, int], bool] = {}
+    # every cell is checked, a hand-edited plan may have several tasks in one time slot
     for tutor, tutor_plan in plan.items():
         for task, task_plan in tutor_plan.items():
             for day_index, day_plan in task_plan.items():
@@ -410,9 +430,10 @@ def check_plan(plan: PersonalPlanDict, rooms: Iterable[Room]) -> List[Tuple[date
                     if room_name not in rooms_dict:
                         errors.append((day, time, room_name, tutor, "room does not exist"))
                         continue
-                    room = rooms_dict[room_name]
-                    booked = room.is_booked(day, time - (time % 2))
-                    if not booked:
+                    key = room_name, day_index, time
+                    if key not in booked:
+                        booked[key] = rooms_dict[room_name].is_booked(day, time - (time % 2))
+                    if not booked[key]:
                         errors.append((day, time, room_name, tutor, "room is not booked"))
     return errors
 
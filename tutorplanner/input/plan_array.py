@@ -0,0 +1,307 @@
+"""
+The ``plan_array`` module contains compact array representations of plans.
+
+The plans of the planner are nested dicts (see
+:py:data:`~tutorplanner.input.plan.PlanDict` and
+:py:data:`~tutorplanner.input.plan.PersonalPlanDict`). For analytics, they
+can be converted to arrays over the days and hours of the planner (see
+:py:data:`DAY_POSITIONS` and :py:data:`HOUR_POSITIONS`):
+
+* :py:class:`PlanArray`: number of tutors per task, day and hour
+* :py:class:`PersonalPlanArray`: task and room of each tutor, day and hour
+
+Workload, happiness and differences are computed on the arrays. Both classes
+can be converted from and to the dicts.
+"""
+
+__author__ = "Alexander Elvers <aelvers AT inet.tu-berlin.de>"
+
+__all__ = [
+    "DAY_POSITIONS",
+    "HOUR_POSITIONS",
+    "TASK_IDS",
+    "NO_TASK",
+    "NO_ROOM",
+    "PlanArray",
+    "PersonalPlanArray",
+]
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .data import Data
+from ..util.settings import DAYS, hours_real, TASKS
+
+#: day index -> position on the day axis
+DAY_POSITIONS = {day: i for i, day in enumerate(DAYS)}
+#: hour -> position on the hour axis
+HOUR_POSITIONS = {hour: i for i, hour in enumerate(sorted({hour for day in DAYS for hour in hours_real(day)}))}
+#: task -> task id (position in TASKS)
+TASK_IDS = {task: i for i, task in enumerate(TASKS)}
+#: task id of time slots without task
+NO_TASK = -1
+#: room id of time slots without room
+NO_ROOM = -1
+
+DAY_LIST = list(DAY_POSITIONS)
+HOUR_LIST = list(HOUR_POSITIONS)
+# (day index, hour, day position, hour position) of the planned time slots
+SLOTS = [(day, hour, DAY_POSITIONS[day], HOUR_POSITIONS[hour]) for day in DAYS for hour in hours_real(day)]
+
+
+def grid_shape() -> Tuple[int, int]:
+    return len(DAY_POSITIONS), len(HOUR_POSITIONS)
+
+
+def day_mask(days: Iterable[int]) -> np.ndarray:
+    """
+    Return a mask of the day axis for the day indices.
+    """
+    mask = np.zeros(len(DAY_POSITIONS), dtype=bool)
+    mask[[DAY_POSITIONS[day] for day in days]] = True
+    return mask
+
+
+class PlanArray:
+    """
+    Number of tutors per task, day and hour as array (task x day x hour), the
+    compact form of :py:data:`~tutorplanner.input.plan.PlanDict`.
+    """
+
+    counts: np.ndarray
+
+    def __init__(self, counts: Optional[np.ndarray] = None) -> None:
+        if counts is None:
+            counts = np.zeros((len(TASKS), *grid_shape()), dtype=np.int16)
+        self.counts = counts
+
+    @classmethod
+    def from_dict(cls, plan: Dict[str, Dict[int, Dict[int, int]]]) -> "PlanArray":
+        """
+        Convert a plan dict (task -> day index -> hour -> count).
+        """
+        result = cls()
+        for task, task_id in TASK_IDS.items():
+            task_plan = plan[task]
+            for day, hour, d, h in SLOTS:
+                result.counts[task_id, d, h] = task_plan[day][hour] or 0
+        return result
+
+    def to_dict(self) -> Dict[str, Dict[int, Dict[int, int]]]:
+        """
+        Convert to a plan dict (task -> day index -> hour -> count).
+        """
+        counts = self.counts.tolist()
+        return {task: {day: {hour: counts[task_id][DAY_POSITIONS[day]][HOUR_POSITIONS[hour]]
+                             for hour in hours_real(day)} for day in DAYS}
+                for task, task_id in TASK_IDS.items()}
+
+    def workload(self) -> np.ndarray:
+        """
+        Get the number of assigned tasks per task.
+        """
+        return self.counts.sum(axis=(1, 2))
+
+    def diff(self, other: "PlanArray") -> "PlanArray":
+        """
+        Get the difference of the counts (self - other).
+        """
+        return PlanArray(self.counts.astype(np.int32) - other.counts)
+
+    def deviation(self, other: "PlanArray") -> int:
+        """
+        Get the sum of the absolute differences of the counts.
+        """
+        return int(np.abs(self.diff(other).counts).sum())
+
+
+class PersonalPlanArray:
+    """
+    Tasks and rooms of the tutors as arrays (tutor x day x hour), the compact
+    form of :py:data:`~tutorplanner.input.plan.PersonalPlanDict`.
+
+    ``tasks`` contains the task id (:py:data:`TASK_IDS`) or
+    :py:data:`NO_TASK`, ``rooms`` the position in ``room_names`` or
+    :py:data:`NO_ROOM` (no task or unknown room). A tutor has at most one task
+    per time slot.
+    """
+
+    tutor_names: List[str]
+    room_names: List[str]
+    tasks: np.ndarray
+    rooms: np.ndarray
+
+    def __init__(self, tutor_names: Iterable[str], room_names: Iterable[str] = (),
+                 tasks: Optional[np.ndarray] = None, rooms: Optional[np.ndarray] = None) -> None:
+        self.tutor_names = list(tutor_names)
+        self.tutor_positions = {name: i for i, name in enumerate(self.tutor_names)}
+        self.room_names = list(room_names)
+        shape = (len(self.tutor_names), *grid_shape())
+        self.tasks = np.full(shape, NO_TASK, dtype=np.int8) if tasks is None else tasks
+        self.rooms = np.full(shape, NO_ROOM, dtype=np.int32) if rooms is None else rooms
+
+    @classmethod
+    def from_dict(cls, personal_plans: Dict[str, Any],
+                  tutor_names: Optional[Iterable[str]] = None) -> "PersonalPlanArray":
+        """
+        Convert personal plans or personal room plans (tutor -> task -> day
+        index -> hour -> bool or room name, None for an unknown room) of the
+        tutors (default: all).
+        """
+        result = cls(personal_plans if tutor_names is None else tutor_names)
+        room_ids: Dict[str, int] = {}
+        for t, name in enumerate(result.tutor_names):
+            tutor_plan = personal_plans[name]
+            for task, task_id in TASK_IDS.items():
+                task_plan = tutor_plan[task]
+                for day, hour, d, h in SLOTS:
+                    value = task_plan[day][hour]
+                    # None is an assigned task without known room
+                    if value is None or value:
+                        result.tasks[t, d, h] = task_id
+                        if isinstance(value, str):
+                            result.rooms[t, d, h] = room_ids.setdefault(value, len(room_ids))
+                        else:
+                            result.rooms[t, d, h] = NO_ROOM
+        result.room_names = list(room_ids)
+        return result
+
+    def to_dict(self, rooms: bool = True) -> Dict[str, Any]:
+        """
+        Convert to personal room plans (room name, "" without task and None
+        for unknown rooms) or to personal plans (bool) if rooms is disabled.
+        """
+        empty: Any = "" if rooms else False
+        templates = [(day, dict.fromkeys(hours_real(day), empty)) for day in DAYS]
+        result = {name: {task: {day: template.copy() for day, template in templates} for task in TASKS}
+                  for name in self.tutor_names}
+        t, d, h = np.nonzero(self.assigned())
+        tasks = self.tasks[t, d, h].tolist()
+        if rooms:
+            # NO_ROOM (-1) is the last entry
+            room_names: List[Any] = self.room_names + [None]
+            values = [room_names[room] for room in self.rooms[t, d, h].tolist()]
+        else:
+            values = [True] * len(tasks)
+        for t_, d_, h_, task, value in zip(t.tolist(), d.tolist(), h.tolist(), tasks, values):
+            result[self.tutor_names[t_]][TASKS[task]][DAY_LIST[d_]][HOUR_LIST[h_]] = value
+        return result
+
+    def assigned(self) -> np.ndarray:
+        """
+        Get whether the tutors have a task (tutor x day x hour).
+        """
+        return self.tasks != NO_TASK
+
+    def workload(self, days: Optional[Iterable[int]] = None) -> np.ndarray:
+        """
+        Get the number of tasks per tutor (on the given day indices).
+        """
+        assigned = self.assigned()
+        if days is not None:
+            assigned = assigned[:, day_mask(days), :]
+        return np.count_nonzero(assigned, axis=(1, 2))
+
+    def availability(self) -> np.ndarray:
+        """
+        Get the availability of the tutors (tutor x day x hour) from the
+        availability tensor of :py:class:`~tutorplanner.input.data.Data`.
+        """
+        data = Data()
+        positions = [np.array([index.get(key, -1) for key in keys], dtype=np.int64)
+                     for index, keys in [(data.tutor_positions, self.tutor_names), (data.day_positions, DAY_LIST),
+                                         (data.hour_positions, HOUR_LIST)]]
+        known = [p >= 0 for p in positions]
+        availability = np.zeros(self.tasks.shape, dtype=np.int8)
+        availability[np.ix_(*known)] = data.availability_tensor[np.ix_(*(p[k] for p, k in zip(positions, known)))]
+        return availability
+
+    def happiness(self, availability: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Get the happiness of the tutors, i.e. the mean availability of their
+        tasks (666 without tasks). The availability (tutor x day x hour) is
+        taken from :py:meth:`availability` if it is not given.
+        """
+        if availability is None:
+            availability = self.availability()
+        assigned = self.assigned()
+        workload = np.count_nonzero(assigned, axis=(1, 2))
+        satisfied = np.where(assigned, availability, 0).sum(axis=(1, 2))
+        happiness = np.full(len(workload), 666.0)
+        np.divide(satisfied, workload, out=happiness, where=workload > 0)
+        return happiness
+
+    def to_plan_array(self, tutor_names: Optional[Sequence[str]] = None) -> PlanArray:
+        """
+        Count the tasks of the tutors (default: all) per time slot.
+        """
+        tasks = self.tasks
+        if tutor_names is not None:
+            tasks = tasks[[self.tutor_positions[name] for name in tutor_names]]
+        return PlanArray(np.stack([np.count_nonzero(tasks == task_id, axis=0).astype(np.int16)
+                                   for task_id in range(len(TASKS))]))
+
+    def aligned(self, other: "PersonalPlanArray") -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the tasks and rooms of other for the tutors and room ids of this
+        plan. Rooms that are unknown here get ids after room_names.
+        """
+        positions = [other.tutor_positions[name] for name in self.tutor_names]
+        room_ids = {name: i for i, name in enumerate(self.room_names)}
+        mapping = np.array([room_ids.get(name, len(self.room_names) + i) for i, name in enumerate(other.room_names)]
+                           + [NO_ROOM], dtype=np.int64)
+        rooms = other.rooms[positions]
+        return other.tasks[positions], mapping[np.where(rooms == NO_ROOM, -1, rooms)]
+
+    def diff(self, other: "PersonalPlanArray") -> np.ndarray:
+        """
+        Get the time slots (tutor x day x hour) whose task or room differs in
+        other.
+        """
+        tasks, rooms = self.aligned(other)
+        return (self.tasks != tasks) | (self.rooms != rooms)
+
+    def changes(self, other: "PersonalPlanArray") -> Iterator[Tuple[str, int, int, Optional[str], Optional[str],
+                                                                    Optional[str], Optional[str]]]:
+        """
+        Iterate over the changes from this plan to other as (tutor, day index,
+        hour, old task, new task, old room, new room), ordered by tutor, day
+        and hour. Tasks and rooms are None if there is none.
+        """
+        tasks, rooms = self.aligned(other)
+        t, d, h = np.nonzero((self.tasks != tasks) | (self.rooms != rooms))
+        # room ids of aligned rooms, see aligned
+        room_names = self.room_names + other.room_names
+        for t_, d_, h_, old_task, new_task, old_room, new_room in zip(
+                t.tolist(), d.tolist(), h.tolist(), self.tasks[t, d, h].tolist(), tasks[t, d, h].tolist(),
+                self.rooms[t, d, h].tolist(), rooms[t, d, h].tolist()):
+            yield (self.tutor_names[t_], DAY_LIST[d_], HOUR_LIST[h_],
+                   TASKS[old_task] if old_task != NO_TASK else None, TASKS[new_task] if new_task != NO_TASK else None,
+                   room_names[old_room] if old_room != NO_ROOM else None,
+                   room_names[new_room] if new_room != NO_ROOM else None)
+
+    def assignments(self, by_task: bool = False) -> Iterator[Tuple[str, int, int, str, Optional[str]]]:
+        """
+        Iterate over the tasks as (tutor, day index, hour, task, room),
+        ordered by tutor, day and hour (by tutor, task, day and hour if
+        by_task is enabled, like the dicts). The room is None if it is
+        unknown.
+        """
+        t, d, h = np.nonzero(self.assigned())
+        tasks = self.tasks[t, d, h]
+        if by_task:
+            order = np.lexsort((h, d, tasks, t))
+            t, d, h, tasks = t[order], d[order], h[order], tasks[order]
+        # NO_ROOM (-1) is the last entry
+        room_names: List[Optional[str]] = self.room_names + [None]
+        for t_, d_, h_, task, room in zip(t.tolist(), d.tolist(), h.tolist(), tasks.tolist(),
+                                          self.rooms[t, d, h].tolist()):
+            yield self.tutor_names[t_], DAY_LIST[d_], HOUR_LIST[h_], TASKS[task], room_names[room]
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory of the arrays in bytes.
+        """
+        return self.tasks.nbytes + self.rooms.nbytes
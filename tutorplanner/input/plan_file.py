@@ -0,0 +1,237 @@
+"""
+The ``plan_file`` module reads and writes the plan file of a plan folder.
+
+A plan folder contains one plan file (:py:data:`PLAN_FILE`) with the personal
+plans as :py:class:`~.plan_array.PersonalPlanArray`. The plan dicts (see
+:doc:`/contents/generated_plans`) are derived from it on first access, see
+:py:class:`StoredPlan`.
+
+Layout of the plan file (version :py:data:`FORMAT_VERSION`, little-endian):
+
+* prefix: :py:data:`MAGIC`, the version and the size of the header (uint32
+  each)
+* header: JSON with the schema (tasks, day indices and hours of the arrays),
+  whether the plans have rooms and the offset, size and type of the sections
+* sections, each aligned to :py:data:`ALIGNMENT` bytes from the end of the
+  header: the string tables of the tutor and room names (UTF-8, separated by
+  NUL) and the arrays of the tasks and room ids
+
+The arrays are memory mapped, so loading the file does not depend on the
+number of tutors. Plan folders of former versions only contain the pickled
+plan dicts (:py:data:`PICKLE_FILES`), they are still read by
+:py:func:`read_plan_folder`.
+"""
+
+__author__ = "Alexander Elvers <aelvers AT inet.tu-berlin.de>"
+
+__all__ = [
+    "PLAN_FILE",
+    "PICKLE_FILES",
+    "MAGIC",
+    "FORMAT_VERSION",
+    "ALIGNMENT",
+    "StoredPlan",
+    "write_plan_file",
+    "read_plan_file",
+    "save_plan",
+    "find_plan_file",
+    "read_plan_folder",
+]
+
+import json
+import mmap
+import os
+import pathlib
+import pickle
+import struct
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+from .plan_array import PersonalPlanArray, DAY_LIST, HOUR_LIST
+from ..util.settings import TASKS
+
+#: name of the plan file in a plan folder
+PLAN_FILE = "plan.tpp"
+#: pickled plan dicts of former versions (target plan, personal plans, personal room plans)
+PICKLE_FILES = ("plan.pickle", "personalPlans.pickle", "personalPlans_Rooms.pickle")
+#: first bytes of a plan file
+MAGIC = b"TPPLAN\x00\x00"
+#: current version of the plan file
+FORMAT_VERSION = 1
+#: alignment of the sections in bytes
+ALIGNMENT = 64
+
+PREFIX = struct.Struct("<8sII")
+
+
+def align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def schema() -> Dict[str, List[Any]]:
+    """
+    Return the tasks, day indices and hours of the arrays.
+    """
+    return {"tasks": list(TASKS), "days": DAY_LIST, "hours": HOUR_LIST}
+
+
+class StoredPlan:
+    """
+    Personal plans of a plan folder. The plan dicts are computed from
+    ``personal_plans_array`` on first access and shared afterwards.
+
+    ``has_rooms`` is False for plans without rooms (plans of levels without
+    room planning). The arrays of a plan file are read-only.
+    """
+
+    def __init__(self, personal_plans_array: PersonalPlanArray, has_rooms: bool = True) -> None:
+        self.personal_plans_array = personal_plans_array
+        self.has_rooms = has_rooms
+        self._plan: Optional[Dict[str, Any]] = None
+        self._personal_plans: Optional[Dict[str, Any]] = None
+        self._personal_room_plans: Optional[Dict[str, Any]] = None
+
+    @property
+    def plan(self) -> Dict[str, Any]:
+        """
+        Number of tutors per task and time slot (``plan.pickle``).
+        """
+        if self._plan is None:
+            self._plan = self.personal_plans_array.to_plan_array().to_dict()
+        return self._plan
+
+    @property
+    def personal_plans(self) -> Dict[str, Any]:
+        """
+        Personal plans with True for the assigned tasks
+        (``personalPlans.pickle``).
+        """
+        if self._personal_plans is None:
+            self._personal_plans = self.personal_plans_array.to_dict(rooms=False)
+        return self._personal_plans
+
+    @property
+    def personal_room_plans(self) -> Optional[Dict[str, Any]]:
+        """
+        Personal plans with the room of the assigned tasks, "" otherwise
+        (``personalPlans_Rooms.pickle``), None without rooms.
+        """
+        if not self.has_rooms:
+            return None
+        if self._personal_room_plans is None:
+            self._personal_room_plans = self.personal_plans_array.to_dict()
+        return self._personal_room_plans
+
+
+def write_plan_file(path: pathlib.Path, personal_plans: PersonalPlanArray, has_rooms: bool = True) -> None:
+    """
+    Write the personal plans to a plan file. The file is replaced at once, so
+    that memory mapped plans of the old file stay valid.
+    """
+    path = pathlib.Path(path)
+    sections: Dict[str, Any] = {}
+    contents = []
+    offset = 0
+
+    def add(name: str, data: bytes, **info: Any) -> None:
+        nonlocal offset
+        offset = align(offset)
+        sections[name] = dict(offset=offset, size=len(data), **info)
+        contents.append((offset, data))
+        offset += len(data)
+
+    for name, strings in [("tutors", personal_plans.tutor_names), ("rooms", personal_plans.room_names)]:
+        add(name, "\x00".join(strings).encode(), count=len(strings))
+    for name, array, dtype in [("tasks", personal_plans.tasks, "<i1"), ("room_ids", personal_plans.rooms, "<i4")]:
+        array = np.ascontiguousarray(array, dtype=dtype)
+        add(name, array.tobytes(), dtype=array.dtype.str, shape=list(array.shape))
+
+    header = json.dumps(dict(schema=schema(), has_rooms=has_rooms, sections=sections)).encode()
+    start = align(PREFIX.size + len(header))
+    temporary = path.with_name(path.name + ".tmp")
+    with open(temporary, "wb") as file:
+        file.write(PREFIX.pack(MAGIC, FORMAT_VERSION, len(header)))
+        file.write(header)
+        for section_offset, data in contents:
+            file.seek(start + section_offset)
+            file.write(data)
+        file.truncate(start + offset)
+    os.replace(temporary, path)
+
+
+def read_plan_file(path: pathlib.Path) -> StoredPlan:
+    """
+    Read a plan file with memory mapped arrays.
+    """
+    with open(path, "rb") as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(buffer) < PREFIX.size:
+        raise ValueError(f"not a plan file: {path}")
+    magic, version, header_size = PREFIX.unpack_from(buffer)
+    if magic != MAGIC:
+        raise ValueError(f"not a plan file: {path}")
+    if version > FORMAT_VERSION:
+        raise ValueError(f"plan file {path} has version {version}, supported up to version {FORMAT_VERSION}")
+    header = json.loads(buffer[PREFIX.size:PREFIX.size + header_size].decode())
+    if header["schema"] != schema():
+        raise ValueError(f"plan file {path} was written for other tasks, days or hours")
+    start = align(PREFIX.size + header_size)
+    sections = header["sections"]
+
+    def strings(name: str) -> List[str]:
+        info = sections[name]
+        if not info["count"]:
+            return []
+        return buffer[start + info["offset"]:start + info["offset"] + info["size"]].decode().split("\x00")
+
+    def array(name: str) -> np.ndarray:
+        info = sections[name]
+        return np.frombuffer(buffer, dtype=info["dtype"], count=int(np.prod(info["shape"])),
+                             offset=start + info["offset"]).reshape(info["shape"])
+
+    personal_plans = PersonalPlanArray(strings("tutors"), strings("rooms"), array("tasks"), array("room_ids"))
+    return StoredPlan(personal_plans, header["has_rooms"])
+
+
+def save_plan(folder: pathlib.Path, personal_plans: Union[Dict[str, Any], PersonalPlanArray],
+              has_rooms: bool = True) -> None:
+    """
+    Save personal plans (personal room plans if has_rooms is enabled) as plan
+    file of the folder.
+    """
+    if not isinstance(personal_plans, PersonalPlanArray):
+        personal_plans = PersonalPlanArray.from_dict(personal_plans)
+    write_plan_file(pathlib.Path(folder) / PLAN_FILE, personal_plans, has_rooms)
+
+
+def find_plan_file(folder: pathlib.Path) -> pathlib.Path:
+    """
+    Return the file that the plans of a plan folder are read from: the plan
+    file or, in plan folders of former versions, the pickled personal room
+    plans or personal plans.
+    """
+    folder = pathlib.Path(folder)
+    for filename in [PLAN_FILE, "personalPlans_Rooms.pickle", "personalPlans.pickle"]:
+        if (folder / filename).exists():
+            return folder / filename
+    raise FileNotFoundError(f"no plan file in {folder}")
+
+
+def read_plan_folder(folder: pathlib.Path) -> StoredPlan:
+    """
+    Read the plans of a plan folder, see :py:func:`find_plan_file`.
+    """
+    path = find_plan_file(folder)
+    if path.name == PLAN_FILE:
+        return read_plan_file(path)
+    with open(path, "rb") as f:
+        personal_plans = pickle.load(f)
+    has_rooms = path.name == "personalPlans_Rooms.pickle"
+    stored = StoredPlan(PersonalPlanArray.from_dict(personal_plans), has_rooms)
+    # the loaded dict is kept, so that it is not converted back
+    if has_rooms:
+        stored._personal_room_plans = personal_plans
+    else:
+        stored._personal_plans = personal_plans
+    return stored
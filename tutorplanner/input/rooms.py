@@ -13,9 +13,6 @@ import datetime
 import warnings
 from typing import Union, Dict, Set, List, Optional, Sequence, Iterable, cast
 
-import xlsxwriter
-from xlsxwriter.utility import xl_rowcol_to_cell, xl_col_to_name
-
 from ..util import settings
 
 
@@ -169,6 +166,10 @@ def export_rooms_to_xlsx(file: str, rooms: Iterable[Room], export_capacity: bool
     headers and an 'x' in the other cells if the room is booked and nothing
     (empty string) if not.
     """
+    # imported here to keep the command line fast
+    import xlsxwriter
+    from xlsxwriter.utility import xl_rowcol_to_cell, xl_col_to_name
+
     times = settings.settings.times._or([])()
     days_data: List[List[str]] = []
     for day in settings.settings.days():
@@ -23,8 +23,6 @@ import time
 from typing import Optional, Tuple, Any, Iterable, Dict, List
 
 import click
-import matplotlib.pyplot as plt
-from mako.template import Template, exceptions
 
 from . import read_pickled_files as rpf
 from .input.data import Data
@@ -32,10 +30,24 @@ from .input.rooms import import_rooms_from_csv
 from .util import converter, settings
 
 DEBUG = True
-TEMPLATE_DIR = pathlib.Path(settings.settings.paths._get("templates", "templates")()).resolve()
-PDF_DIR = pathlib.Path(settings.settings.paths._get("pdf_output", "pdf")()).resolve()
-PNG_DIR = pathlib.Path(settings.settings.paths._get("png_output", "png")()).resolve()
-HTML_DIR = pathlib.Path(settings.settings.paths._get("html_output", "html")()).resolve()
+
+
+# directories are resolved on use, so that importing does not read the settings
+
+def template_dir() -> pathlib.Path:
+    return pathlib.Path(settings.settings.paths._get("templates", "templates")()).resolve()
+
+
+def pdf_dir() -> pathlib.Path:
+    return pathlib.Path(settings.settings.paths._get("pdf_output", "pdf")()).resolve()
+
+
+def png_dir() -> pathlib.Path:
+    return pathlib.Path(settings.settings.paths._get("png_output", "png")()).resolve()
+
+
+def html_dir() -> pathlib.Path:
+    return pathlib.Path(settings.settings.paths._get("html_output", "html")()).resolve()
 
 
 def err_print(msg: str) -> None:
@@ -75,16 +87,18 @@ def render_latex(tex_data: str, filename: str, output_pdf: bool = False, output_
     :param output_png: if enabled, write PNG output
     """
     if output_pdf or output_png:
-        PDF_DIR.mkdir(exist_ok=True)
-        pdf_file = PDF_DIR / f"{filename}.pdf"
+        pdf_folder = pdf_dir()
+        pdf_folder.mkdir(exist_ok=True)
+        pdf_file = pdf_folder / f"{filename}.pdf"
 
         pdf = render_pdf(tex_data)
         pdf_file.write_bytes(pdf)
 
         if output_png:
-            PNG_DIR.mkdir(exist_ok=True)
-            png_file = PNG_DIR / f"{filename}.png"
-            crop_file = PDF_DIR / f"{filename}-crop.pdf"
+            png_folder = png_dir()
+            png_folder.mkdir(exist_ok=True)
+            png_file = png_folder / f"{filename}.png"
+            crop_file = pdf_folder / f"{filename}-crop.pdf"
 
             args = ["pdfcrop", str(pdf_file)]
             dbg_print(f"Running: {' '.join(map(str, args))}")
@@ -98,10 +112,11 @@ def render_latex(tex_data: str, filename: str, output_pdf: bool = False, output_
             crop_file.unlink()
 
     if output_html:
-        HTML_DIR.mkdir(exist_ok=True)
+        html_folder = html_dir()
+        html_folder.mkdir(exist_ok=True)
         html, css = render_html(tex_data)
-        (HTML_DIR / f"{filename}.html").write_bytes(html.replace(b"render.css", f"{filename}.css".encode()))
-        (HTML_DIR / f"{filename}.css").write_bytes(css)
+        (html_folder / f"{filename}.html").write_bytes(html.replace(b"render.css", f"{filename}.css".encode()))
+        (html_folder / f"{filename}.css").write_bytes(css)
 
 
 def render_format(
@@ -123,7 +138,7 @@ def render_format(
 
         if resources:
             dbg_print("Copying additional resources")
-            for resource_file in (TEMPLATE_DIR / resources).iterdir():
+            for resource_file in (template_dir() / resources).iterdir():
                 shutil.copy(resource_file, temp_dir)
 
         dbg_print(f"Compiling template {temp_tex}")
@@ -166,6 +181,8 @@ def render_template(path: pathlib.Path, **kwargs: Any) -> str:
     :param path: template file
     :param kwargs: template data
     """
+    from mako.template import Template, exceptions
+
     template = Template(
         filename=str(path),
         default_filters=['decode.utf8', 'l'],
@@ -369,7 +386,7 @@ def make_tutor_schedule(day, fontsize, bottom, top, output_pdf, output_html, fir
         filename += "_first_names"
     else:
         filename += "_last_names"
-    path = TEMPLATE_DIR / "tutor_schedule.tex.mako"
+    path = template_dir() / "tutor_schedule.tex.mako"
     rooms = rpf.get_rooms_by_day()[day_index]
     tutorials = rpf.get_tutorials_for_tickets()[day_index]
 
@@ -386,7 +403,9 @@ def make_tutor_schedule(day, fontsize, bottom, top, output_pdf, output_html, fir
     print(tutorials)
     print(rooms)
 
-    extended_tutorials = rpf.get_extended_tutorials_for_tickets()[day_index]
+    # the views of the active plan are shared, the rooms are added to a copy
+    extended_tutorials = {hour: dict(tutorials_of_hour)
+                          for hour, tutorials_of_hour in rpf.get_extended_tutorials_for_tickets()[day_index].items()}
     print(extended_tutorials)
     for hour in range(lower, upper):
         if hour not in extended_tutorials:
@@ -430,7 +449,7 @@ def make_badges(output_pdf, output_html):
     Output badges for tutors and course leaders with their names and roles on it.
     """
     filename = "badges"
-    path = TEMPLATE_DIR / "badges.tex.mako"
+    path = template_dir() / "badges.tex.mako"
     tutors = Data().tutor_by_name
     tex = render_template(path, tutors=tutors, wms=rpf.get_course_leaders())
     render_latex(tex, filename, output_pdf, output_html)
@@ -444,7 +463,7 @@ def make_tutor_plans(output_pdf, output_html):
     Output a plan for each tutor.
     """
     filename_prefix = "tutor_plan"
-    path = TEMPLATE_DIR / "tutor_plan.tex.mako"
+    path = template_dir() / "tutor_plan.tex.mako"
     schedules = rpf.get_schedule_per_tutor()
     tutors = Data().tutor_by_name
 
@@ -464,7 +483,7 @@ def make_contact_list(output_pdf, output_html):
     Output a contact list of tutors and course leaders.
     """
     filename = "contact_list"
-    path = TEMPLATE_DIR / "contact_list.tex.mako"
+    path = template_dir() / "contact_list.tex.mako"
     tutors = Data().tutor_by_name
     tex = render_template(path, tutors=tutors, wms=rpf.get_course_leaders())
     render_latex(tex, filename, output_pdf, output_html)
@@ -509,7 +528,7 @@ def make_tickets(
     day_index = converter.date_to_day_index(day)
 
     filename = f"tickets_{day}"
-    path = TEMPLATE_DIR / "tickets.tex.mako"
+    path = template_dir() / "tickets.tex.mako"
 
     # get daily hours
 
@@ -620,7 +639,7 @@ def make_course_overview(
     day_index = converter.date_to_day_index(day)
 
     filename = f"course_overview_{day}"
-    path = TEMPLATE_DIR / "course_overview.tex.mako"
+    path = template_dir() / "course_overview.tex.mako"
 
     # get daily hours
 
@@ -706,11 +725,17 @@ def make_course_overview(
 def plot_happy_and_fair(x, y, filename):
     """
     Scatter work happiness.
+
+    The figure is not managed by pyplot, so that it can be plotted in the
+    background writer (see :py:mod:`tutorplanner.planning.artifacts`) and is
+    freed afterwards.
     """
-    fig = plt.figure()
+    from matplotlib.figure import Figure
+
+    fig = Figure()
     ax = fig.add_subplot(1, 1, 1)
 
     ax.set_xlabel("Effektive Praesenzzeit der Arbeitszeit[%]")
     ax.set_ylabel("Happiness (1: nicht happy; 3: sehr happy)")
-    plt.scatter(x, y, color='red', s=20, edgecolor='black')
-    plt.savefig(filename + '.png')
+    ax.scatter(x, y, color='red', s=20, edgecolor='black')
+    fig.savefig(filename + '.png')
@@ -0,0 +1,122 @@
+"""
+The ``artifacts`` module controls which files the planners write and writes
+them in the background.
+
+The artifacts are set in the settings (``artifacts``):
+
+* ``levels``: ``per_level`` (default) writes the plan files, the happiness
+  plot and the plan file of every level and of the final plan, ``final``
+  only the ones of the final plan (in the base folder of the run) and
+  ``none`` only the plan file of the final plan that is needed as active
+  plan.
+* ``models``: whether the LP and solution files are written (default: true)
+* ``compress``: whether the LP and solution files are compressed with gzip
+  (default: true)
+* ``background``: whether the files are written in a background thread, so
+  that the next level is solved in the meantime (default: true)
+
+The LP and solution files are written by the solver, which has to be done
+before the model is changed by the next level. Only the compression is done
+in the background. The plans are taken from the solution snapshot (see
+:py:class:`tutorplanner.gurobiinterface.solution.SolutionSnapshot`), which is
+not changed afterwards.
+"""
+
+__author__ = "Alexander Elvers <aelvers AT inet.tu-berlin.de>"
+
+__all__ = [
+    "ArtifactWriter",
+    "LEVEL_POLICIES",
+    "level_policy",
+    "write_model_files",
+]
+
+import concurrent.futures
+import gzip
+import os
+import shutil
+
+from ..util.settings import settings
+
+#: values of ``artifacts.levels``
+LEVEL_POLICIES = ["none", "final", "per_level"]
+
+
+def level_policy():
+    """
+    Return the artifact policy of the levels, see :py:data:`LEVEL_POLICIES`.
+    """
+    policy = settings.artifacts.levels._or("per_level")()
+    if policy not in LEVEL_POLICIES:
+        raise ValueError(f"unknown artifact policy: {policy} (available: {', '.join(LEVEL_POLICIES)})")
+    return policy
+
+
+def compress(filename):
+    """
+    Compress a file with gzip and remove the original.
+    """
+    with open(filename, "rb") as source, gzip.open(filename + ".gz", "wb") as target:
+        shutil.copyfileobj(source, target)
+    os.remove(filename)
+
+
+def write_model_files(optimizer, filename, writer=None):
+    """
+    Write the LP and the solution file of the optimizer if
+    ``artifacts.models`` is enabled. They are compressed (in the background
+    if a writer is given) if ``artifacts.compress`` is enabled.
+    """
+    if not settings.artifacts.models._or(True)():
+        return
+    optimizer.write_lp(filename)
+    optimizer.write_solution(filename)
+    if settings.artifacts.compress._or(True)():
+        for written in [filename + "foo.lp", filename + ".sol"]:
+            if not os.path.exists(written):
+                # e.g. the plans of the rooms by day have no model
+                continue
+            if writer is None:
+                compress(written)
+            else:
+                writer.submit(compress, written)
+
+
+class ArtifactWriter:
+    """
+    Writes files in a background thread (``artifacts.background``) or
+    directly. Errors of the background thread are raised by :py:meth:`close`,
+    which waits for all files. It can be used as context manager.
+    """
+
+    def __init__(self, background=None):
+        if background is None:
+            background = settings.artifacts.background._or(True)()
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1) if background else None
+        self.futures = []
+
+    def submit(self, function, *args, **kwargs):
+        """
+        Call the function in the background, in the order of submission.
+        """
+        if self.executor is None:
+            function(*args, **kwargs)
+        else:
+            self.futures.append(self.executor.submit(function, *args, **kwargs))
+
+    def close(self):
+        """
+        Wait until all files are written.
+        """
+        if self.executor is None:
+            return
+        self.executor.shutdown(wait=True)
+        futures, self.futures = self.futures, []
+        for future in futures:
+            future.result()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -9,17 +9,22 @@ __author__ = ("Matthias Rost <mrost AT inet.tu-berlin.de>, "
 __all__ = [
     "from_joint_plan_to_list",
     "evaluate_plan",
-    "pickle_it",
+    "save_plans",
     "compute_max_workload",
     "compute_min_happiness",
+    "with_bound_tolerances",
+    "save_level",
+    "save_final_plan",
+    "save_build_report",
     "get_plan",
 ]
 
 import pathlib
-import pickle
 
-from ..input import plan
+from .artifacts import level_policy, write_model_files
+from ..input import plan, plan_file
 from ..input.data import Data
+from ..input.plan_array import PersonalPlanArray
 from ..output import plot_happy_and_fair, day_index_to_string
 from ..util import settings
 from ..util.settings import DAYS, hours_real, TASKS, TUTORIUM
@@ -48,14 +53,16 @@ def from_joint_plan_to_list(tutor_plan, room_plan=None):
     return result
 
 
-def evaluate_plan(optimizer, folder: pathlib.Path, room_plan=None, print_to_screen=False, use_base_folder=False):
+def evaluate_plan(optimizer, folder: pathlib.Path, room_plan=None, print_to_screen=False, use_base_folder=False,
+                  writer=None):
     """
     Write the plan as text for each tutor and add statistics like working
     hours, happiness. Plot the happiness and output some stuff. Also save the
     solver.
+
+    The files are written by the writer (see
+    :py:class:`~.artifacts.ArtifactWriter`), directly if it is None.
     """
-    X = []
-    Y = []
     tutor_plans = optimizer.get_personal_plans()
     if use_base_folder:
         optimizer_folder = folder
@@ -63,35 +70,11 @@ def evaluate_plan(optimizer, folder: pathlib.Path, room_plan=None, print_to_scre
         optimizer_folder = folder / optimizer.name
     optimizer_folder.mkdir(parents=True, exist_ok=True)
 
-    for tutor, tutor_plan in tutor_plans.items():
-
-        contents =  "Tutor: " + tutor + "\t" + "\t \t".join([
-            "Arbeitszeit (gesamt): " + str(plan.compute_workload(tutor_plan)),
-            " Arbeitszeit (erste Woche): " + str(plan.compute_workload_first_week(tutor_plan)),
-            " Arbeitszeit (zweite Woche): " + str(plan.compute_workload_second_week(tutor_plan)),
-            "Happy?: Skala von 1 (nicht happy) bis 3 (sehr happy): "
-            + str(plan.compute_happiness(tutor_plan, Data().availability[tutor]))
-        ])
-        contents += "\n\n"
-        foo = None
-        if room_plan is not None:
-            foo = room_plan[tutor]
-        contents += "\n".join(from_joint_plan_to_list(tutor_plan, foo))
-        contents += "\n\n"
-
-        with open(optimizer_folder / f"plan_{tutor}.txt", "w") as file:
-            file.write(contents)
+    if print_to_screen:
+        for tutor, tutor_plan in tutor_plans.items():
+            print(format_tutor_plan(tutor, tutor_plan, None if room_plan is None else room_plan[tutor]))
+    submit(writer, write_tutor_plans, optimizer_folder, tutor_plans, room_plan)
 
-        if print_to_screen:
-            print(contents)
-
-        if Data().tutor_by_name[tutor].monthly_work_hours == 0:
-            X.append(float("NaN"))
-        else:
-            X.append(plan.compute_workload(tutor_plan) / float(Data().tutor_by_name[tutor].monthly_work_hours / 2.0))
-        Y.append(plan.compute_happiness(tutor_plan, Data().availability[tutor]))
-
-    plot_happy_and_fair(X, Y, str(optimizer_folder))
     newPlan = optimizer.get_optimal_plan()
     #print "=== OLD ==="
     #pMP(plan, ordered=False)
@@ -109,32 +92,79 @@ def evaluate_plan(optimizer, folder: pathlib.Path, room_plan=None, print_to_scre
             sum_conservative_p_6 = sum([min(settings.get_room_info(room_plan[tutor][TUTORIUM][day][hour])["capacity"], 35) + 6 for tutor in Data().tutor_by_name.keys() for hour in hours_real(day) if room_plan[tutor][TUTORIUM][day][hour] != ""])
             print("{}\t{}\t{}\t{}\t{}\t{}".format(day,sum_conservative_sum,sum_conservative_p_2,sum_conservative_p_4,sum_conservative_p_6,sum_max_cap))
 
+    write_model_files(optimizer, str(optimizer_folder), writer)
 
-    optimizer.write_lp(str(optimizer_folder))
-    optimizer.write_solution(str(optimizer_folder))
+
+def submit(writer, function, *args):
+    """
+    Call the function with the writer or directly if there is no writer.
+    """
+    if writer is None:
+        function(*args)
+    else:
+        writer.submit(function, *args)
 
 
-def pickle_it(optimizer, folder: pathlib.Path, has_room_plans=False, use_base_folder=False):
+def format_tutor_plan(tutor, tutor_plan, tutor_room_plan=None, happiness=None):
     """
-    Pack and save the generated plans.
+    Return the plan of a tutor as text with the working hours and the
+    happiness (computed if not given).
+    """
+    if happiness is None:
+        happiness = plan.compute_happiness(tutor_plan, Data().availability[tutor])
+    contents =  "Tutor: " + tutor + "\t" + "\t \t".join([
+        "Arbeitszeit (gesamt): " + str(plan.compute_workload(tutor_plan)),
+        " Arbeitszeit (erste Woche): " + str(plan.compute_workload_first_week(tutor_plan)),
+        " Arbeitszeit (zweite Woche): " + str(plan.compute_workload_second_week(tutor_plan)),
+        "Happy?: Skala von 1 (nicht happy) bis 3 (sehr happy): "
+        + str(happiness)
+    ])
+    contents += "\n\n"
+    contents += "\n".join(from_joint_plan_to_list(tutor_plan, tutor_room_plan))
+    contents += "\n\n"
+    return contents
+
+
+def write_tutor_plans(optimizer_folder: pathlib.Path, tutor_plans, room_plan=None):
+    """
+    Write the plan of each tutor as text and plot the happiness.
+    """
+    X = []
+    Y = []
+    happiness = plan.compute_happiness_of_tutors(tutor_plans)
+    for tutor, tutor_plan in tutor_plans.items():
+        contents = format_tutor_plan(tutor, tutor_plan, None if room_plan is None else room_plan[tutor],
+                                     happiness[tutor])
+        with open(optimizer_folder / f"plan_{tutor}.txt", "w") as file:
+            file.write(contents)
+
+        if Data().tutor_by_name[tutor].monthly_work_hours == 0:
+            X.append(float("NaN"))
+        else:
+            X.append(plan.compute_workload(tutor_plan) / float(Data().tutor_by_name[tutor].monthly_work_hours / 2.0))
+        Y.append(happiness[tutor])
+
+    plot_happy_and_fair(X, Y, str(optimizer_folder))
+
+
+def save_plans(optimizer, folder: pathlib.Path, has_room_plans=False, use_base_folder=False, writer=None):
+    """
+    Save the generated plans as plan file (see
+    :py:mod:`~tutorplanner.input.plan_file`). The file is written by the
+    writer (see :py:class:`~.artifacts.ArtifactWriter`), directly if it is
+    None.
     """
     if use_base_folder:
         optimizer_folder = folder
     else:
         optimizer_folder = folder / optimizer.name
-
-    plan = optimizer.get_optimal_plan()
-    with open(optimizer_folder / "plan.pickle", "wb") as file:
-        pickle.dump(plan, file)
-
-    tutor_plan = optimizer.get_personal_plans()
-    with (optimizer_folder / "personalPlans.pickle").open("wb") as file:
-        pickle.dump(tutor_plan, file)
+    optimizer_folder.mkdir(parents=True, exist_ok=True)
 
     if has_room_plans:
-        tutor_plan_rooms = optimizer.get_personal_room_plans()
-        with open(optimizer_folder / "personalPlans_Rooms.pickle", "wb") as file:
-            pickle.dump(tutor_plan_rooms, file)
+        personal_plans = optimizer.get_personal_room_plans()
+    else:
+        personal_plans = optimizer.get_personal_plans()
+    submit(writer, plan_file.save_plan, optimizer_folder, personal_plans, has_room_plans)
 
 
 def compute_max_workload(tutor_plans):
@@ -142,8 +172,11 @@ def compute_max_workload(tutor_plans):
     Compute the maximum workload of the tutors.
     """
     max_workload = 0.0
-    for tutor in Data().tutor_by_name.keys():
-        load = plan.compute_workload(tutor_plans[tutor]) / (Data().tutor_by_name[tutor].monthly_work_hours / 2.0)
+    workload = PersonalPlanArray.from_dict(tutor_plans, Data().tutor_by_name).workload()
+    for tutor, tutor_workload in zip(Data().tutor_by_name.values(), workload.tolist()):
+        if tutor.monthly_work_hours == 0:
+            continue
+        load = tutor_workload / (tutor.monthly_work_hours / 2.0)
         if load > max_workload:
             max_workload = load
     return max_workload
@@ -153,17 +186,61 @@ def compute_min_happiness(tutor_plans):
     """
     Compute the minimum happiness of the tutors.
     """
-    min_happiness = 3.0
-    for tutor in Data().tutor_by_name.keys():
-        happiness = plan.compute_happiness(tutor_plans[tutor], Data().availability[tutor])
-        if happiness < min_happiness:
-            min_happiness = happiness
-    return min_happiness
+    happiness = plan.compute_happiness_of_tutors({tutor: tutor_plans[tutor] for tutor in Data().tutor_by_name})
+    return min(3.0, *happiness.values())
+
+
+def with_bound_tolerances(objective, bound_name, default):
+    """
+    Set the tolerances of an objective for hierarchical planning from the
+    bound factor in the settings (``optimization_parameters.bounds``) and the
+    optional ``optimization_parameters.absolute_tolerances``.
+    """
+    parameters = settings.settings.optimization_parameters
+    return objective.with_tolerances(parameters.bounds[bound_name]._or(default)(),
+                                     parameters.absolute_tolerances[bound_name]._or(0.0)())
+
+
+def save_level(optimizer, folder: pathlib.Path, has_room_plans=False, writer=None):
+    """
+    Evaluate and save the plans of a level if the artifacts of the levels are
+    enabled (see :py:mod:`~.artifacts`).
+    """
+    if level_policy() != "per_level":
+        return
+    if has_room_plans:
+        personal_room_plans = optimizer.get_personal_room_plans()
+        evaluate_plan(optimizer, folder, personal_room_plans, writer=writer)
+        save_plans(optimizer, folder, has_room_plans=True, writer=writer)
+    else:
+        evaluate_plan(optimizer, folder, writer=writer)
+        save_plans(optimizer, folder, writer=writer)
+
+
+def save_final_plan(optimizer, folder: pathlib.Path, writer=None):
+    """
+    Save the plans of the last level in the base folder. Without artifacts
+    (see :py:mod:`~.artifacts`), only the plan file is saved.
+    """
+    if level_policy() != "none":
+        evaluate_plan(optimizer, folder, optimizer.get_personal_room_plans(), use_base_folder=True, writer=writer)
+    save_plans(optimizer, folder, has_room_plans=True, use_base_folder=True, writer=writer)
+
+
+def save_build_report(optimizer, folder: pathlib.Path):
+    """
+    Write the measurements of the model building, solving and extracting the
+    plans to ``build_report.json`` and print them as table.
+    """
+    report = optimizer.build_report
+    report.write(folder / "build_report.json")
+    print(report.format_table())
+    print(f"model building took {report.total_time('build'):.3f}s, solving {report.total_time('solve'):.3f}s, "
+          f"extracting the plans {report.total_time('extract'):.3f}s")
 
 
 def get_plan(input_folder: pathlib.Path) -> plan.PersonalPlanDict:
     """
     Get the plan from the input folder.
     """
-    with open(input_folder / "personalPlans_Rooms.pickle", "rb") as f:
-        return pickle.load(f)
+    return plan_file.read_plan_folder(input_folder).personal_room_plans
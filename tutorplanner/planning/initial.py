@@ -7,21 +7,75 @@ __all__ = [
 
 import click
 
-from .base import evaluate_plan, pickle_it, compute_max_workload, compute_min_happiness
+from .artifacts import ArtifactWriter
+from .base import compute_max_workload, compute_min_happiness, with_bound_tolerances, save_level, save_final_plan, \
+    save_build_report
+from .rooms import plan_rooms_by_day
 from ..input import plan
 from ..input.data import Data
 from ..input.plan import get_target_plan
 from ..gurobiinterface.initial import PlanningCreator
 from ..util.settings import settings
 
+# levels of the rooms, they are solved after the tasks are planned
+ROOM_LEVELS = [6, 7]
 
-def main():
+
+def main(hierarchical=False):
     """
     Run initial planning.
+
+    If ``hierarchical`` is enabled, all levels are solved in one run with
+    hierarchical objectives.
     """
     folder = plan.get_new_plan_folder("initial")
 
     target_plan = get_target_plan()
+    # the plans of the levels are written while the next level is solved
+    with ArtifactWriter() as writer:
+        if hierarchical:
+            pc, level_solutions = plan_hierarchically(target_plan, folder, writer)
+        else:
+            pc, level_solutions = plan_levels(target_plan, folder, writer)
+
+        # save last one again in base folder
+        save_final_plan(pc, folder, writer)
+
+    save_build_report(pc, folder)
+    print(f"THIS IS THE END \n\n\n{level_solutions}")
+
+    # update active plan
+    plan_paths = plan.get_plan_paths()
+    click.secho(f"old active plan: {plan_paths['active']}", fg="blue", bold=True)
+    plan_paths["active"] = folder
+    click.secho(f"new active plan: {plan_paths['active']}", fg="blue", bold=True)
+    plan.save_plan_paths(plan_paths)
+
+
+def prepare_room_level(pc, level):
+    """
+    Set the objective of a room level and bound the objective of the
+    previous level. The rooms have to be part of the model.
+    """
+    if level == 6:
+        pc.plugin_objective_select_best_rooms()
+    elif level == 7:
+        rel = settings.optimization_parameters.bounds.best_rooms._or(0.999)()
+        pc.bound_best_rooms_from_below(pc.get_status().get_objective() * rel)
+        pc.plugin_obj_maximize_tutor_room_stability()
+
+
+def plan_levels(target_plan, folder, writer=None):
+    """
+    Solve the levels one after another. Returns the planning creator and the
+    objective values of the levels. The plans of the levels are saved with the
+    writer (see :py:mod:`tutorplanner.planning.artifacts`).
+
+    If ``optimization_parameters.rooms_by_day`` is enabled, the room levels
+    are solved by day with fixed tasks (see
+    :py:mod:`tutorplanner.planning.rooms`) and the plans of the rooms are
+    returned instead of the planning creator.
+    """
     tutor_plans = None
     max_workload = None
     min_happiness = None
@@ -29,16 +83,17 @@ def main():
     level_solutions = {}
 
     for level in range(1, 8):
-        # prepare
+        # prepare (the name is set first, the build report is per level)
+        if level > 1:
+            pc.name = f"Level_{level}"
         if level == 1:
             pc = PlanningCreator(target_plan, level=level)
             pc.create_model_without_rooms()
             pc.plugin_constraint_bound_maximal_deviation_from_target_plan(max_deviation=0)
             pc.plugin_obj_minimize_deviation_from_plan()
         elif level == 2:
-            pc = PlanningCreator(target_plan, level=level)
-            pc.create_model_without_rooms()
-            pc.plugin_constraint_bound_maximal_deviation_from_target_plan(max_deviation=0)
+            # the model of level 1 is reused, the tasks are already bounded by the target plan
+            pc.remove_deviation_from_plan()
             pc.plugin_obj_minimize_work_spread()
         elif level == 3:
             rel = settings.optimization_parameters.bounds.maximal_work_spread._or(1.5)()
@@ -54,25 +109,26 @@ def main():
             pc.plugin_obj_maximize_cube_happiness()
         elif level == 5:
             rel = settings.optimization_parameters.bounds.cube_happiness._or(0.95)()
+            happiness = plan.compute_happiness_of_tutors(tutor_plans)
             for tutor in sorted(Data().tutor_by_name.keys()):
-                happiness = plan.compute_happiness(tutor_plans[tutor], Data().availability[tutor])
-                print(f"happiness of tutor {tutor} is {happiness}")
+                print(f"happiness of tutor {tutor} is {happiness[tutor]}")
 
             cube_happiness = pc.get_status().get_objective()
             pc.bound_cube_happiness_from_below(cube_happiness * rel)
 
             pc.plugin_obj_minimize_mar_tel_hopping()
         elif level == 6:
+            if settings.optimization_parameters.rooms_by_day._or(False)():
+                room_plans, room_level_solutions = plan_rooms_by_day(
+                    pc, {"target_plan": target_plan}, prepare_room_level, ROOM_LEVELS, folder, writer)
+                level_solutions.update(room_level_solutions)
+                return room_plans, level_solutions
             rel = settings.optimization_parameters.bounds.minimal_mar_tel_hopping._or(1.05)()
             pc.create_constraint_minimal_mar_tel_hopping(pc.get_status().get_objective() * rel)
             pc.extend_model_with_room_support()
-            pc.plugin_objective_select_best_rooms()
+            prepare_room_level(pc, level)
         elif level == 7:
-            rel = settings.optimization_parameters.bounds.best_rooms._or(0.999)()
-            pc.bound_best_rooms_from_below(pc.get_status().get_objective() * rel)
-            pc.plugin_obj_maximize_tutor_room_stability()
-
-        pc.name = f"Level_{level}"
+            prepare_room_level(pc, level)
 
         # solve
         pc.solve_integer_program()
@@ -81,27 +137,51 @@ def main():
             raise Exception(f"Aborted in phase {level}")
 
         level_solutions[level] = pc.get_status().get_objective()
+        print(f"Level {level}: objective {pc.get_status().get_objective()}, "
+              f"{pc.get_status().get_start_description()}")
 
         target_plan = pc.get_optimal_plan()
         tutor_plans = pc.get_personal_plans()
-        if level < 6:
-            evaluate_plan(pc, folder)
-            pickle_it(pc, folder)
-        else:
-            personal_room_plans = pc.get_personal_room_plans()
-            evaluate_plan(pc, folder, personal_room_plans)
-            pickle_it(pc, folder, has_room_plans=True)
+        save_level(pc, folder, has_room_plans=level >= 6, writer=writer)
 
-    # save last one again in base folder
-    personal_room_plans = pc.get_personal_room_plans()
-    evaluate_plan(pc, folder, personal_room_plans, use_base_folder=True)
-    pickle_it(pc, folder, has_room_plans=True, use_base_folder=True)
+    return pc, level_solutions
 
-    print(f"THIS IS THE END \n\n\n{level_solutions}")
 
-    # update active plan
-    plan_paths = plan.get_plan_paths()
-    click.secho(f"old active plan: {plan_paths['active']}", fg="blue", bold=True)
-    plan_paths["active"] = folder
-    click.secho(f"new active plan: {plan_paths['active']}", fg="blue", bold=True)
-    plan.save_plan_paths(plan_paths)
+def plan_hierarchically(target_plan, folder, writer=None):
+    """
+    Solve all levels in one run. The objectives of the levels are
+    hierarchical objectives, the bound factors in the settings are used as
+    relative tolerances. The minimal happiness uses an upper bound of the
+    maximal workload instead of the maximal workload of the plan of level 2.
+
+    The plans after each level are saved like in :py:func:`plan_levels`.
+    Returns the planning creator and the objective values of the levels.
+    """
+    pc = PlanningCreator(target_plan)
+    pc.create_model_without_rooms()
+    pc.plugin_constraint_bound_maximal_deviation_from_target_plan(max_deviation=0)
+    pc.extend_model_with_room_support()
+    objectives = [
+        pc.deviation_from_plan_objective(),
+        with_bound_tolerances(pc.work_spread_objective(), "maximal_work_spread", 1.5),
+        with_bound_tolerances(pc.min_happiness_objective(pc.maximal_workload_bound()), "min_happiness", 0.9),
+        with_bound_tolerances(pc.cube_happiness_objective(), "cube_happiness", 0.95),
+        with_bound_tolerances(pc.mar_tel_hopping_objective(), "minimal_mar_tel_hopping", 1.05),
+        with_bound_tolerances(pc.best_rooms_objective(), "best_rooms", 0.999),
+        pc.tutor_room_stability_objective(),
+    ]
+    snapshots = pc.solve_hierarchically(objectives)
+    if not pc.get_status().is_feasible() or len(snapshots) < len(objectives):
+        raise Exception(f"Aborted in phase {len(snapshots) + 1}")
+
+    level_solutions = {}
+    final_solution = pc.last_solution
+    for level, (objective, snapshot) in enumerate(zip(objectives, snapshots), start=1):
+        level_solutions[level] = objective.expression.value(snapshot)
+        print(f"Level {level}: objective {level_solutions[level]}")
+        pc.name = f"Level_{level}"
+        pc.last_solution = snapshot
+        save_level(pc, folder, has_room_plans=level >= 6, writer=writer)
+    print(pc.get_status().get_start_description())
+    pc.last_solution = final_solution
+    return pc, level_solutions
@@ -9,30 +9,31 @@ import pathlib
 
 import click
 
-from .base import evaluate_plan, pickle_it, compute_max_workload, compute_min_happiness, get_plan
+from .artifacts import ArtifactWriter
+from .base import compute_max_workload, compute_min_happiness, get_plan, with_bound_tolerances, save_level, \
+    save_final_plan, save_build_report
+from .rooms import plan_rooms_by_day
 from ..input import plan
 from ..input.data import Data
 from ..input.plan import get_target_plan
+from ..input.plan_array import PersonalPlanArray
 from ..gurobiinterface.rolling import PlanningCreator
 from ..output import day_index_to_string
-from ..util.settings import settings, TASKS, DAYS, hours_real
+from ..util.settings import settings
+
+# levels of the rooms, they are solved after the tasks are planned
+ROOM_LEVELS = [7, 8, 9]
 
 
 def write_diff(folder: pathlib.Path, old_plan, new_plan):
-    for tutor_name in Data().tutor_by_name:
-        tutor_diff = {}  # day index -> (old_task, new_task, old_room, new_room)
-        for day in DAYS:
-            for hour in hours_real(day):
-                old_task = new_task = old_room = new_room = None
-                for task in TASKS:
-                    if old_plan[tutor_name][task][day][hour]:
-                        old_task = task
-                        old_room = old_plan[tutor_name][task][day][hour]
-                    if new_plan[tutor_name][task][day][hour]:
-                        new_task = task
-                        new_room = new_plan[tutor_name][task][day][hour]
-                if old_task != new_task or old_room != new_room:
-                    tutor_diff.setdefault(day, {})[hour] = old_task, new_task, old_room, new_room
+    tutor_names = list(Data().tutor_by_name)
+    diff = {}  # tutor -> day index -> hour -> (old_task, new_task, old_room, new_room)
+    old = PersonalPlanArray.from_dict(old_plan, tutor_names)
+    new = PersonalPlanArray.from_dict(new_plan, tutor_names)
+    for tutor_name, day, hour, *change in old.changes(new):
+        diff.setdefault(tutor_name, {}).setdefault(day, {})[hour] = tuple(change)
+    for tutor_name in tutor_names:
+        tutor_diff = diff.get(tutor_name, {})
         output_lines = [f"Änderungen für {tutor_name}"]
         if not tutor_diff:
             output_lines.extend(["", "keine Änderungen"])
@@ -48,12 +49,13 @@ def write_diff(folder: pathlib.Path, old_plan, new_plan):
         (folder / f"changes_{tutor_name}.txt").write_text("\n".join(output_lines))
 
 
-def main(next_day):
+def main(next_day, hierarchical=False):
     """
     Run rolling wave planning.
 
     The rolling wave planning uses the active plan as input and tries to make
-    few changes.
+    few changes. If ``hierarchical`` is enabled, all levels are solved in one
+    run with hierarchical objectives.
     """
     plan_paths = plan.get_plan_paths()
     input_folder = plan_paths["active"]
@@ -66,6 +68,56 @@ def main(next_day):
 
     target_plan = get_target_plan()
     past_plan = get_plan(input_folder)
+    # the plans of the levels are written while the next level is solved
+    with ArtifactWriter() as writer:
+        if hierarchical:
+            pc, level_solutions = plan_hierarchically(target_plan, past_plan, next_day, folder, writer)
+        else:
+            pc, level_solutions = plan_levels(target_plan, past_plan, next_day, folder, writer)
+
+        # save last one again in base folder
+        save_final_plan(pc, folder, writer)
+        writer.submit(write_diff, folder, past_plan, pc.get_personal_room_plans())
+
+    save_build_report(pc, folder)
+    print(f"THIS IS THE END \n\n\n{level_solutions}")
+
+    # update active plan
+    click.secho(f"old active plan: {plan_paths['active']}", fg="blue", bold=True)
+    plan_paths["active"] = folder
+    click.secho(f"new active plan: {plan_paths['active']}", fg="blue", bold=True)
+    plan.save_plan_paths(plan_paths)
+
+    # if you make mistakes, you can see where they are coming from
+    plans_folder = pathlib.Path(settings.paths._get("plans", "plans")())
+    (plan_paths["active"] / "parent_plan").write_text(f"{input_folder.relative_to(plans_folder)}\n")
+
+
+def prepare_room_level(pc, level):
+    """
+    Set the objective of a room level and bound the objective of the
+    previous level. The rooms have to be part of the model.
+    """
+    if level == 7:
+        pc.plugin_objective_select_best_rooms()
+    elif level == 8:
+        rel = settings.optimization_parameters.bounds.best_rooms._or(0.999)()
+        pc.bound_best_rooms_from_below(pc.get_status().get_objective() * rel)
+        pc.plugin_obj_maximize_tutor_room_stability()
+    elif level == 9:
+        rel = settings.optimization_parameters.bounds.tutor_room_stability._or(0.9)()
+        pc.bound_tutor_room_stability(pc.get_status().get_objective() * rel)
+        pc.plugin_obj_maximize_task_room_contingency()
+
+
+def plan_levels(target_plan, past_plan, next_day, folder, writer=None):
+    """
+    Solve the levels one after another. Returns the planning creator and the
+    objective values of the levels.
+
+    The room levels can be solved by day, see
+    :py:func:`tutorplanner.planning.initial.plan_levels`.
+    """
     tutor_plans = None
     max_workload = None
     min_happiness = None
@@ -73,19 +125,19 @@ def main(next_day):
     level_solutions = {}
 
     for level in range(1, 10):
-        # prepare
+        # prepare (the name is set first, the build report is per level)
+        if level > 1:
+            pc.name = f"Level_{level}"
         if level == 1:
             pc = PlanningCreator(target_plan, past_plan=past_plan, next_day=next_day, level=level)
             pc.create_model_without_rooms()
             pc.plugin_constraint_bound_maximal_deviation_from_target_plan(max_deviation=0)
             pc.plugin_obj_minimize_deviation_from_plan()
-            pc.fix_past_assignments()
         elif level == 2:
-            pc = PlanningCreator(target_plan, past_plan=past_plan, next_day=next_day, level=level)
-            pc.create_model_without_rooms()
-            pc.plugin_constraint_bound_maximal_deviation_from_target_plan(max_deviation=0)
+            # the model of level 1 is reused, the tasks are already bounded by the target plan (the past
+            # assignments are not part of the model)
+            pc.remove_deviation_from_plan()
             pc.plugin_obj_maximize_task_contingency()
-            pc.fix_past_assignments()
         elif level == 3:
             rel = settings.optimization_parameters.bounds.task_contingency._or(0.95)()
             pc.create_constraint_bound_task_contingency(pc.get_status().get_objective() * rel)
@@ -104,30 +156,27 @@ def main(next_day):
             pc.plugin_obj_maximize_cube_happiness()
         elif level == 6:
             rel = settings.optimization_parameters.bounds.cube_happiness._or(0.95)()
+            happiness = plan.compute_happiness_of_tutors(tutor_plans)
             for tutor in sorted(Data().tutor_by_name.keys()):
-                happiness = plan.compute_happiness(tutor_plans[tutor], Data().availability[tutor])
-                print(f"happiness of tutor {tutor} is {happiness}")
+                print(f"happiness of tutor {tutor} is {happiness[tutor]}")
 
             cube_happiness = pc.get_status().get_objective()
             pc.bound_cube_happiness_from_below(cube_happiness * rel)
 
             pc.plugin_obj_minimize_mar_tel_hopping()
         elif level == 7:
+            if settings.optimization_parameters.rooms_by_day._or(False)():
+                creator_arguments = {"target_plan": target_plan, "past_plan": past_plan, "next_day": next_day}
+                room_plans, room_level_solutions = plan_rooms_by_day(
+                    pc, creator_arguments, prepare_room_level, ROOM_LEVELS, folder, writer)
+                level_solutions.update(room_level_solutions)
+                return room_plans, level_solutions
             rel = settings.optimization_parameters.bounds.minimal_mar_tel_hopping._or(1.05)()
             pc.create_constraint_minimal_mar_tel_hopping(pc.get_status().get_objective() * rel)
             pc.extend_model_with_room_support()
-            pc.fix_past_assignments_to_rooms()
-            pc.plugin_objective_select_best_rooms()
-        elif level == 8:
-            rel = settings.optimization_parameters.bounds.best_rooms._or(0.999)()
-            pc.bound_best_rooms_from_below(pc.get_status().get_objective() * rel)
-            pc.plugin_obj_maximize_tutor_room_stability()
-        elif level == 9:
-            rel = settings.optimization_parameters.bounds.tutor_room_stability._or(0.9)()
-            pc.bound_tutor_room_stability(pc.get_status().get_objective() * rel)
-            pc.plugin_obj_maximize_task_room_contingency()
-
-        pc.name = f"Level_{level}"
+            prepare_room_level(pc, level)
+        elif level >= 8:
+            prepare_room_level(pc, level)
 
         # solve
         pc.solve_integer_program()
@@ -136,31 +185,48 @@ def main(next_day):
             raise Exception(f"Aborted in phase {level}")
 
         level_solutions[level] = pc.get_status().get_objective()
+        print(f"Level {level}: objective {pc.get_status().get_objective()}, "
+              f"{pc.get_status().get_start_description()}")
 
         target_plan = pc.get_optimal_plan()
         tutor_plans = pc.get_personal_plans()
-        if level < 7:
-            evaluate_plan(pc, folder)
-            pickle_it(pc, folder)
-        else:
-            personal_room_plans = pc.get_personal_room_plans()
-            evaluate_plan(pc, folder, personal_room_plans)
-            pickle_it(pc, folder, has_room_plans=True)
+        save_level(pc, folder, has_room_plans=level >= 7, writer=writer)
 
-    # save last one again in base folder
-    personal_room_plans = pc.get_personal_room_plans()
-    evaluate_plan(pc, folder, personal_room_plans, use_base_folder=True)
-    pickle_it(pc, folder, has_room_plans=True, use_base_folder=True)
-    write_diff(folder, past_plan, personal_room_plans)
+    return pc, level_solutions
 
-    print(f"THIS IS THE END \n\n\n{level_solutions}")
 
-    # update active plan
-    click.secho(f"old active plan: {plan_paths['active']}", fg="blue", bold=True)
-    plan_paths["active"] = folder
-    click.secho(f"new active plan: {plan_paths['active']}", fg="blue", bold=True)
-    plan.save_plan_paths(plan_paths)
+def plan_hierarchically(target_plan, past_plan, next_day, folder, writer=None):
+    """
+    Solve all levels in one run, see
+    :py:func:`tutorplanner.planning.initial.plan_hierarchically`.
+    """
+    pc = PlanningCreator(target_plan, past_plan=past_plan, next_day=next_day)
+    pc.create_model_without_rooms()
+    pc.plugin_constraint_bound_maximal_deviation_from_target_plan(max_deviation=0)
+    pc.extend_model_with_room_support()
+    objectives = [
+        pc.deviation_from_plan_objective(),
+        with_bound_tolerances(pc.task_contingency_objective(), "task_contingency", 0.95),
+        with_bound_tolerances(pc.work_spread_objective(), "maximal_work_spread", 1.5),
+        with_bound_tolerances(pc.min_happiness_objective(pc.maximal_workload_bound()), "min_happiness", 0.9),
+        with_bound_tolerances(pc.cube_happiness_objective(), "cube_happiness", 0.95),
+        with_bound_tolerances(pc.mar_tel_hopping_objective(), "minimal_mar_tel_hopping", 1.05),
+        with_bound_tolerances(pc.best_rooms_objective(), "best_rooms", 0.999),
+        with_bound_tolerances(pc.tutor_room_stability_objective(), "tutor_room_stability", 0.9),
+        pc.task_room_contingency_objective(),
+    ]
+    snapshots = pc.solve_hierarchically(objectives)
+    if not pc.get_status().is_feasible() or len(snapshots) < len(objectives):
+        raise Exception(f"Aborted in phase {len(snapshots) + 1}")
 
-    # if you make mistakes, you can see where they are coming from
-    plans_folder = pathlib.Path(settings.paths._get("plans", "plans")())
-    (plan_paths["active"] / "parent_plan").write_text(f"{input_folder.relative_to(plans_folder)}\n")
+    level_solutions = {}
+    final_solution = pc.last_solution
+    for level, (objective, snapshot) in enumerate(zip(objectives, snapshots), start=1):
+        level_solutions[level] = objective.expression.value(snapshot)
+        print(f"Level {level}: objective {level_solutions[level]}")
+        pc.name = f"Level_{level}"
+        pc.last_solution = snapshot
+        save_level(pc, folder, has_room_plans=level >= 7, writer=writer)
+    print(pc.get_status().get_start_description())
+    pc.last_solution = final_solution
+    return pc, level_solutions
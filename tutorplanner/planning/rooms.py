@@ -0,0 +1,177 @@
+"""
+The ``rooms`` module plans the rooms day by day.
+
+After the task levels, the tasks are fixed and the room levels only depend
+on the time slots of a single day: the room bookings, the pool equalization,
+the room priorities and the tutor--room stability. The room levels can
+therefore be solved as one small model per day. The days are solved in
+parallel worker processes (``optimization_parameters.room_processes``,
+default: number of CPUs), each solver gets an equal share of the threads.
+The workers use the settings, tutors and rooms of the main process.
+
+The bounds between the room levels are applied per day, which is a bit
+stricter than the bound on the sum of all days. Only days with tasks in the
+model are solved, i.e. the coming days in rolling wave planning, and the
+objective values are the sum of these days (the fixed rooms of the past are
+not included).
+"""
+
+__author__ = "Alexander Elvers <aelvers AT inet.tu-berlin.de>"
+
+__all__ = [
+    "RoomPlans",
+    "plan_rooms_by_day",
+]
+
+import concurrent.futures
+import multiprocessing
+import os
+import pathlib
+
+from .artifacts import level_policy, write_model_files
+from .base import save_level
+from ..input.data import Data
+from ..input.plan import get_empty_plan
+from ..util.settings import settings, DAYS, hours_real, TASKS
+
+
+class RoomPlans:
+    """
+    Plans of a planning creator with fixed tasks and the rooms that were
+    planned by day. It can be used like the planning creator for saving the
+    plans.
+    """
+
+    def __init__(self, optimizer, rooms, name):
+        self.optimizer = optimizer
+        #: (tutor, day, hour) -> room, including the fixed rooms of the planning creator
+        self.rooms = {**optimizer.fixed_rooms, **rooms}
+        self.name = name
+        self.build_report = optimizer.build_report
+        # the plans are computed once, see get_personal_room_plans
+        self.personal_room_plans = None
+
+    def get_personal_plans(self):
+        return self.optimizer.get_personal_plans()
+
+    def get_personal_room_plans(self):
+        if self.personal_room_plans is not None:
+            return self.personal_room_plans
+        result = {}
+        for tutor, tutor_plan in self.get_personal_plans().items():
+            new_plan = get_empty_plan()
+            for task in TASKS:
+                for day in DAYS:
+                    for hour in hours_real(day):
+                        new_plan[task][day][hour] = self.rooms[tutor, day, hour] if tutor_plan[task][day][hour] else ""
+            result[tutor] = new_plan
+        self.personal_room_plans = result
+        return result
+
+    def get_optimal_plan(self):
+        return self.optimizer.get_optimal_plan()
+
+    def write_lp(self, filename):
+        # the models are written by day in solve_rooms_of_day
+        pass
+
+    def write_solution(self, filename):
+        # the solutions are written by day in solve_rooms_of_day
+        pass
+
+
+def worker_state():
+    """
+    Return the settings and the tutors and rooms of the main process. Spawned
+    workers would load them from the files again, without the changes that
+    were made in memory.
+    """
+    data = Data()
+    return settings._data, data.tutor_by_name, data.room_by_name
+
+
+def use_worker_state(state):
+    """
+    Use the settings and the tutors and rooms of the main process (see
+    :py:func:`worker_state`) in a worker.
+    """
+    settings._data, tutor_by_name, room_by_name = state
+    Data._instance = None
+    data = Data()
+    data._tutor_by_name = tutor_by_name
+    data._room_by_name = room_by_name
+
+
+def solve_rooms_of_day(day, creator, creator_arguments, state, prepare_level, levels, assignments, folder, solver,
+                       threads):
+    """
+    Solve the room levels of a day with fixed tasks. Returns the objective
+    values and the rooms of each level and the build report.
+
+    ``state`` are the settings and the data of the main process, see
+    :py:func:`worker_state`. ``prepare_level(pc, level)`` adds the
+    constraints and the objective of a room level to the planning creator,
+    the room variables already exist.
+    """
+    use_worker_state(state)
+    pc = creator(**creator_arguments, level=levels[0], solver=solver)
+    pc.restrict_to_days([day])
+    pc.solver.set_parameter("threads", threads)
+    pc.create_fixed_task_variables(assignments)
+    pc.extend_model_with_room_support()
+    results = {}
+    for level in levels:
+        pc.name = f"Level_{level}"
+        prepare_level(pc, level)
+        pc.solve_integer_program()
+        if not pc.get_status().is_feasible():
+            raise Exception(f"Aborted in phase {level} on day {day}")
+        print(f"Level {level}, day {day}: objective {pc.get_status().get_objective()}, "
+              f"{pc.get_status().get_start_description()}")
+        rooms = {(tutor, day, hour): pc.find_room(tutor, day, hour) for tutor, _, hour in pc.time_slots()}
+        results[level] = pc.get_status().get_objective(), rooms
+        if level_policy() == "per_level":
+            write_model_files(pc, str(folder / f"Level_{level}_day{day}"))
+    return results, pc.build_report.records
+
+
+def plan_rooms_by_day(pc, creator_arguments, prepare_level, levels, folder: pathlib.Path, writer=None):
+    """
+    Fix the tasks of the last solution of the planning creator and solve the
+    room levels for each day in worker processes. The plans of each level are
+    saved with the writer. Returns the plans of the last level and the objective values of
+    the levels (sum of all days).
+    """
+    assignments = {day: [] for day in pc.days}
+    for key in pc.schedule_entry.keys:
+        if pc.check_assignment(*key):
+            assignments[key[1]].append(key)
+
+    # an empty model cannot be solved
+    days = [day for day in pc.days if assignments[day]]
+
+    processes = settings.optimization_parameters.room_processes._or(os.cpu_count())()
+    threads = max(1, os.cpu_count() // processes)
+    folder.mkdir(parents=True, exist_ok=True)
+    # spawn instead of fork, since the solver of the main process must not be shared
+    context = multiprocessing.get_context("spawn")
+    state = worker_state()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=processes, mp_context=context) as executor:
+        futures = {day: executor.submit(solve_rooms_of_day, day, type(pc), creator_arguments, state, prepare_level,
+                                        levels, assignments[day], folder, pc.solver.name, threads)
+                   for day in days}
+        results = {day: future.result() for day, future in futures.items()}
+
+    for day, (_, records) in results.items():
+        pc.build_report.records.extend(dict(record, name=f"{record['name']} (day {day})") for record in records)
+
+    level_solutions = {}
+    for level in levels:
+        rooms = {}
+        for day, (day_results, _) in results.items():
+            rooms.update(day_results[level][1])
+        level_solutions[level] = sum(day_results[level][0] for day_results, _ in results.values())
+        print(f"Level {level}: objective {level_solutions[level]} (rooms by day)")
+        room_plans = RoomPlans(pc, rooms, f"Level_{level}")
+        save_level(room_plans, folder, has_room_plans=True, writer=writer)
+    return room_plans, level_solutions
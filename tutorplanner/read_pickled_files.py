@@ -2,6 +2,8 @@ __author__ = ("Matthias Rost <mrost AT inet.tu-berlin.de>, "
               "Alexander Elvers <aelvers AT inet.tu-berlin.de>")
 
 __all__ = [
+    "WEEKDAYS",
+    "PlanIndex",
     "get_active_plan_dict",
     "get_rooms_by_day",
     "check_plan",
@@ -14,14 +16,15 @@ __all__ = [
 ]
 
 import csv
-import pickle
+import pathlib
 from collections import defaultdict
-from typing import List, Dict, Tuple, Any, TypeVar
+from typing import List, Dict, Tuple, Any, Optional, TypeVar
 
 from .input.data import Data
 from .input.plan import PersonalPlanDict, get_plan_paths
+from .input.plan_file import StoredPlan, find_plan_file, read_plan_folder
 from .util import converter, settings
-from .util.settings import TUTORIUM
+from .util.settings import DAYS, TUTORIUM
 
 
 T = TypeVar("T")
@@ -39,15 +42,100 @@ def latex_fix(obj: T) -> T:
     return obj
 
 
+#: day index -> weekday
+WEEKDAYS = {
+    1: "Montag",
+    2: "Dienstag",
+    3: "Mittwoch",
+    4: "Donnerstag",
+    5: "Freitag",
+    6: "Montag",
+    7: "Dienstag",
+    8: "Mittwoch",
+    9: "Donnerstag",
+    10: "Freitag",
+}
+
+
+class PlanIndex:
+    """
+    Indexed views of the personal room plans of a plan folder.
+
+    The views of the functions below are built together in a single pass
+    over the assigned tasks on first access. The index of the active plan
+    (see :py:meth:`active`) is loaded once per process and shared by all
+    functions, so the views must not be modified.
+    """
+
+    def __init__(self, stored: StoredPlan, key: Optional[Tuple[pathlib.Path, int]] = None) -> None:
+        self.stored = stored
+        #: plan file and its modification time
+        self.key = key
+        self._views: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def active(cls) -> "PlanIndex":
+        """
+        Get the index of the active plan. It is loaded and checked (see
+        :py:func:`check_plan`) again if the plan file or its modification time
+        has changed.
+        """
+        global _plan_index
+        path = find_plan_file(get_plan_paths()["active"]).resolve()
+        key = (path, path.stat().st_mtime_ns)
+        if _plan_index is None or _plan_index.key != key:
+            index = cls(read_plan_folder(path.parent), key)
+            check_plan(index.personal_room_plans)
+            _plan_index = index
+        return _plan_index
+
+    @property
+    def personal_room_plans(self) -> PersonalPlanDict:
+        return self.stored.personal_room_plans
+
+    def view(self, name: str) -> Any:
+        if self._views is None:
+            self._views = self.build_views()
+        return self._views[name]
+
+    def build_views(self) -> Dict[str, Any]:
+        """
+        Build all views in one pass, in the order of the plan dicts (tutor,
+        task, day and hour).
+        """
+        days = DAYS if self.stored.personal_plans_array.tutor_names else []
+        rooms_by_day: Dict[int, Dict[str, Dict[int, Tuple[str, str]]]] = {day: {} for day in days}
+        schedules: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        tutorials_by_time: Dict[int, Dict[int, List[Tuple[str, str]]]] = defaultdict(dict)
+        tutorials_for_tickets: Dict[int, List[Tuple[int, str, str]]] = defaultdict(list)
+        extended_tutorials: Dict[int, Dict[int, Dict[str, List[str]]]] = {day: {} for day in days}
+        events_by_time: Dict[int, Dict[int, List[Tuple[str, str, str]]]] = {day: {} for day in days}
+
+        for tutor, day, time, task, room in self.stored.personal_plans_array.assignments(by_task=True):
+            if not room:
+                continue
+            escaped_tutor = latex_fix(tutor)
+            rooms_by_day[day].setdefault(room, {})[time] = (escaped_tutor, task)
+            schedules[tutor].append(dict(task=task, time=time, day=day, weekday=WEEKDAYS[day], room=room))
+            extended_tutorials[day].setdefault(time, {}).setdefault(room, []).append(escaped_tutor)
+            events_by_time[day].setdefault(time, []).append((task, room, tutor))
+            if task == TUTORIUM:
+                tutorials_by_time[day].setdefault(time, []).append((room, tutor))
+                tutorials_for_tickets[day].append((time, room, tutor))
+
+        return dict(rooms_by_day=rooms_by_day, schedules=schedules, tutorials_by_time=tutorials_by_time,
+                    tutorials_for_tickets=tutorials_for_tickets, extended_tutorials=extended_tutorials,
+                    events_by_time=events_by_time)
+
+
+_plan_index: Optional[PlanIndex] = None
+
+
 def get_active_plan_dict() -> PersonalPlanDict:
     """
     Get active plan.
     """
-    path = get_plan_paths()["active"] / "personalPlans_Rooms.pickle"
-    with open(path, "rb") as f:
-        plan = pickle.load(f)
-    check_plan(plan)
-    return plan
+    return PlanIndex.active().personal_room_plans
 
 
 def get_rooms_by_day() -> Dict[int, Dict[str, Dict[int, Tuple[str, str]]]]:
@@ -56,19 +144,7 @@ def get_rooms_by_day() -> Dict[int, Dict[str, Dict[int, Tuple[str, str]]]]:
     of a tutor's last name and one of the values RechneruebungMAR, RechneruebungTEL,
     Kontrolle, Tutorium.
     """
-    plan = get_active_plan_dict()
-    rooms: Dict[int, Dict[str, Dict[int, Tuple[str, str]]]] = {}
-    for tutor in plan:
-        for task, schedule in plan[tutor].items():
-            for day, times in schedule.items():
-                if not day in rooms:
-                    rooms[day] = {}
-                for time, room in times.items():
-                    if room:
-                        if not room in rooms[day]:
-                            rooms[day][room] = {}
-                        rooms[day][room].update({time:(latex_fix(tutor), task)})
-    return rooms
+    return PlanIndex.active().view("rooms_by_day")
 
 
 def check_plan(plan: PersonalPlanDict) -> None:
@@ -97,35 +173,11 @@ def check_plan(plan: PersonalPlanDict) -> None:
 
 
 def get_schedule_per_tutor() -> Dict[str, List[Dict[str, Any]]]:
-    def weekday(day: int) -> str:
-        days = {1:"Montag",
-                2:"Dienstag",
-                3:"Mittwoch",
-                4:"Donnerstag",
-                5:"Freitag",
-                6:"Montag",
-                7:"Dienstag",
-                8:"Mittwoch",
-                9:"Donnerstag",
-                10:"Freitag"}
-        return days[day]
-
-    plan = get_active_plan_dict()
-    tutor_sched: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
-    for tutor in plan:
-        for task, schedule in plan[tutor].items():
-            for day, times in schedule.items():
-                for time, room in times.items():
-                    if room:
-                        tutor_sched[tutor].append(dict(
-                            task=task,
-                            time=time,
-                            day=day,
-                            weekday=weekday(day),
-                            room=room,
-                        ))
-
-    return tutor_sched
+    """
+    Returns a dictionary of tutor's last name -> list of tasks with the task,
+    time, day, weekday and room.
+    """
+    return PlanIndex.active().view("schedules")
 
 
 def get_tutorials_by_time() -> Dict[int, Dict[int, List[Tuple[str, str]]]]:
@@ -133,17 +185,7 @@ def get_tutorials_by_time() -> Dict[int, Dict[int, List[Tuple[str, str]]]]:
     Returns a dictionary of all tutorial events with the keys day -> time -> list of events, where events
     are tuples of the room name and the tutor's last name.
     """
-    plan = get_active_plan_dict()
-    tutorials: Dict[int, Dict[int, List[Tuple[str, str]]]] = defaultdict(dict)
-    for tutor in plan:
-        for day, times in plan[tutor][TUTORIUM].items():
-            for time, room in times.items():
-                if room:
-                    if not time in tutorials[day].keys():
-                        tutorials[day][time] = [(room, tutor)]
-                    else:
-                        tutorials[day][time].append((room, tutor))
-    return tutorials
+    return PlanIndex.active().view("tutorials_by_time")
 
 
 def get_tutorials_for_tickets() -> Dict[int, List[Tuple[int, str, str]]]:
@@ -151,14 +193,7 @@ def get_tutorials_for_tickets() -> Dict[int, List[Tuple[int, str, str]]]:
     Returns a dict of tutorials in format day -> list of events, where events
     are tuples of the time, room name and the tutor's last name.
     """
-    plan = get_active_plan_dict()
-    tutorials: Dict[int, List[Tuple[int, str, str]]] = defaultdict(list)
-    for tutor in plan:
-        for day, times in plan[tutor][TUTORIUM].items():
-            for time, room in times.items():
-                if room:
-                    tutorials[day].append((time, room, tutor))
-    return tutorials
+    return PlanIndex.active().view("tutorials_for_tickets")
 
 
 def get_extended_tutorials_for_tickets() -> Dict[int, Dict[int, Dict[str, List[str]]]]:
@@ -166,22 +201,7 @@ def get_extended_tutorials_for_tickets() -> Dict[int, Dict[int, Dict[str, List[s
     Returns a dict of tutorials in format day -> time -> room name -> list of tutors' last names.
     The tutor names are escaped.
     """
-    plan = get_active_plan_dict()
-    tutorials: Dict[int, Dict[int, Dict[str, List[str]]]] = {}
-    for tutor in plan:
-        for task in settings.TASKS:
-            for day, times in plan[tutor][task].items():
-                if day not in tutorials:
-                    tutorials[day] = {}
-                for time, room in times.items():
-                    if room:
-                        if time not in tutorials[day]:
-                            tutorials[day][time] = {}
-                        if room not in tutorials[day][time]:
-                            tutorials[day][time][room] = []
-                        tutorials[day][time][room].append(latex_fix(tutor))
-
-    return tutorials
+    return PlanIndex.active().view("extended_tutorials")
 
 
 def get_events_by_time() -> Dict[int, Dict[int, List[Tuple[str, str, str]]]]:
@@ -190,20 +210,7 @@ def get_events_by_time() -> Dict[int, Dict[int, List[Tuple[str, str, str]]]]:
     are tuples of the event type (RechneruebungMAR, RechneruebungTEL, Kontrolle, or Tutorium),
     the room name and the tutor's last name
     """
-    plan = get_active_plan_dict()
-    events: Dict[int, Dict[int, List[Tuple[str, str, str]]]] = {}
-    for tutor in plan:
-        for task in plan[tutor]:
-            for day, times in plan[tutor][task].items():
-                if not day in events:
-                    events[day] = {}
-                for time, room in times.items():
-                    if room:
-                        if not time in events[day].keys():
-                            events[day][time] = [(task, room, tutor)]
-                        else:
-                            events[day][time].append((task, room, tutor))
-    return events
+    return PlanIndex.active().view("events_by_time")
 
 
 def get_course_leaders() -> List[Dict[str, str]]:
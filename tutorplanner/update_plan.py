@@ -7,7 +7,6 @@ __all__ = [
     "from_joint_plan_to_list",
     "evaluate_plan",
     "get_plan",
-    "pickle_it",
     "search_room",
     "search_tutor",
     "search_date",
@@ -19,14 +18,13 @@ __all__ = [
 
 import datetime
 import pathlib
-import pickle
-import shutil
 from typing import Tuple, Optional, List
 
 import click
 
-from .input import plan
+from .input import plan, plan_file
 from .input.data import Data
+from .input.plan_array import PersonalPlanArray
 from .input.rooms import Room
 from .input.tutor import Tutor
 from .util import converter
@@ -40,33 +38,14 @@ def from_personal_room_plan_to_plan(personal_room_plan):
     """
     Convert personal room plan dict to plan dict.
     """
-    def check_assignment(tutor, day, hour, task):
-        return personal_room_plan[tutor][task][day][hour] != ""
-
-    output_plan = plan.get_empty_plan()
-    for day in DAYS:
-            for hour in hours_real(day):
-                for task in TASKS:
-                    output_plan[task][day][hour] = sum([check_assignment(tutor, day, hour, task) for tutor in Data().tutor_by_name.keys()])
-    return output_plan
+    return PersonalPlanArray.from_dict(personal_room_plan, Data().tutor_by_name).to_plan_array().to_dict()
 
 
 def from_personal_room_plan_to_personal_plan(personal_room_plan):
     """
     Convert personal room plan dict to personal plan dict.
     """
-    def check_assignment(tutor, day, hour, task):
-        return personal_room_plan[tutor][task][day][hour] != ""
-
-    result = {}
-    for tutor in Data().tutor_by_name.keys():
-        new_plan = plan.get_empty_plan()
-        for day in DAYS:
-            for hour in hours_real(day):
-                for task in TASKS:
-                    new_plan[task][day][hour] = check_assignment(tutor, day, hour, task)
-        result[tutor] = new_plan
-    return result
+    return PersonalPlanArray.from_dict(personal_room_plan, Data().tutor_by_name).to_dict(rooms=False)
 
 
 def from_joint_plan_to_list(tutor_plan, tutor_room_plan=None) -> List[str]:
@@ -96,6 +75,7 @@ def evaluate_plan(folder: pathlib.Path, updated_plan, personal_plans, room_plan=
     """
     Write individual plans as text files.
     """
+    happiness = plan.compute_happiness_of_tutors(personal_plans)
     for tutor, tutor_plan in personal_plans.items():
         contents = (
             f"Tutor:"
@@ -107,7 +87,7 @@ def evaluate_plan(folder: pathlib.Path, updated_plan, personal_plans, room_plan=
             f"Arbeitszeit (zweite Woche):"
             f" {plan.compute_workload_second_week(tutor_plan)}\t\t"
             f"Happy?: Skala von 1 (nicht happy) bis 3 (sehr happy):"
-            f" {plan.compute_happiness(tutor_plan, Data().availability[tutor])}"
+            f" {happiness[tutor]}"
         )
         contents += "\n\n"
         tutor_room_plan = (room_plan or {})[tutor]
@@ -126,21 +106,7 @@ def get_plan(folder: pathlib.Path) -> plan.PersonalPlan:
     """
     Get the plan from folder.
     """
-    with open(folder / "personalPlans_Rooms.pickle", "rb") as f:
-        plan_dict = pickle.load(f)
-    return plan.PersonalPlan.create_from_personal_plan(plan_dict)
-
-
-def pickle_it(folder: pathlib.Path, plan, personal_plans, personal_room_plans):
-    """
-    Pickle and save all plan dicts.
-    """
-    with open(folder / "plan.pickle", "wb") as file:
-        pickle.dump(plan, file)
-    with open(folder / "personalPlans.pickle", "wb") as file:
-        pickle.dump(personal_plans, file)
-    with open(folder / "personalPlans_Rooms.pickle", "wb") as file:
-        pickle.dump(personal_room_plans, file)
+    return plan.PersonalPlan.create_from_personal_plan(plan_file.read_plan_folder(folder).personal_room_plans)
 
 
 def search_room(room_name: str) -> Room:
@@ -227,7 +193,7 @@ def write_plans(folder: pathlib.Path, personal_plan: plan.PersonalPlan) -> None:
     updated_personal_room_plan = personal_plan.get_personal_plan()
     updated_plan = from_personal_room_plan_to_plan(updated_personal_room_plan)
     updated_personal_plan = from_personal_room_plan_to_personal_plan(updated_personal_room_plan)
-    pickle_it(folder, updated_plan, updated_personal_plan, updated_personal_room_plan)
+    plan_file.save_plan(folder, updated_personal_room_plan)
     evaluate_plan(folder, updated_plan, updated_personal_plan, updated_personal_room_plan)
 
 
@@ -283,7 +249,7 @@ def initialize_working_plan(description):
     else:
         description = "-" + description
 
-    # copy all pickle files to a new folder
+    # copy the plan to a new folder
     plan_paths = plan.get_plan_paths()
     active = plan_paths["active"]
 
@@ -294,8 +260,9 @@ def initialize_working_plan(description):
     new_folder = plan.get_new_plan_folder("manual-updates" + description)
 
     new_folder.mkdir()
-    for filename in ("plan.pickle", "personalPlans.pickle", "personalPlans_Rooms.pickle"):
-        shutil.copyfile(str(active / filename), str(new_folder / filename))
+    # plan folders of former versions are converted from the pickled plans
+    active_plan = plan_file.read_plan_folder(active)
+    plan_file.save_plan(new_folder, active_plan.personal_plans_array, active_plan.has_rooms)
 
     # if you make mistakes, you can see where they are coming from
     plans_folder = pathlib.Path(settings.settings.paths._get("plans", "plans")())
@@ -3,11 +3,13 @@ __author__ = ("Matthias Rost <mrost AT inet.tu-berlin.de>, "
 
 __all__ = [
     "Settings",
+    "LazySettings",
     "load_settings",
     "settings",
     "hours_real",
     "pre_hours_real",
     "get_room_info",
+    "RoomInfoResolver",
     "TUTORIUM",
     "UEBUNG_TEL",
     "UEBUNG_MAR",
@@ -16,8 +18,9 @@ __all__ = [
     "weekdays",
 ]
 
+import functools
 import re
-from typing import Dict, Any, Iterable
+from typing import Dict, Any, Iterable, Tuple
 
 import yaml
 
@@ -137,10 +140,38 @@ def load_settings(file: str = None) -> Settings:
         return settings
 
 
-try:
-    settings = load_settings()
-except FileNotFoundError:
-    settings = Settings()
+class LazySettings(Settings):
+    """
+    Settings that are loaded from the settings file on first access.
+
+    Parsing the settings file is deferred, so that importing the modules (e.g.
+    for the help of the command line) does not read it. If the file does not
+    exist, the settings are empty. Assigning _data replaces the loaded data.
+    """
+
+    def __init__(self, file: str = None) -> None:
+        self._file = file
+        self._loaded = False
+        self._loaded_data = None
+        self._strict = False
+
+    @property  # type: ignore
+    def _data(self) -> Any:
+        if not self._loaded:
+            try:
+                self._loaded_data = load_settings(self._file)._data
+            except FileNotFoundError:
+                self._loaded_data = None
+            self._loaded = True
+        return self._loaded_data
+
+    @_data.setter
+    def _data(self, data: Any) -> None:
+        self._loaded_data = data
+        self._loaded = True
+
+
+settings = LazySettings()
 
 
 precision = 1
@@ -164,28 +195,91 @@ def pre_hours_real(d) -> Iterable[int]:
 DAYS = range(1, 11)
 
 
+#: attributes of the room patterns
+ROOM_INFO_ATTRIBUTES = ["type", "capacity", "projector", "tutorial_size"]
+
+
+class RoomInfoResolver:
+    """
+    Resolves the room information of the room patterns.
+
+    All patterns are compiled once. Patterns without wildcard (concrete
+    rooms) are looked up in a dict. For each attribute, the other patterns
+    that set it are combined into a single regular expression with the last
+    pattern as first alternative, so that the first matching alternative is
+    the last matching pattern. The attribute is taken from the later of both
+    patterns. The results are cached per room name (at most cache_size
+    names).
+    """
+
+    def __init__(self, room_patterns: Any, cache_size: int = 4096) -> None:
+        #: the room patterns of the settings
+        self.room_patterns = room_patterns
+        #: lower case room name -> attribute -> (index of the last pattern, value)
+        self.rooms: Dict[str, Dict[str, Tuple[int, Any]]] = {}
+        #: attribute -> (regex, [(index of the pattern, value)])
+        self.matchers = {}
+        wildcard_patterns = []
+        for index, room_pattern in enumerate(room_patterns or []):
+            pattern = room_pattern.get("pattern", "*")
+            if "*" in pattern:
+                wildcard_patterns.append((index, room_pattern))
+                continue
+            room = self.rooms.setdefault(pattern.lower(), {})
+            for attribute in ROOM_INFO_ATTRIBUTES:
+                if attribute in room_pattern:
+                    room[attribute] = index, room_pattern[attribute]
+        for attribute in ROOM_INFO_ATTRIBUTES:
+            patterns = [(index, room_pattern) for index, room_pattern in reversed(wildcard_patterns)
+                        if attribute in room_pattern]
+            if not patterns:
+                continue
+            regex = "|".join(f"({self.pattern_to_regex(room_pattern['pattern'])})" for _, room_pattern in patterns)
+            self.matchers[attribute] = (re.compile(f"^(?:{regex})$", re.IGNORECASE),
+                                        [(index, room_pattern[attribute]) for index, room_pattern in patterns])
+        self.cached_room_info = functools.lru_cache(maxsize=cache_size)(self.compute_room_info)
+
+    @staticmethod
+    def pattern_to_regex(pattern: str) -> str:
+        return ".*".join(map(re.escape, pattern.split("*")))
+
+    def compute_room_info(self, room_name: str) -> Dict[str, Any]:
+        matches = dict(self.rooms.get(room_name.lower(), {}))
+        for attribute, (regex, values) in self.matchers.items():
+            match = regex.match(room_name)
+            if match:
+                index, value = values[match.lastindex - 1]
+                if attribute not in matches or matches[attribute][0] < index:
+                    matches[attribute] = index, value
+        info = {attribute: matches[attribute][1] if attribute in matches else None
+                for attribute in ROOM_INFO_ATTRIBUTES}
+        if info["projector"] is not None:
+            info["projector"] = bool(info["projector"])
+        return info
+
+    def __call__(self, room_name: str) -> Dict[str, Any]:
+        """
+        Get room information by room name.
+        """
+        return dict(self.cached_room_info(room_name))
+
+
+_room_info_resolver = RoomInfoResolver(None)
+
+
 def get_room_info(room_name: str) -> Dict[str, Any]:
     """
     Get room information by room name.
+
+    Later patterns override the attributes of earlier patterns. The patterns
+    are compiled again when the settings are reloaded or the room patterns
+    are replaced (see :py:class:`RoomInfoResolver`).
     """
-    room_type = None
-    capacity = None
-    tutorial_size = None
-    projector = None
-    room_patterns = settings.room_patterns() or []
-    for room_pattern in room_patterns:
-        pattern = room_pattern.get("pattern", "*")
-        regex = re.compile("^{}$".format(".*".join(map(re.escape, pattern.split("*")))), re.IGNORECASE)
-        if regex.match(room_name):
-            if "type" in room_pattern:
-                room_type = room_pattern["type"]
-            if "capacity" in room_pattern:
-                capacity = room_pattern["capacity"]
-            if "tutorial_size" in room_pattern:
-                tutorial_size = room_pattern["tutorial_size"]
-            if "projector" in room_pattern:
-                projector = bool(room_pattern["projector"])
-    return dict(type=room_type, capacity=capacity, projector=projector, tutorial_size=tutorial_size)
+    global _room_info_resolver
+    room_patterns = settings.room_patterns()
+    if room_patterns is not _room_info_resolver.room_patterns:
+        _room_info_resolver = RoomInfoResolver(room_patterns)
+    return _room_info_resolver(room_name)
 
 
 TUTORIUM = "Tutorium"